@@ -19,6 +19,7 @@ types of tests.
 import os
 import sys
 from datetime import datetime
+from pathlib import Path
 
 from base.connector import Database
 from base.dates import process_env_date
@@ -164,3 +165,16 @@ class Configuration:
         test_suite = test_group.fetch_test_suite(test_suite_name)
         path = test_suite.test_suite_output(env_name)
         return path
+
+
+# -------------------------------------------------------------------------------
+#  Functions
+# -------------------------------------------------------------------------------
+
+
+def default_standin_path() -> str:
+    """
+    Return the path of the SQLite database that stands in for PolicyCenter from the
+    environment variable ENV_PC_STANDIN_DB, or a file in the home directory.
+    """
+    return os.getenv("ENV_PC_STANDIN_DB", str(Path.home() / ".bcgen_cache" / "policycenter.db"))
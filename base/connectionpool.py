@@ -0,0 +1,572 @@
+# -------------------------------------------------------------------------------
+#
+#  Copyright (c) 2021 Waysys LLC
+#
+# -------------------------------------------------------------------------------
+# -------------------------------------------------------------------------------
+#
+
+__author__ = 'Bill Shaffer'
+__version__ = "16-Oct-2021"
+
+"""
+This module manages pools of connections to databases.  There is one pool for each
+database definition.  A connection is checked out of the pool, used, and closed,
+which returns it to the pool for reuse instead of disconnecting from the database.
+"""
+
+import atexit
+import threading
+import time
+
+from base.connector import Connector, Database
+from base.testexception import TestException
+
+DEFAULT_MIN_SIZE = 1
+DEFAULT_MAX_SIZE = 4
+DEFAULT_IDLE_TIMEOUT = 300.0
+DEFAULT_CHECKOUT_TIMEOUT = 60.0
+VALIDATION_QUERY = "SELECT 1"
+
+
+# -------------------------------------------------------------------------------
+#  Pool Statistics
+# -------------------------------------------------------------------------------
+
+
+class PoolStatistics:
+    """
+    This class holds the counters maintained by a connection pool.
+    """
+
+    # ---------------------------------------------------------------------------
+    #  Constructor
+    # ---------------------------------------------------------------------------
+
+    def __init__(self):
+        """
+        Initialize the instance of this class.
+        """
+        self.checkouts = 0
+        self.waits = 0
+        self.wait_time = 0.0
+        self.connects = 0
+        self.connect_time = 0.0
+        self.validation_failures = 0
+        self.idle_closes = 0
+        self.max_in_use = 0
+        return
+
+    # ---------------------------------------------------------------------------
+    #  Properties
+    # ---------------------------------------------------------------------------
+
+    @property
+    def average_connect_latency(self) -> float:
+        """
+        Return the average number of seconds needed to open a connection.
+        """
+        return self.connect_time / self.connects if self.connects > 0 else 0.0
+
+    @property
+    def reuses(self) -> int:
+        """
+        Return the number of checkouts satisfied by an existing connection.
+        """
+        return self.checkouts - self.connects
+
+    # ---------------------------------------------------------------------------
+    #  Operations
+    # ---------------------------------------------------------------------------
+
+    def report(self) -> str:
+        """
+        Return a one line summary of the statistics.
+        """
+        summary = "checkouts: " + str(self.checkouts) + \
+                  "  reuses: " + str(self.reuses) + \
+                  "  connects: " + str(self.connects) + \
+                  "  connect latency: " + "{:.3f}".format(self.average_connect_latency) + " seconds" + \
+                  "  waits: " + str(self.waits) + \
+                  "  wait time: " + "{:.3f}".format(self.wait_time) + " seconds" + \
+                  "  validation failures: " + str(self.validation_failures) + \
+                  "  max in use: " + str(self.max_in_use)
+        return summary
+
+
+# -------------------------------------------------------------------------------
+#  Pooled Connection
+# -------------------------------------------------------------------------------
+
+
+class PooledConnection:
+    """
+    This class wraps a connection checked out of a pool.  It is used like a pyodbc
+    connection.  Closing it returns the underlying connection to the pool.
+    """
+
+    # ---------------------------------------------------------------------------
+    #  Constructor
+    # ---------------------------------------------------------------------------
+
+    def __init__(self, pool, cnx):
+        """
+        Initialize the instance of this class.
+
+        Arguments:
+            pool - the pool that owns the connection
+            cnx - the underlying database connection
+        """
+        assert pool is not None, "Pool must not be None"
+        assert cnx is not None, "Connection must not be None"
+        self._pool = pool
+        self._cnx = cnx
+        return
+
+    # ---------------------------------------------------------------------------
+    #  Properties
+    # ---------------------------------------------------------------------------
+
+    @property
+    def pool(self):
+        """
+        Return the pool that owns this connection.
+        """
+        return self._pool
+
+    @property
+    def connection(self):
+        """
+        Return the underlying database connection.
+        """
+        assert self._cnx is not None, "Connection has been returned to the pool"
+        return self._cnx
+
+    @property
+    def closed(self) -> bool:
+        """
+        Return True if the connection has been returned to the pool.
+        """
+        return self._cnx is None
+
+    @property
+    def identity(self) -> str:
+        """
+        Return the identity of the database of the pool.
+        """
+        return self._pool.identity
+
+    # ---------------------------------------------------------------------------
+    #  Operations
+    # ---------------------------------------------------------------------------
+
+    def cursor(self):
+        """
+        Return a new cursor on the underlying connection.
+        """
+        return self.connection.cursor()
+
+    def commit(self):
+        """
+        Commit the current transaction.
+        """
+        self.connection.commit()
+        return
+
+    def rollback(self):
+        """
+        Roll back the current transaction.
+        """
+        self.connection.rollback()
+        return
+
+    def close(self):
+        """
+        Return the underlying connection to the pool.  The pool rolls back any transaction
+        left open, so the next user of the connection starts a new one.  Closing more than
+        once has no effect.
+        """
+        if self._cnx is not None:
+            cnx = self._cnx
+            self._cnx = None
+            self._pool.release(cnx)
+        return
+
+    def __getattr__(self, name):
+        """
+        Delegate any other attribute to the underlying connection.
+        """
+        return getattr(self.connection, name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, tb):
+        self.close()
+        return False
+
+
+# -------------------------------------------------------------------------------
+#  Connection Pool
+# -------------------------------------------------------------------------------
+
+
+class ConnectionPool:
+    """
+    This class keeps connections to one database for reuse.  The pool opens connections
+    as they are needed, up to the maximum size, and closes connections beyond the minimum
+    size that have been idle longer than the idle timeout.  Every connection that is reused
+    is checked with a validation query before it is handed out.
+    """
+
+    # ---------------------------------------------------------------------------
+    #  Class Variables
+    # ---------------------------------------------------------------------------
+
+    _pools: dict[tuple, "ConnectionPool"] = {}
+    _pools_lock = threading.Lock()
+
+    # ---------------------------------------------------------------------------
+    #  Constructor
+    # ---------------------------------------------------------------------------
+
+    def __init__(self, database_def: Database,
+                 min_size: int = DEFAULT_MIN_SIZE,
+                 max_size: int = DEFAULT_MAX_SIZE,
+                 idle_timeout: float = DEFAULT_IDLE_TIMEOUT,
+                 checkout_timeout: float = DEFAULT_CHECKOUT_TIMEOUT):
+        """
+        Initialize the instance of this class.
+
+        Arguments:
+            database_def - the definition of the database
+            min_size - the number of idle connections kept regardless of the idle timeout
+            max_size - the maximum number of connections open at the same time
+            idle_timeout - the number of seconds an idle connection is kept
+            checkout_timeout - the number of seconds to wait for a connection before failing
+        """
+        assert database_def is not None, "Database definition must not be None"
+        assert min_size >= 0, "Minimum size must not be negative: " + str(min_size)
+        assert max_size > 0, "Maximum size must be greater than zero: " + str(max_size)
+        assert min_size <= max_size, "Minimum size must not exceed maximum size"
+        assert idle_timeout >= 0, "Idle timeout must not be negative: " + str(idle_timeout)
+        self.database_def = database_def
+        self.min_size = min_size
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.checkout_timeout = checkout_timeout
+        self.statistics = PoolStatistics()
+        # idle connections with the time they were returned, most recent last
+        self._idle: list[tuple[object, float]] = []
+        self._size = 0
+        self._in_use = 0
+        self._closed = False
+        self._condition = threading.Condition()
+        return
+
+    # ---------------------------------------------------------------------------
+    #  Properties
+    # ---------------------------------------------------------------------------
+
+    @property
+    def key(self) -> tuple:
+        """
+        Return the key of the database definition served by this pool.
+        """
+        return self.database_def.key
+
+    @property
+    def identity(self) -> str:
+        """
+        Return a printable identification of the database.
+        """
+        return self.database_def.identity
+
+    @property
+    def size(self) -> int:
+        """
+        Return the number of open connections, both idle and in use.
+        """
+        return self._size
+
+    @property
+    def idle_count(self) -> int:
+        """
+        Return the number of idle connections.
+        """
+        return len(self._idle)
+
+    # ---------------------------------------------------------------------------
+    #  Operations
+    # ---------------------------------------------------------------------------
+
+    def checkout(self, timeout: float = None) -> PooledConnection:
+        """
+        Return a connection from the pool.  The connection must be closed when it is no
+        longer needed, either explicitly or by using it in a with statement.
+
+        Arguments:
+            timeout - the number of seconds to wait for a connection, or None for the pool default
+        """
+        if timeout is None:
+            timeout = self.checkout_timeout
+        deadline = time.monotonic() + timeout
+        while True:
+            cnx, must_connect = self._reserve(deadline)
+            if must_connect:
+                cnx = self._connect()
+                break
+            if self._is_valid(cnx):
+                break
+            self.statistics.validation_failures += 1
+            self._discard(cnx)
+        with self._condition:
+            self.statistics.checkouts += 1
+            self.statistics.max_in_use = max(self.statistics.max_in_use, self._in_use)
+        return PooledConnection(self, cnx)
+
+    def release(self, cnx):
+        """
+        Return a connection to the pool.  This function is called by PooledConnection.close.
+        Any transaction left open on the connection is rolled back.  If the rollback fails,
+        the connection is closed instead of being kept.
+
+        Arguments:
+            cnx - the underlying database connection
+        """
+        try:
+            cnx.rollback()
+            rolled_back = True
+        except Exception as e:
+            print("Error in rolling back a connection returned to the pool: " + str(e))
+            rolled_back = False
+        if not rolled_back:
+            self._discard(cnx)
+        else:
+            with self._condition:
+                self._in_use -= 1
+                if self._closed:
+                    self._size -= 1
+                    close_quietly(cnx)
+                else:
+                    self._idle.append((cnx, time.monotonic()))
+                    self._close_expired()
+                self._condition.notify()
+        return
+
+    def grow(self, max_size: int):
+        """
+        Raise the maximum number of connections open at the same time.  A maximum size that
+        is not larger than the current one leaves the pool unchanged.
+
+        Arguments:
+            max_size - the new maximum size
+        """
+        with self._condition:
+            if max_size > self.max_size:
+                self.max_size = max_size
+                self._condition.notify_all()
+        return
+
+    def fill(self):
+        """
+        Open connections until the pool holds the minimum number of connections.
+        """
+        connections = []
+        try:
+            while self._size < self.min_size:
+                connections.append(self.checkout())
+        finally:
+            for cnx in connections:
+                cnx.close()
+        return
+
+    def validate(self) -> bool:
+        """
+        Return True if a valid connection to the database can be obtained.
+        """
+        try:
+            cnx = self.checkout()
+            cnx.close()
+            result = True
+        except Exception:
+            result = False
+        return result
+
+    def close(self):
+        """
+        Close the idle connections and refuse further checkouts.  Connections in use are
+        closed when they are returned.
+        """
+        with self._condition:
+            self._closed = True
+            for cnx, returned in self._idle:
+                close_quietly(cnx)
+                self._size -= 1
+            self._idle = []
+            self._condition.notify_all()
+        return
+
+    # ---------------------------------------------------------------------------
+    #  Support Functions
+    # ---------------------------------------------------------------------------
+
+    def _reserve(self, deadline: float) -> tuple:
+        """
+        Return an idle connection, or reserve space for a new connection.  Wait if the pool
+        is at its maximum size.  Return a pair of the idle connection (or None) and a flag that
+        is True if a new connection must be opened.
+
+        Arguments:
+            deadline - the monotonic time after which the wait fails
+        """
+        waited = False
+        wait_start = time.monotonic()
+        with self._condition:
+            while True:
+                if self._closed:
+                    raise TestException("Connection pool is closed: " + self.identity)
+                self._close_expired()
+                if len(self._idle) > 0:
+                    cnx, returned = self._idle.pop()
+                    result = (cnx, False)
+                    break
+                if self._size < self.max_size:
+                    self._size += 1
+                    result = (None, True)
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TestException("Timed out waiting for a connection to " + self.identity)
+                if not waited:
+                    waited = True
+                    self.statistics.waits += 1
+                self._condition.wait(remaining)
+            self._in_use += 1
+            if waited:
+                self.statistics.wait_time += time.monotonic() - wait_start
+        return result
+
+    def _connect(self):
+        """
+        Open a new connection for space reserved in the pool.
+        """
+        prior = time.monotonic()
+        try:
+            cnx = Connector.create_connector(self.database_def)
+        except Exception:
+            with self._condition:
+                self._size -= 1
+                self._in_use -= 1
+                self._condition.notify()
+            raise
+        with self._condition:
+            self.statistics.connects += 1
+            self.statistics.connect_time += time.monotonic() - prior
+        return cnx
+
+    def _discard(self, cnx):
+        """
+        Close a connection that failed validation or could not be rolled back, and release
+        its space in the pool.
+
+        Arguments:
+            cnx - the underlying database connection
+        """
+        close_quietly(cnx)
+        with self._condition:
+            self._size -= 1
+            self._in_use -= 1
+            self._condition.notify()
+        return
+
+    def _close_expired(self):
+        """
+        Close idle connections beyond the minimum size that have been idle longer than the
+        idle timeout.  The caller must hold the condition.
+        """
+        now = time.monotonic()
+        while len(self._idle) > 0 and self._size > self.min_size:
+            cnx, returned = self._idle[0]
+            if now - returned <= self.idle_timeout:
+                break
+            self._idle.pop(0)
+            self._size -= 1
+            self.statistics.idle_closes += 1
+            close_quietly(cnx)
+        return
+
+    @staticmethod
+    def _is_valid(cnx) -> bool:
+        """
+        Return True if the validation query succeeds on the connection.
+
+        Arguments:
+            cnx - the underlying database connection
+        """
+        cursor = None
+        try:
+            cursor = cnx.cursor()
+            cursor.execute(VALIDATION_QUERY)
+            cursor.fetchall()
+            result = True
+        except Exception:
+            result = False
+        finally:
+            if cursor is not None:
+                close_quietly(cursor)
+        return result
+
+    # ---------------------------------------------------------------------------
+    #  Class Operations
+    # ---------------------------------------------------------------------------
+
+    @classmethod
+    def get_pool(cls, database_def: Database, **kwargs) -> "ConnectionPool":
+        """
+        Return the pool for the database definition, creating it if necessary.  An existing
+        pool is grown if a larger maximum size is requested, so that it can serve every
+        caller that asks for it.  The other settings apply only to a new pool.
+
+        Arguments:
+            database_def - the definition of the database
+            kwargs - the settings for a new pool (min_size, max_size, idle_timeout, checkout_timeout)
+        """
+        assert database_def is not None, "Database definition must not be None"
+        with cls._pools_lock:
+            pool = cls._pools.get(database_def.key)
+            if pool is None or pool._closed:
+                pool = ConnectionPool(database_def, **kwargs)
+                cls._pools[database_def.key] = pool
+            elif "max_size" in kwargs:
+                pool.grow(kwargs["max_size"])
+        return pool
+
+    @classmethod
+    def close_all(cls):
+        """
+        Close every pool.
+        """
+        with cls._pools_lock:
+            pools = list(cls._pools.values())
+            cls._pools = {}
+        for pool in pools:
+            pool.close()
+        return
+
+
+def close_quietly(resource):
+    """
+    Close a connection or cursor, printing rather than raising any error.
+
+    Arguments:
+        resource - a connection or cursor
+    """
+    try:
+        resource.close()
+    except Exception as e:
+        print("Error in closing: " + str(e))
+    return
+
+
+atexit.register(ConnectionPool.close_all)
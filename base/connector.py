@@ -10,14 +10,21 @@ __author__ = 'Bill Shaffer'
 __version__ = "01-Sep-2021"
 
 """
-This module manages a connection to SQL Server
+This module manages a connection to SQL Server, or to a SQLite database that stands in
+for a SQL Server database.  The pyodbc module is imported only when a connection to
+SQL Server is made, so the SQLite stand-in can be used where no ODBC driver manager is
+installed.
 """
 
+import os
 from enum import Enum
 from string import Template
+from typing import TYPE_CHECKING
+from base.sqliteconnection import SQLiteConnection
 from base.testexception import TestException
 
-import pyodbc
+if TYPE_CHECKING:
+    from pyodbc import Connection
 
 # -------------------------------------------------------------------------------
 #  Access
@@ -27,6 +34,7 @@ import pyodbc
 class Access(Enum):
     Windows = "Windows"
     SqlServer = "SQL Server"
+    SQLite = "SQLite"
 
 
 # -------------------------------------------------------------------------------
@@ -53,6 +61,31 @@ class Database:
         self.password = ""
         return
 
+    # ---------------------------------------------------------------------------
+    #  Properties
+    # ---------------------------------------------------------------------------
+
+    @property
+    def key(self) -> tuple:
+        """
+        Return a value that identifies the database.  Two definitions with the same key
+        connect to the same database in the same way.
+        """
+        return self.access, self.db_name, self.server, self.data_source, self.user_name, self.password
+
+    @property
+    def identity(self) -> str:
+        """
+        Return a printable identification of the database that does not include the password.
+        """
+        if self.access == Access.Windows:
+            location = self.data_source
+        elif self.access == Access.SQLite:
+            location = "local"
+        else:
+            location = self.server
+        return self.access.value + ":" + location + "/" + self.db_name
+
 # -------------------------------------------------------------------------------
 # Base Connector class
 # -------------------------------------------------------------------------------
@@ -131,10 +164,14 @@ class Connector:
         """
         raise NotImplementedError()
 
-    def connect(self) -> pyodbc.Connection:
+    def connect(self) -> "Connection":
         """
         Connect to a SQL Server database and return the connection.
         """
+        try:
+            import pyodbc
+        except ImportError as e:
+            raise TestException("Unable to import pyodbc to connect to SQL Server: " + str(e))
         connection_string = self.build_connection_string()
         cnx = pyodbc.connect(connection_string)
         return cnx
@@ -144,7 +181,7 @@ class Connector:
     # -------------------------------------------------------------------------------
 
     @classmethod
-    def create_connector(cls, database_def: Database) -> pyodbc.Connection:
+    def create_connector(cls, database_def: Database) -> "Connection":
         """
         Create and return a connector to the database with the parameters from the environment.
 
@@ -172,6 +209,9 @@ class Connector:
             connector.database = database_def.db_name
             connector.username = database_def.user_name
             connector.password = database_def.password
+        elif database_def.access == Access.SQLite:
+            connector = ConnectorSQLite()
+            connector.database = database_def.db_name
         else:
             raise TestException("Unsupported database access: " + str(database_def.access))
         cnx = connector.connect()
@@ -308,3 +348,37 @@ class ConnectorWindows(Connector):
         template = Template("DSN=$DSN;DATABASE=$DATABASE;Trusted_Connection=yes;")
         connection_string = template.substitute(DSN=self.dsn, DATABASE=self.database)
         return connection_string
+
+
+# -------------------------------------------------------------------------------
+# Connector class for a SQLite stand-in database
+# -------------------------------------------------------------------------------
+
+
+class ConnectorSQLite(Connector):
+    """
+    This class creates a connector to a SQLite database that stands in for a SQL Server
+    database.  The database name is the path of the database file.  The T-SQL statements
+    of the queries are translated to SQLite by the connection.
+    """
+
+    # -------------------------------------------------------------------------------
+    # Operations
+    # -------------------------------------------------------------------------------
+
+    def build_connection_string(self):
+        """
+        Return the path of the database file.
+        """
+        return self.database
+
+    def connect(self) -> SQLiteConnection:
+        """
+        Connect to the SQLite database and return the connection.  The database file must
+        already exist, so that a wrong path does not create an empty database.
+        """
+        path = self.build_connection_string()
+        if not os.path.isfile(path):
+            raise TestException("SQLite database does not exist: " + path)
+        cnx = SQLiteConnection(path)
+        return cnx
@@ -0,0 +1,210 @@
+# -------------------------------------------------------------------------------
+#
+#  Copyright (c) 2021 Waysys LLC
+#
+# -------------------------------------------------------------------------------
+# -------------------------------------------------------------------------------
+
+__author__ = 'Bill Shaffer'
+__version__ = "16-Oct-2021"
+
+"""
+This module divides a query over a range of dates into queries over smaller ranges
+that run at the same time.  The first range is queried on the connection of the caller.
+The other ranges are queried on connections checked out of the pool of that connection.
+If the connection does not belong to a pool, the ranges are queried one after another.
+
+The rows of the ranges can also be streamed.  The rows of the first range are returned as
+they are read, and each other range reads ahead into a buffer of limited size, so the
+memory used does not depend on the number of rows.
+"""
+
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Any, Callable, Iterable, Iterator
+
+from base.dates import convert_to_datetime
+
+#
+# The number of rows each range other than the first reads ahead of the caller
+#
+PARTITION_BUFFER_SIZE = 1000
+
+#
+# The number of seconds a range waits for room in its buffer before it checks whether
+# the caller has stopped reading
+#
+PARTITION_WAIT = 0.1
+
+#
+# The marker put in a buffer after the last row of a range
+#
+END_OF_RANGE = object()
+
+
+# -------------------------------------------------------------------------------
+#  Functions
+# -------------------------------------------------------------------------------
+
+
+def split_date_range(start: datetime, end: datetime, partitions: int) -> list[tuple[datetime, datetime]]:
+    """
+    Return a list of consecutive ranges of whole days that together cover the time from
+    the start up to the end.  Each range includes its start and excludes its end.  There
+    are no more ranges than partitions and no more ranges than days, but there is always
+    at least one range.  A date is taken as the start of the day.
+
+    Arguments:
+        start - the first day of the range
+        end - the day after the last day of the range
+        partitions - the maximum number of ranges
+    """
+    assert partitions > 0, "The number of partitions must be greater than 0, not " + str(partitions)
+    first = start if isinstance(start, datetime) else convert_to_datetime(start)
+    last = end if isinstance(end, datetime) else convert_to_datetime(end)
+    assert first < last, "start " + str(start) + " must be before end " + str(end)
+    days = (last - first).days
+    count = max(1, min(partitions, days))
+    ranges = []
+    range_start = first
+    for index in range(count):
+        #
+        # Spread the days as evenly as possible, giving the extra days to the first ranges.
+        # The last range ends at the end, which need not be a whole number of days away.
+        #
+        length = days // count + (1 if index < days % count else 0)
+        range_end = range_start + timedelta(days=length) if index < count - 1 else last
+        ranges.append((range_start, range_end))
+        range_start = range_end
+    return ranges
+
+
+def run_partitioned(cnx, functions: list[Callable[[Any], Any]]) -> list:
+    """
+    Run functions of a database connection at the same time and return their results in
+    the order of the functions.  The first function runs on the specified connection.  The
+    others run on connections checked out of its pool.  If the connection has no pool,
+    all the functions run on it one after another.
+
+    Arguments:
+        cnx - a database connection, usually a connection of a pool
+        functions - the functions, each of which takes a database connection
+    """
+    assert cnx is not None, "Connection must not be None"
+    assert len(functions) > 0, "There must be at least one function"
+    pool = getattr(cnx, "pool", None)
+    if pool is None or len(functions) == 1:
+        results = [function(cnx) for function in functions]
+    else:
+        with ThreadPoolExecutor(max_workers=len(functions) - 1, thread_name_prefix="partition") as executor:
+            futures = [executor.submit(run_on_pool, pool, function) for function in functions[1:]]
+            first = functions[0](cnx)
+            results = [first] + [future.result() for future in futures]
+    return results
+
+
+def iter_partitioned(cnx, functions: list[Callable[[Any], Iterable]],
+                     buffer_size: int = PARTITION_BUFFER_SIZE) -> Iterator:
+    """
+    Run functions of a database connection that return rows at the same time, and yield
+    their rows in the order of the functions.  The first function runs on the specified
+    connection, and its rows are yielded as they are read.  The others run on connections
+    checked out of its pool, and each reads at most buffer_size rows ahead.  If the
+    connection has no pool, the functions run on it one after another.  When the caller
+    stops reading, the other functions stop and their connections are returned.
+
+    Arguments:
+        cnx - a database connection, usually a connection of a pool
+        functions - the functions, each of which takes a database connection and returns
+           an iterable of rows
+        buffer_size - the maximum number of rows each other function reads ahead
+    """
+    assert cnx is not None, "Connection must not be None"
+    assert len(functions) > 0, "There must be at least one function"
+    assert buffer_size > 0, "The buffer size must be greater than 0, not " + str(buffer_size)
+    pool = getattr(cnx, "pool", None)
+    if pool is None or len(functions) == 1:
+        for function in functions:
+            yield from function(cnx)
+    else:
+        stop = threading.Event()
+        buffers = [queue.Queue(maxsize=buffer_size) for _ in functions[1:]]
+        executor = ThreadPoolExecutor(max_workers=len(functions) - 1, thread_name_prefix="partition")
+        try:
+            futures = [executor.submit(fill_buffer, pool, function, buffer, stop)
+                       for function, buffer in zip(functions[1:], buffers)]
+            yield from functions[0](cnx)
+            for buffer, future in zip(buffers, futures):
+                row = buffer.get()
+                while row is not END_OF_RANGE:
+                    yield row
+                    row = buffer.get()
+                future.result()
+        finally:
+            stop.set()
+            executor.shutdown(wait=True)
+    return
+
+
+def fill_buffer(pool, function: Callable[[Any], Iterable], buffer: queue.Queue, stop: threading.Event):
+    """
+    Put the rows of a function in a buffer, followed by the end of range marker, with a
+    connection checked out of a pool.  The function stops when the stop event is set.
+    The marker is put in the buffer even if the function fails, and the exception is then
+    raised again for the caller.
+
+    Arguments:
+        pool - a connection pool
+        function - a function that takes a database connection and returns an iterable of rows
+        buffer - the buffer of rows
+        stop - the event set when the caller stops reading
+    """
+    try:
+        cnx = pool.checkout()
+        try:
+            for row in function(cnx):
+                if not put_row(buffer, row, stop):
+                    break
+        finally:
+            cnx.close()
+    finally:
+        put_row(buffer, END_OF_RANGE, stop)
+    return
+
+
+def put_row(buffer: queue.Queue, row, stop: threading.Event) -> bool:
+    """
+    Put a row in a buffer, waiting for room in it.  Return False if the stop event was
+    set before there was room.
+
+    Arguments:
+        buffer - the buffer of rows
+        row - the row
+        stop - the event set when the caller stops reading
+    """
+    stored = False
+    while not stored and not stop.is_set():
+        try:
+            buffer.put(row, timeout=PARTITION_WAIT)
+            stored = True
+        except queue.Full:
+            pass
+    return stored
+
+
+def run_on_pool(pool, function: Callable[[Any], Any]):
+    """
+    Run a function with a connection checked out of a pool.
+
+    Arguments:
+        pool - a connection pool
+        function - a function that takes a database connection
+    """
+    cnx = pool.checkout()
+    try:
+        result = function(cnx)
+    finally:
+        cnx.close()
+    return result
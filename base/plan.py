@@ -17,9 +17,7 @@ When defining directories, do not end the path with / or \\.
 
 import os
 
-from pyodbc import Error
-
-from base.connector import Connector
+from base.connectionpool import ConnectionPool
 
 
 # -------------------------------------------------------------------------------
@@ -187,21 +185,13 @@ class Application:
     def is_database_valid(self) -> bool:
         """
         Return True if the database definition for this application is a valid
-        definition.
+        definition.  The check uses the connection pool for the database, so a
+        connection opened for the check is kept for later use.
         """
         if self.database is None:
             result = False
         else:
-            cnx = None
-            try:
-                cnx = Connector.create_connector(self.database)
-                cursor = cnx.cursor()
-                result = cursor.rowcount == -1
-            except Error:
-                result = False
-            finally:
-                if cnx is not None:
-                    cnx.close()
+            result = ConnectionPool.get_pool(self.database).validate()
         return result
 
     @property
@@ -0,0 +1,127 @@
+# -------------------------------------------------------------------------------
+#
+#  Copyright (c) 2021 Waysys LLC
+#
+# -------------------------------------------------------------------------------
+# -------------------------------------------------------------------------------
+
+__author__ = 'Bill Shaffer'
+__version__ = "14-Oct-2021"
+
+"""
+This module runs database work ahead of the time it is needed.  The work is done on a
+small pool of threads.  Each piece of work is given a connection checked out of a
+connection pool, so the queries run at the same time on separate connections while the
+main thread renders test cases.
+"""
+
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+DEFAULT_PREFETCH_WORKERS = 2
+
+
+# -------------------------------------------------------------------------------
+#  Prefetcher
+# -------------------------------------------------------------------------------
+
+
+class Prefetcher:
+    """
+    This class runs functions of a database connection on a pool of threads.
+    """
+
+    # ---------------------------------------------------------------------------
+    #  Class Variables
+    # ---------------------------------------------------------------------------
+
+    default: Optional["Prefetcher"] = None
+
+    # ---------------------------------------------------------------------------
+    #  Constructor
+    # ---------------------------------------------------------------------------
+
+    def __init__(self, pool, workers: int = DEFAULT_PREFETCH_WORKERS):
+        """
+        Initialize the instance of this class.
+
+        Arguments:
+            pool - the connection pool that supplies a connection for each function
+            workers - the number of threads.  The pool should allow this many connections
+               in addition to those used by the main thread.
+        """
+        assert pool is not None, "Connection pool must not be None"
+        assert workers > 0, "The number of workers must be greater than 0, not " + str(workers)
+        self._pool = pool
+        self._workers = workers
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="prefetch")
+        self._local = threading.local()
+        self.submitted = 0
+        return
+
+    # ---------------------------------------------------------------------------
+    #  Properties
+    # ---------------------------------------------------------------------------
+
+    @property
+    def workers(self) -> int:
+        """
+        Return the number of threads.
+        """
+        return self._workers
+
+    @property
+    def in_worker(self) -> bool:
+        """
+        Return True if the current thread is one of the threads of this prefetcher.
+        """
+        return getattr(self._local, "active", False)
+
+    # ---------------------------------------------------------------------------
+    #  Operations
+    # ---------------------------------------------------------------------------
+
+    def submit(self, function: Callable[[Any], Any]) -> Optional[Future]:
+        """
+        Start a function of a database connection and return its future.  A function
+        submitted from one of the threads of this prefetcher is not started, because it
+        could wait for a thread that is waiting for it.  None is returned instead, and
+        the caller runs the function itself.
+
+        Arguments:
+            function - a function that takes a database connection
+        """
+        assert function is not None, "Function must not be None"
+        future = None
+        if not self.in_worker:
+            future = self._executor.submit(self._run, function)
+            self.submitted += 1
+        return future
+
+    def close(self):
+        """
+        Cancel the functions that have not started and wait for the others to end.
+        """
+        self._executor.shutdown(wait=True, cancel_futures=True)
+        return
+
+    # ---------------------------------------------------------------------------
+    #  Support Functions
+    # ---------------------------------------------------------------------------
+
+    def _run(self, function: Callable[[Any], Any]) -> Any:
+        """
+        Run a function with a connection checked out of the pool.
+
+        Arguments:
+            function - a function that takes a database connection
+        """
+        self._local.active = True
+        cnx = self._pool.checkout()
+        try:
+            result = function(cnx)
+        finally:
+            cnx.close()
+            self._local.active = False
+        return result
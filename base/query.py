@@ -12,8 +12,15 @@ __version__ = "01-Sep-2021"
 This module executes a SQL query and manages the error handling.
 """
 
+from typing import Iterator, Optional
+
+from base.querycache import QueryCache
+from base.snapshot import QuerySnapshot
 from base.testexception import TestException
 
+DEFAULT_BATCH_SIZE = 500
+DEFAULT_PAGE_SIZE = 500
+
 
 # -------------------------------------------------------------------------------
 #  Manage a query
@@ -24,43 +31,108 @@ class Query:
     """
     Manage a query.  Execute the query and manage the error handling.  Return a
     result of all the returned values.
+
+    The results of the query function can be kept in a query cache.  A cache given to the
+    constructor is used by that instance.  Otherwise, the cache in the class variable
+    default_cache is used, if one has been set.  An instance created with use_cache False
+    always queries the database.
+
+    If a snapshot has been set in the class variable default_snapshot, the results of the
+    query, iter_query, and execute functions are recorded in it or replayed from it.  A
+    snapshot being replayed answers every query without the database or the query cache.
     """
 
+    # ---------------------------------------------------------------------------
+    #  Class Variables
+    # ---------------------------------------------------------------------------
+
+    default_cache: Optional[QueryCache] = None
+    default_snapshot: Optional[QuerySnapshot] = None
+
     # ---------------------------------------------------------------------------
     #  Constructor
     # ---------------------------------------------------------------------------
 
-    def __init__(self, cnx):
+    def __init__(self, cnx, cache: Optional[QueryCache] = None, use_cache: bool = True):
         """
         Initialize the instance of a class.
 
         Argument:
             cnx - a connection to a database
+            cache - the query cache for this instance, or None to use the default cache
+            use_cache - False if the results of this instance are never cached
         """
         assert cnx is not None, "Connection for query must not be null"
         self._cnx = cnx
+        self._cache = cache
+        self._use_cache = use_cache
         return
 
+    # -------------------------------------------------------------------------------
+    # Properties
+    # -------------------------------------------------------------------------------
+
+    @property
+    def cache(self) -> Optional[QueryCache]:
+        """
+        Return the query cache used by this instance, or None if results are not cached.
+        """
+        if not self._use_cache:
+            cache = None
+        elif self._cache is not None:
+            cache = self._cache
+        else:
+            cache = Query.default_cache
+        return cache
+
     # -------------------------------------------------------------------------------
     # Operations
     # -------------------------------------------------------------------------------
 
-    def query(self, statement, *argv):
+    def query(self, statement, *argv, ttl: Optional[float] = None):
         """
         Perform a SQL query against the database that this class is connected to.
-        Return a list of results.
+        Return a list of results.  If there is a query cache, a result stored within
+        the time to live is returned without querying the database.
 
         Arguments:
             statement - an SQL select statement
             argv - a variable number of arguments for the SQL statement
+            ttl - the number of seconds a cached result is valid, or None for the cache default
         """
         assert statement is not None, "The query statement must not be null"
         assert len(statement) > 0, "The query string cannot be an empty string"
+        snapshot = Query.default_snapshot
+        if snapshot is not None and snapshot.replaying:
+            return snapshot.replay(statement, argv)
+        cache = self.cache
+        results = None
+        if cache is not None:
+            results = cache.get(statement, argv, ttl, connection_identity(self._cnx))
+        if results is None:
+            results = self._fetch_all(statement, argv, cache)
+        if snapshot is not None:
+            snapshot.record(statement, argv, results)
+        return results
+
+    def _fetch_all(self, statement, argv: tuple, cache: Optional[QueryCache]):
+        """
+        Perform a SQL query against the database and return a list of results.  Store the
+        results in the cache if there is one.
+
+        Arguments:
+            statement - an SQL select statement
+            argv - the arguments for the SQL statement
+            cache - the query cache, or None
+        """
         cursor = self._cnx.cursor()
         results = None
         try:
             cursor.execute(statement, argv)
             results = cursor.fetchall()
+            if cache is not None:
+                columns = [column[0] for column in cursor.description]
+                cache.put(statement, argv, columns, results, connection_identity(self._cnx))
         except Exception as e:
             message = "Error in query: " + str(e)
             print(message)
@@ -72,6 +144,106 @@ class Query:
                 print("Error in closing cursor: " + str(e))
         return results
 
+    def iter_query(self, statement, *argv, batch_size: int = DEFAULT_BATCH_SIZE) -> Iterator:
+        """
+        Perform a SQL query and yield the results one row at a time.  The rows are fetched
+        from the database in batches of batch_size rows, so only one batch is held in memory.
+        The cursor is closed when the rows are exhausted or when the generator is closed or
+        discarded before the end.
+
+        While the rows are being read, the connection cannot be used for another query
+        unless the database connection supports multiple active result sets.  The rows
+        are not kept in the query cache.  When a snapshot is recorded, the rows that were
+        read are recorded when the cursor is closed.
+
+        Arguments:
+            statement - an SQL select statement
+            argv - a variable number of arguments for the SQL statement
+            batch_size - the number of rows fetched from the database at a time
+        """
+        assert statement is not None, "The query statement must not be null"
+        assert len(statement) > 0, "The query string cannot be an empty string"
+        assert batch_size > 0, "The batch size must be greater than 0, not " + str(batch_size)
+        snapshot = Query.default_snapshot
+        if snapshot is not None and snapshot.replaying:
+            yield from snapshot.replay(statement, argv)
+            return
+        recorded = [] if snapshot is not None else None
+        columns = None
+        cursor = self._cnx.cursor()
+        try:
+            try:
+                cursor.arraysize = batch_size
+                cursor.execute(statement, argv)
+            except Exception as e:
+                message = "Error in query: " + str(e)
+                print(message)
+                raise TestException(message)
+            while True:
+                try:
+                    rows = cursor.fetchmany(batch_size)
+                except Exception as e:
+                    message = "Error in fetching rows: " + str(e)
+                    print(message)
+                    raise TestException(message)
+                if not rows:
+                    break
+                if recorded is not None:
+                    columns = [column[0] for column in cursor.description]
+                    recorded.extend(rows)
+                for row in rows:
+                    yield row
+        finally:
+            try:
+                cursor.close()
+            except Exception as e:
+                print("Error in closing cursor: " + str(e))
+            if recorded is not None:
+                snapshot.record(statement, argv, recorded, columns)
+        return
+
+    def iter_pages(self, statement, *argv, first_key: tuple, key_columns: tuple[str, ...],
+                   page_size: int = DEFAULT_PAGE_SIZE, limit: Optional[int] = None,
+                   ttl: Optional[float] = None) -> Iterator:
+        """
+        Perform a keyset paged SQL query and yield the results one row at a time.  The
+        query is performed once for each page.  Each page continues after the key of the
+        last row of the prior page, so the database reads a range of an index instead of
+        sorting the whole selection, and only one page is held in memory.
+
+        The arguments of the statement are the arguments in argv, followed by the maximum
+        number of rows in the page, followed by the values of the key of the last row of
+        the prior page.  The statement must order the rows by the key columns, and the key
+        must be unique.  The rows of a page are yielded after its cursor is closed, so the
+        connection can be used for other queries while the rows are read.  The pages are
+        kept in the query cache, if there is one.
+
+        Arguments:
+            statement - an SQL select statement
+            argv - a variable number of arguments for the SQL statement
+            first_key - the key values that come before the first row
+            key_columns - the names of the columns that hold the key values of a row
+            page_size - the maximum number of rows in a page
+            limit - the maximum number of rows to yield, or None for all the rows
+            ttl - the number of seconds a cached page is valid, or None for the cache default
+        """
+        assert first_key is not None and len(first_key) > 0, "The first key must not be empty"
+        assert len(key_columns) == len(first_key), "The key columns must match the first key"
+        assert page_size > 0, "The page size must be greater than 0, not " + str(page_size)
+        assert limit is None or limit > 0, "The limit must be greater than 0, not " + str(limit)
+        last_key = tuple(first_key)
+        count = 0
+        while limit is None or count < limit:
+            size = page_size if limit is None else min(page_size, limit - count)
+            page = self.query(statement, *argv, size, *last_key, ttl=ttl)
+            for row in page:
+                yield row
+            count += len(page)
+            if len(page) < size:
+                break
+            last_key = tuple(getattr(page[-1], column) for column in key_columns)
+        return
+
     def execute(self, statement, *argv):
         """
         Execute a stored procedure.  When querying a stored procedure in SQL Server,
@@ -84,6 +256,9 @@ class Query:
         """
         assert statement is not None, "The query statement must not be null"
         assert len(statement) > 0, "The query string cannot be an empty string"
+        snapshot = Query.default_snapshot
+        if snapshot is not None and snapshot.replaying:
+            return snapshot.replay(statement, argv)
         cursor = self._cnx.cursor()
         results = None
         try:
@@ -101,6 +276,8 @@ class Query:
                 cursor.close()
             except Exception as e:
                 print("Error in closing cursor: " + str(e))
+        if snapshot is not None:
+            snapshot.record(statement, argv, results)
         return results
 
     def delete(self, statement, *argv):
@@ -175,3 +352,23 @@ class Query:
             except Exception as e:
                 print("Error in closing cursor: " + str(e))
         return
+
+
+# -------------------------------------------------------------------------------
+#  Functions
+# -------------------------------------------------------------------------------
+
+
+def connection_identity(cnx) -> Optional[str]:
+    """
+    Return the identity of the database of a connection, or None if the connection does
+    not have one.  Pooled connections and SQLite connections have an identity.
+
+    Arguments:
+        cnx - a connection to a database
+    """
+    try:
+        identity = cnx.identity
+    except AttributeError:
+        identity = None
+    return identity if isinstance(identity, str) else None
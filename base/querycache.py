@@ -0,0 +1,339 @@
+# -------------------------------------------------------------------------------
+#
+#  Copyright (c) 2021 Waysys LLC
+#
+# -------------------------------------------------------------------------------
+# -------------------------------------------------------------------------------
+
+__author__ = 'Bill Shaffer'
+__version__ = "16-Oct-2021"
+
+"""
+This module keeps the results of SQL queries in files on the local disk, so that
+a query repeated within its time to live is answered without the database.
+
+Each result is stored in its own file, named by a hash of the database identity of the
+cache and of the connection that ran the query, the SQL statement, and the arguments.  The file holds the column names and the row
+values, pickled and compressed.  When the files exceed the size limit, the least
+recently used files are removed.
+"""
+
+import hashlib
+import os
+import pickle
+import threading
+import time
+import zlib
+from collections import namedtuple
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional
+
+from base.testexception import TestException
+
+DEFAULT_TTL = 3600.0
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+CACHE_SUFFIX = ".qc"
+
+
+# -------------------------------------------------------------------------------
+#  Query Cache
+# -------------------------------------------------------------------------------
+
+
+class QueryCache:
+    """
+    This class stores query results on disk with a time to live and a size limit.
+    """
+
+    # ---------------------------------------------------------------------------
+    #  Constructor
+    # ---------------------------------------------------------------------------
+
+    def __init__(self, directory: str, identity: str,
+                 default_ttl: float = DEFAULT_TTL,
+                 max_bytes: int = DEFAULT_MAX_BYTES,
+                 refresh: bool = False):
+        """
+        Initialize the instance of this class.
+
+        Arguments:
+            directory - the directory holding the cache files.  It is created if necessary.
+            identity - a string identifying the database the results come from
+            default_ttl - the number of seconds a result is valid when the query does not specify a time
+            max_bytes - the maximum total size of the cache files
+            refresh - True if stored results are ignored and replaced by new results
+        """
+        assert directory is not None, "Cache directory must not be None"
+        assert identity is not None, "Database identity must not be None"
+        assert default_ttl >= 0, "Time to live must not be negative: " + str(default_ttl)
+        assert max_bytes > 0, "Maximum size must be greater than zero: " + str(max_bytes)
+        self.directory = Path(directory)
+        self.identity = identity
+        self.default_ttl = default_ttl
+        self.max_bytes = max_bytes
+        self.refresh = refresh
+        self.hits = 0
+        self.misses = 0
+        self.expirations = 0
+        self.stores = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+        except OSError as e:
+            raise TestException("Unable to create cache directory " + str(directory) + ": " + str(e))
+        self._total_bytes = sum(size for path, size, used in self._entries())
+        return
+
+    # ---------------------------------------------------------------------------
+    #  Properties
+    # ---------------------------------------------------------------------------
+
+    @property
+    def total_bytes(self) -> int:
+        """
+        Return the total size of the cache files.
+        """
+        return self._total_bytes
+
+    # ---------------------------------------------------------------------------
+    #  Operations
+    # ---------------------------------------------------------------------------
+
+    def key(self, statement: str, argv: tuple, source: Optional[str] = None) -> str:
+        """
+        Return the key of a query result.
+
+        Arguments:
+            statement - the SQL statement
+            argv - the arguments of the statement
+            source - the identity of the database of the connection that ran the query, or None
+        """
+        text = self.identity + "\n" + (source or "") + "\n" + statement + "\n" + repr(tuple(argv))
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def get(self, statement: str, argv: tuple, ttl: Optional[float] = None,
+            source: Optional[str] = None) -> Optional[list]:
+        """
+        Return the stored rows of a query, or None if there is no result younger than the
+        time to live.
+
+        Arguments:
+            statement - the SQL statement
+            argv - the arguments of the statement
+            ttl - the number of seconds the result is valid, or None for the default
+            source - the identity of the database of the connection that ran the query, or None
+        """
+        if ttl is None:
+            ttl = self.default_ttl
+        path = self._path(self.key(statement, argv, source))
+        rows = None
+        if not self.refresh:
+            entry = self._read(path)
+            if entry is not None:
+                if time.time() - entry["created"] <= ttl:
+                    rows = make_rows(entry["columns"], entry["rows"])
+                    self._touch(path)
+                else:
+                    with self._lock:
+                        self.expirations += 1
+        with self._lock:
+            if rows is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return rows
+
+    def put(self, statement: str, argv: tuple, columns: list[str], rows: list, source: Optional[str] = None):
+        """
+        Store the rows of a query.
+
+        Arguments:
+            statement - the SQL statement
+            argv - the arguments of the statement
+            columns - the names of the columns of the result
+            rows - the rows of the result
+            source - the identity of the database of the connection that ran the query, or None
+        """
+        entry = {
+            "created": time.time(),
+            "columns": list(columns),
+            "rows": [tuple(row) for row in rows]
+        }
+        data = zlib.compress(pickle.dumps(entry, pickle.HIGHEST_PROTOCOL))
+        path = self._path(self.key(statement, argv, source))
+        temp_path = path.with_suffix(".tmp" + str(os.getpid()) + "_" + str(threading.get_ident()))
+        try:
+            prior_size = path.stat().st_size if path.exists() else 0
+            with open(temp_path, "wb") as file:
+                file.write(data)
+            os.replace(temp_path, path)
+        except OSError as e:
+            print("Error in storing query result: " + str(e))
+            return
+        with self._lock:
+            self.stores += 1
+            self._total_bytes += len(data) - prior_size
+            over_limit = self._total_bytes > self.max_bytes
+        if over_limit:
+            self.evict()
+        return
+
+    def evict(self):
+        """
+        Remove the least recently used files until the cache is within its size limit.
+        """
+        entries = sorted(self._entries(), key=lambda entry: entry[2])
+        total = sum(size for path, size, used in entries)
+        evicted = 0
+        for path, size, used in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                path.unlink()
+                evicted += 1
+            except OSError:
+                pass
+            total -= size
+        with self._lock:
+            self._total_bytes = total
+            self.evictions += evicted
+        return
+
+    def clear(self):
+        """
+        Remove every file from the cache.
+        """
+        for path, size, used in self._entries():
+            try:
+                path.unlink()
+            except OSError:
+                pass
+        with self._lock:
+            self._total_bytes = 0
+        return
+
+    def report(self) -> str:
+        """
+        Return a one line summary of the cache counters.
+        """
+        summary = "hits: " + str(self.hits) + \
+                  "  misses: " + str(self.misses) + \
+                  "  expired: " + str(self.expirations) + \
+                  "  stored: " + str(self.stores) + \
+                  "  evicted: " + str(self.evictions) + \
+                  "  size: " + str(self._total_bytes) + " bytes"
+        return summary
+
+    # ---------------------------------------------------------------------------
+    #  Support Functions
+    # ---------------------------------------------------------------------------
+
+    def _path(self, key: str) -> Path:
+        """
+        Return the path of the file for a key.
+
+        Arguments:
+            key - the key of a query result
+        """
+        return self.directory / (key + CACHE_SUFFIX)
+
+    def _entries(self) -> list[tuple[Path, int, float]]:
+        """
+        Return the path, size, and time of last use of each cache file.
+        """
+        entries = []
+        for path in self.directory.glob("*" + CACHE_SUFFIX):
+            try:
+                status = path.stat()
+                entries.append((path, status.st_size, status.st_mtime))
+            except OSError:
+                pass
+        return entries
+
+    @staticmethod
+    def _read(path: Path) -> Optional[dict]:
+        """
+        Return the entry stored in a cache file, or None if the file does not exist or
+        cannot be read.
+
+        Arguments:
+            path - the path of the cache file
+        """
+        entry = None
+        try:
+            with open(path, "rb") as file:
+                data = file.read()
+            entry = pickle.loads(zlib.decompress(data))
+        except FileNotFoundError:
+            entry = None
+        except Exception as e:
+            print("Error in reading query cache file " + str(path) + ": " + str(e))
+            entry = None
+        return entry
+
+    @staticmethod
+    def _touch(path: Path):
+        """
+        Record the use of a cache file by updating its modification time.
+
+        Arguments:
+            path - the path of the cache file
+        """
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return
+
+
+# -------------------------------------------------------------------------------
+#  Row Functions
+# -------------------------------------------------------------------------------
+
+
+@lru_cache(maxsize=256)
+def row_type(columns: tuple[str, ...]):
+    """
+    Return a named tuple type with a field for each column, so that the values of a row
+    can be accessed by column name in the same way as a pyodbc row.
+
+    Arguments:
+        columns - the names of the columns
+    """
+    return namedtuple("Row", columns, rename=True)
+
+
+def make_rows(columns: list[str], values: list[tuple]) -> list:
+    """
+    Return a list of rows with the specified columns and values.
+
+    Arguments:
+        columns - the names of the columns
+        values - a list of tuples of values
+    """
+    row_class = row_type(tuple(columns))
+    return [row_class._make(value) for value in values]
+
+
+def row_columns(row) -> list[str]:
+    """
+    Return the column names of a row from a pyodbc cursor or from the query cache.
+
+    Arguments:
+        row - a row of a query result
+    """
+    if hasattr(row, "_fields"):
+        columns = list(row._fields)
+    else:
+        columns = [column[0] for column in row.cursor_description]
+    return columns
+
+
+def default_cache_directory() -> str:
+    """
+    Return the directory for the query cache from the environment variable ENV_QUERY_CACHE_DIR,
+    or a directory in the home directory.
+    """
+    return os.getenv("ENV_QUERY_CACHE_DIR", str(Path.home() / ".bcgen_cache" / "queries"))
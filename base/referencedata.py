@@ -0,0 +1,244 @@
+# -------------------------------------------------------------------------------
+#
+#  Copyright (c) 2021 Waysys LLC
+#
+# -------------------------------------------------------------------------------
+# -------------------------------------------------------------------------------
+
+__author__ = 'Bill Shaffer'
+__version__ = "13-Oct-2021"
+
+"""
+This module keeps reference data, such as producer codes and payment plans, in memory
+and on the local disk.  Reference data changes slowly, so it is kept apart from the
+results of queries of transactional data.
+
+Each data set has a version, computed by a small query such as the count of rows and the
+latest update time of the underlying table.  A data set is read again from the database
+when its version changes or when it is older than the maximum age.  The version is
+checked at most once in each check interval.
+"""
+
+import hashlib
+import os
+import pickle
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import Callable, Optional
+
+from base.querycache import make_rows, row_columns
+from base.testexception import TestException
+
+DEFAULT_CHECK_INTERVAL = 15 * 60.0
+DEFAULT_MAX_AGE = 24 * 3600.0
+REFERENCE_SUFFIX = ".rd"
+
+
+# -------------------------------------------------------------------------------
+#  Reference Data Store
+# -------------------------------------------------------------------------------
+
+
+class ReferenceDataStore:
+    """
+    This class holds data sets of reference data for one database.
+    """
+
+    # ---------------------------------------------------------------------------
+    #  Class Variables
+    # ---------------------------------------------------------------------------
+
+    default_store: Optional["ReferenceDataStore"] = None
+
+    # ---------------------------------------------------------------------------
+    #  Constructor
+    # ---------------------------------------------------------------------------
+
+    def __init__(self, directory: str, identity: str,
+                 check_interval: float = DEFAULT_CHECK_INTERVAL,
+                 max_age: float = DEFAULT_MAX_AGE,
+                 refresh: bool = False):
+        """
+        Initialize the instance of this class.
+
+        Arguments:
+            directory - the directory holding the data set files.  It is created if necessary.
+            identity - a string identifying the database the data comes from
+            check_interval - the number of seconds between checks of the version of a data set
+            max_age - the number of seconds after which a data set is read again
+            refresh - True if each data set is read from the database the first time it is used
+        """
+        assert directory is not None, "Reference data directory must not be None"
+        assert identity is not None, "Database identity must not be None"
+        assert check_interval >= 0, "Check interval must not be negative: " + str(check_interval)
+        assert max_age >= 0, "Maximum age must not be negative: " + str(max_age)
+        self.directory = Path(directory)
+        self.identity = identity
+        self.check_interval = check_interval
+        self.max_age = max_age
+        self.refresh = refresh
+        self.hits = 0
+        self.checks = 0
+        self.loads = 0
+        self._entries: dict[str, dict] = {}
+        self._refreshed: set[str] = set()
+        self._lock = threading.RLock()
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+        except OSError as e:
+            raise TestException("Unable to create reference data directory " + str(directory) + ": " + str(e))
+        return
+
+    # ---------------------------------------------------------------------------
+    #  Operations
+    # ---------------------------------------------------------------------------
+
+    def get(self, name: str, load: Callable[[], list], version: Callable[[], tuple]) -> list:
+        """
+        Return the rows of a data set.  The rows are read with the load function when the
+        data set is not held, its version has changed, or it is older than the maximum age.
+
+        Arguments:
+            name - the name of the data set
+            load - a function that reads the rows of the data set from the database
+            version - a function that returns the current version of the data set
+        """
+        assert name is not None and len(name) > 0, "Data set name must not be empty"
+        with self._lock:
+            now = time.time()
+            entry = self._entries.get(name)
+            if entry is None:
+                entry = self._read(name)
+            if self.refresh and name not in self._refreshed:
+                entry = None
+                self._refreshed.add(name)
+            if entry is not None and now - entry["loaded"] > self.max_age:
+                entry = None
+            if entry is not None and now - entry["checked"] > self.check_interval:
+                self.checks += 1
+                if tuple(version()) == entry["version"]:
+                    entry["checked"] = now
+                    self._write(name, entry)
+                else:
+                    entry = None
+            if entry is None:
+                entry = self._load(name, load, version)
+            else:
+                self.hits += 1
+            self._entries[name] = entry
+            rows = make_rows(entry["columns"], entry["rows"])
+        return rows
+
+    def invalidate(self, name: str):
+        """
+        Discard a data set, so that it is read from the database when it is next used.
+
+        Arguments:
+            name - the name of the data set
+        """
+        with self._lock:
+            self._entries.pop(name, None)
+            try:
+                self._path(name).unlink()
+            except OSError:
+                pass
+        return
+
+    def report(self) -> str:
+        """
+        Return a one line summary of the store counters.
+        """
+        summary = "from memory or disk: " + str(self.hits) + \
+                  "  version checks: " + str(self.checks) + \
+                  "  loaded: " + str(self.loads)
+        return summary
+
+    # ---------------------------------------------------------------------------
+    #  Support Functions
+    # ---------------------------------------------------------------------------
+
+    def _load(self, name: str, load: Callable[[], list], version: Callable[[], tuple]) -> dict:
+        """
+        Read a data set from the database and save it.  The version is read first, so
+        a change made while the rows are read causes the data set to be read again.
+
+        Arguments:
+            name - the name of the data set
+            load - a function that reads the rows of the data set from the database
+            version - a function that returns the current version of the data set
+        """
+        current_version = tuple(version())
+        rows = list(load())
+        now = time.time()
+        entry = {
+            "version": current_version,
+            "loaded": now,
+            "checked": now,
+            "columns": row_columns(rows[0]) if len(rows) > 0 else [],
+            "rows": [tuple(row) for row in rows]
+        }
+        self.loads += 1
+        self._write(name, entry)
+        return entry
+
+    def _path(self, name: str) -> Path:
+        """
+        Return the path of the file for a data set.
+
+        Arguments:
+            name - the name of the data set
+        """
+        key = hashlib.sha256((self.identity + "\n" + name).encode("utf-8")).hexdigest()
+        return self.directory / (name + "_" + key[:16] + REFERENCE_SUFFIX)
+
+    def _read(self, name: str) -> Optional[dict]:
+        """
+        Return the data set saved on disk, or None if there is none.
+
+        Arguments:
+            name - the name of the data set
+        """
+        path = self._path(name)
+        entry = None
+        try:
+            with open(path, "rb") as file:
+                entry = pickle.loads(zlib.decompress(file.read()))
+        except FileNotFoundError:
+            entry = None
+        except Exception as e:
+            print("Error in reading reference data file " + str(path) + ": " + str(e))
+            entry = None
+        return entry
+
+    def _write(self, name: str, entry: dict):
+        """
+        Save a data set on disk.
+
+        Arguments:
+            name - the name of the data set
+            entry - the version, times, columns, and rows of the data set
+        """
+        path = self._path(name)
+        temp_path = path.with_suffix(".tmp" + str(os.getpid()) + "_" + str(threading.get_ident()))
+        try:
+            with open(temp_path, "wb") as file:
+                file.write(zlib.compress(pickle.dumps(entry, pickle.HIGHEST_PROTOCOL)))
+            os.replace(temp_path, path)
+        except OSError as e:
+            print("Error in saving reference data: " + str(e))
+        return
+
+
+# -------------------------------------------------------------------------------
+#  Functions
+# -------------------------------------------------------------------------------
+
+
+def default_reference_directory() -> str:
+    """
+    Return the directory for reference data from the environment variable ENV_REFERENCE_DATA_DIR,
+    or a directory in the home directory.
+    """
+    return os.getenv("ENV_REFERENCE_DATA_DIR", str(Path.home() / ".bcgen_cache" / "reference"))
@@ -0,0 +1,310 @@
+# -------------------------------------------------------------------------------
+#
+#  Copyright (c) 2021 Waysys LLC
+#
+# -------------------------------------------------------------------------------
+# -------------------------------------------------------------------------------
+
+__author__ = 'Bill Shaffer'
+__version__ = "15-Oct-2021"
+
+"""
+This module records the results of queries in a snapshot file and replays them later
+without a database.  A snapshot is recorded while test cases are generated from the
+database.  Test cases can then be generated again from the snapshot, for example while
+templates are changed, without any load on the database.
+
+A result is replayed only for the same statement and arguments it was recorded for, and
+a query without such a result is an error.  Some arguments, such as dates derived from
+the current time, differ from run to run.  A snapshot can be replayed by order, so that
+when there is no result for the arguments, the results recorded for the same statement
+are replayed in the order they were recorded.  Each such substitution is reported.
+"""
+
+import hashlib
+import os
+import pickle
+import threading
+import time
+import zlib
+from collections import defaultdict, deque
+from pathlib import Path
+from typing import Optional
+
+from base.querycache import make_rows, row_columns
+from base.testexception import TestException
+
+SNAPSHOT_FORMAT = 1
+
+
+# -------------------------------------------------------------------------------
+#  Query Snapshot
+# -------------------------------------------------------------------------------
+
+
+class QuerySnapshot:
+    """
+    This class records query results or replays recorded query results.
+    """
+
+    # ---------------------------------------------------------------------------
+    #  Constructor
+    # ---------------------------------------------------------------------------
+
+    def __init__(self, path: str, replaying: bool = False, by_order: bool = False):
+        """
+        Initialize the instance of this class.  A snapshot being replayed is read from
+        its file.  A snapshot being recorded is written to its file by the save function.
+
+        Arguments:
+            path - the path of the snapshot file
+            replaying - True to replay the results in the file, False to record results
+            by_order - True to replay the results recorded for a statement in order when
+               there is no result for the arguments of a query
+        """
+        assert path is not None, "Snapshot path must not be None"
+        assert replaying or not by_order, "Only a snapshot being replayed can be replayed by order"
+        self.path = Path(path)
+        self.replaying = replaying
+        self.by_order = by_order
+        self.recorded = 0
+        self.replayed = 0
+        self.replayed_in_order = 0
+        self._statements: list[str] = []
+        self._statement_index: dict[str, int] = {}
+        self._results: list[tuple] = []
+        self._by_key: dict[str, deque] = defaultdict(deque)
+        self._by_statement: dict[int, deque] = defaultdict(deque)
+        self._used: set[int] = set()
+        self._lock = threading.Lock()
+        if replaying:
+            self._load()
+        return
+
+    # ---------------------------------------------------------------------------
+    #  Operations
+    # ---------------------------------------------------------------------------
+
+    def record(self, statement: str, argv: tuple, rows: list, columns: Optional[list[str]] = None):
+        """
+        Record the rows returned by a query.
+
+        Arguments:
+            statement - the SQL statement
+            argv - the arguments of the statement
+            rows - the rows of the result
+            columns - the names of the columns, or None to take them from the first row
+        """
+        assert not self.replaying, "A snapshot being replayed cannot record results"
+        if columns is None:
+            columns = row_columns(rows[0]) if len(rows) > 0 else []
+        with self._lock:
+            index = self._statement_index.get(statement)
+            if index is None:
+                index = len(self._statements)
+                self._statements.append(statement)
+                self._statement_index[statement] = index
+            self._results.append((index, result_key(statement, argv), list(columns),
+                                  [tuple(row) for row in rows]))
+            self.recorded += 1
+        return
+
+    def replay(self, statement: str, argv: tuple) -> list:
+        """
+        Return the rows recorded for a query.  Raise an exception if no result was recorded
+        for the statement and arguments, unless the snapshot is replayed by order and a
+        result was recorded for the statement.
+
+        Arguments:
+            statement - the SQL statement
+            argv - the arguments of the statement
+        """
+        assert self.replaying, "A snapshot being recorded cannot replay results"
+        with self._lock:
+            position = self._next(self._by_key.get(result_key(statement, argv)))
+            if position is None:
+                index = self._statement_index.get(statement) if self.by_order else None
+                position = self._next(self._by_statement.get(index)) if index is not None else None
+                if position is None:
+                    raise TestException("The snapshot " + str(self.path) + " has no result for the query: " +
+                                        statement.strip() + " with arguments " + repr(tuple(argv)))
+                print("Query snapshot - no result for arguments " + repr(tuple(argv)) +
+                      ", replaying recorded result " + str(position + 1) + " by order for the query: " +
+                      " ".join(statement.split())[:120])
+                self.replayed_in_order += 1
+            self.replayed += 1
+            index, key, columns, values = self._results[position]
+        return make_rows(columns, values)
+
+    def save(self):
+        """
+        Write the recorded results to the snapshot file.
+        """
+        assert not self.replaying, "A snapshot being replayed cannot be saved"
+        with self._lock:
+            write_snapshot(self.path, self._statements, self._results)
+        return
+
+    def report(self) -> str:
+        """
+        Return a one line summary of the snapshot counters.
+        """
+        if self.replaying:
+            summary = "replayed: " + str(self.replayed) + \
+                      "  by order: " + str(self.replayed_in_order) + \
+                      "  file: " + str(self.path)
+        else:
+            summary = "recorded: " + str(self.recorded) + \
+                      "  statements: " + str(len(self._statements)) + \
+                      "  file: " + str(self.path)
+        return summary
+
+    # ---------------------------------------------------------------------------
+    #  Support Functions
+    # ---------------------------------------------------------------------------
+
+    def _next(self, positions: Optional[deque]) -> Optional[int]:
+        """
+        Return the position of the first result in a queue that has not been replayed, or
+        None if there is none.  When every result in the queue has been replayed, the last
+        one is returned again, since a repeated query returns the same result.
+
+        Arguments:
+            positions - the positions of recorded results, in the order they were recorded
+        """
+        result = None
+        if positions:
+            while len(positions) > 1 and positions[0] in self._used:
+                positions.popleft()
+            result = positions[0]
+            self._used.add(result)
+        return result
+
+    def _load(self):
+        """
+        Read the recorded results from the snapshot file.
+        """
+        statements, results = read_snapshot(self.path)
+        self._statements = statements
+        self._statement_index = {statement: index for index, statement in enumerate(statements)}
+        self._results = results
+        for position, (index, key, columns, values) in enumerate(results):
+            self._by_key[key].append(position)
+            self._by_statement[index].append(position)
+        return
+
+
+# -------------------------------------------------------------------------------
+#  Snapshot Connection
+# -------------------------------------------------------------------------------
+
+
+class SnapshotConnection:
+    """
+    This class stands in for a database connection while a snapshot is replayed.  Every
+    query is answered from the snapshot, so the connection is never used for a query.
+    """
+
+    def cursor(self):
+        """
+        Raise an exception, since there is no database.
+        """
+        raise TestException("There is no database connection while a snapshot is replayed")
+
+    def close(self):
+        """
+        Close the connection.  There is nothing to close.
+        """
+        return
+
+
+# -------------------------------------------------------------------------------
+#  Functions
+# -------------------------------------------------------------------------------
+
+
+def result_key(statement: str, argv: tuple) -> str:
+    """
+    Return the key of the result of a query.
+
+    Arguments:
+        statement - the SQL statement
+        argv - the arguments of the statement
+    """
+    text = statement + "\n" + repr(tuple(argv))
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def read_snapshot(path: Path) -> tuple[list[str], list[tuple]]:
+    """
+    Return the statements and results in a snapshot file.
+
+    Arguments:
+        path - the path of the snapshot file
+    """
+    try:
+        with open(path, "rb") as file:
+            content = pickle.loads(zlib.decompress(file.read()))
+    except Exception as e:
+        raise TestException("Unable to read snapshot " + str(path) + ": " + str(e))
+    if content.get("format") != SNAPSHOT_FORMAT:
+        raise TestException("Unsupported snapshot format in " + str(path) + ": " + str(content.get("format")))
+    return content["statements"], content["results"]
+
+
+def write_snapshot(path: Path, statements: list[str], results: list[tuple]):
+    """
+    Write statements and results to a snapshot file.
+
+    Arguments:
+        path - the path of the snapshot file
+        statements - the SQL statements
+        results - the results, each with the index of its statement, its key, its columns,
+           and its rows
+    """
+    content = {
+        "format": SNAPSHOT_FORMAT,
+        "created": time.time(),
+        "statements": statements,
+        "results": results
+    }
+    temp_path = path.with_suffix(path.suffix + ".tmp" + str(os.getpid()))
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(temp_path, "wb") as file:
+            file.write(zlib.compress(pickle.dumps(content, pickle.HIGHEST_PROTOCOL)))
+        os.replace(temp_path, path)
+    except OSError as e:
+        raise TestException("Unable to write snapshot " + str(path) + ": " + str(e))
+    return
+
+
+def merge_snapshots(path: str, part_paths: list[str]):
+    """
+    Combine the snapshot files recorded by several processes into one snapshot file
+    and remove the part files.
+
+    Arguments:
+        path - the path of the combined snapshot file
+        part_paths - the paths of the snapshot files to combine, in the order to replay them
+    """
+    statements: list[str] = []
+    statement_index: dict[str, int] = {}
+    results: list[tuple] = []
+    for part_path in part_paths:
+        if not Path(part_path).exists():
+            continue
+        part_statements, part_results = read_snapshot(Path(part_path))
+        for index, key, columns, values in part_results:
+            statement = part_statements[index]
+            if statement not in statement_index:
+                statement_index[statement] = len(statements)
+                statements.append(statement)
+            results.append((statement_index[statement], key, columns, values))
+    write_snapshot(Path(path), statements, results)
+    for part_path in part_paths:
+        try:
+            os.remove(part_path)
+        except OSError:
+            pass
+    return
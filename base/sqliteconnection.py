@@ -0,0 +1,476 @@
+# -------------------------------------------------------------------------------
+#
+#  Copyright (c) 2021 Waysys LLC
+#
+# -------------------------------------------------------------------------------
+# -------------------------------------------------------------------------------
+
+__author__ = 'Bill Shaffer'
+__version__ = "16-Oct-2021"
+
+"""
+This module connects to a SQLite database that stands in for a SQL Server database.
+The connection looks like a pyodbc connection to the queries.  Each statement is
+translated from the T-SQL used by the queries to SQLite before it is executed:
+
+    DECLARE @Name TYPE = ?      the declaration is removed and @Name becomes the
+                                named parameter :Name, bound to the argument in the
+                                position of the declaration
+    SELECT TOP (@NumberRows)    becomes a LIMIT clause at the end of the statement
+    HASHBYTES sample bucket     becomes a call of the sample_bucket function, which
+                                computes the same bucket as SQL Server
+
+Dates and times are stored as ISO 8601 text in columns declared DATE or DATETIME, and
+are returned as datetime values, as they are from SQL Server.  Amounts are stored in
+columns declared MONEY and are returned as decimal values with two decimal places.  Each
+connection reads the declared types of the columns from the schema, and converts a value
+of the result when the column of the result is a column of a table, selected by name or
+with an alias.  The converters of the sqlite3 module are not used, so other users of the
+module are not affected.
+"""
+
+import re
+import sqlite3
+from datetime import date, datetime
+from decimal import Decimal
+from functools import lru_cache
+from typing import Any, Iterable, Optional
+
+from base.querycache import make_rows
+from base.testrandom import sample_bucket
+
+#
+# The declaration of a T-SQL parameter, such as DECLARE @SelectionEnd DATE = ?
+#
+DECLARATION_PATTERN = re.compile(r"^[ \t]*DECLARE[ \t]+@(\w+)[ \t]+(\w+)(?:\([^)]*\))?[ \t]*=[ \t]*\?[ \t]*\n?",
+                                 re.IGNORECASE | re.MULTILINE)
+
+#
+# The row limit of a T-SQL select, such as SELECT TOP (@NumberRows)
+#
+TOP_PATTERN = re.compile(r"\bTOP[ \t]*\([ \t]*(@?\w+)[ \t]*\)", re.IGNORECASE)
+
+#
+# The T-SQL expression that assigns a row to a pseudo-random sample bucket
+#
+SAMPLE_BUCKET_PATTERN = re.compile(
+    r"CONVERT\(BIGINT, CONVERT\(BINARY\(4\), HASHBYTES\('SHA2_256', CONCAT\(([\w.@]+), ':', ([\w.@]+)\)\)\)\)",
+    re.IGNORECASE)
+
+PARAMETER_PATTERN = re.compile(r"@(\w+)")
+
+#
+# A column of a table given an alias in a select list, such as pp.periodstart AS PeriodStart
+#
+ALIAS_PATTERN = re.compile(r"(?<![\w.@\]])(?:\[?\w+\]?\.)?\[?(\w+)\]?[ \t]+AS[ \t]+\[?(\w+)\]?", re.IGNORECASE)
+
+#
+# The T-SQL types whose parameters are compared with dates without a time
+#
+DATE_TYPES = ("DATE",)
+
+CENTS = Decimal("0.01")
+
+
+# -------------------------------------------------------------------------------
+#  SQLite Connection
+# -------------------------------------------------------------------------------
+
+
+class SQLiteConnection:
+    """
+    This class is a connection to a SQLite database with the operations of a pyodbc
+    connection that the queries use.
+    """
+
+    # ---------------------------------------------------------------------------
+    #  Constructor
+    # ---------------------------------------------------------------------------
+
+    def __init__(self, path: str):
+        """
+        Open the database.  A connection may be used by more than one thread, one thread
+        at a time, as a connection checked out of a connection pool is.
+
+        Arguments:
+            path - the path of the SQLite database file
+        """
+        assert path is not None, "Database path must not be None"
+        assert len(path) > 0, "Database path must not be empty"
+        self.path = path
+        self._cnx = sqlite3.connect(path, check_same_thread=False)
+        self._cnx.create_function("sample_bucket", 2, sample_bucket, deterministic=True)
+        self._schema_version: Optional[int] = None
+        self._declared_types: dict[str, str] = {}
+        self._converters: dict[tuple, tuple] = {}
+        return
+
+    # ---------------------------------------------------------------------------
+    #  Properties
+    # ---------------------------------------------------------------------------
+
+    @property
+    def identity(self) -> str:
+        """
+        Return the identity of the database, as the database definition forms it.
+        """
+        return "SQLite:local/" + self.path
+
+    # ---------------------------------------------------------------------------
+    #  Operations
+    # ---------------------------------------------------------------------------
+
+    def cursor(self) -> "SQLiteCursor":
+        """
+        Return a new cursor of this connection.
+        """
+        return SQLiteCursor(self, self._cnx.cursor())
+
+    def execute(self, statement: str, *argv) -> "SQLiteCursor":
+        """
+        Execute a statement on a new cursor and return the cursor.
+
+        Arguments:
+            statement - the T-SQL statement
+            argv - the arguments of the statement
+        """
+        return self.cursor().execute(statement, *argv)
+
+    def converters(self, sql: str, columns: list[str]) -> tuple:
+        """
+        Return the function that converts the values of each column of a result, or None
+        for a column whose values are returned as they are stored.  The declared types of
+        the columns of the tables are read again when the schema has changed.
+
+        Arguments:
+            sql - the translated statement
+            columns - the names of the columns of the result
+        """
+        schema_version = self._cnx.execute("PRAGMA schema_version").fetchone()[0]
+        if schema_version != self._schema_version:
+            self._declared_types = read_declared_types(self._cnx)
+            self._converters = {}
+            self._schema_version = schema_version
+        key = (sql, tuple(columns))
+        result = self._converters.get(key)
+        if result is None:
+            sources = source_columns(sql)
+            result = tuple(CONVERTERS.get(self._declared_types.get(resolve_column(column, sources)))
+                           for column in columns)
+            self._converters[key] = result
+        return result
+
+    def commit(self):
+        """
+        Commit the current transaction.
+        """
+        self._cnx.commit()
+        return
+
+    def rollback(self):
+        """
+        Roll back the current transaction.
+        """
+        self._cnx.rollback()
+        return
+
+    def close(self):
+        """
+        Close the database.
+        """
+        self._cnx.close()
+        return
+
+
+# -------------------------------------------------------------------------------
+#  SQLite Cursor
+# -------------------------------------------------------------------------------
+
+
+class SQLiteCursor:
+    """
+    This class is a cursor of a SQLite connection.  The rows are named tuples, so that
+    the columns can be read by name as they are from a pyodbc row.
+    """
+
+    # ---------------------------------------------------------------------------
+    #  Constructor
+    # ---------------------------------------------------------------------------
+
+    def __init__(self, connection: SQLiteConnection, cursor: sqlite3.Cursor):
+        """
+        Initialize the instance of this class.
+
+        Arguments:
+            connection - the connection of the cursor
+            cursor - the SQLite cursor
+        """
+        self.connection = connection
+        self.arraysize = 1
+        self._cursor = cursor
+        self._columns: list[str] = []
+        self._converters: tuple = ()
+        return
+
+    # ---------------------------------------------------------------------------
+    #  Properties
+    # ---------------------------------------------------------------------------
+
+    @property
+    def description(self) -> Optional[tuple]:
+        """
+        Return the description of the columns of the result, or None if the last
+        statement did not return rows.
+        """
+        return self._cursor.description
+
+    @property
+    def rowcount(self) -> int:
+        """
+        Return the number of rows changed by the last statement.
+        """
+        return self._cursor.rowcount
+
+    # ---------------------------------------------------------------------------
+    #  Operations
+    # ---------------------------------------------------------------------------
+
+    def execute(self, statement: str, *argv) -> "SQLiteCursor":
+        """
+        Translate and execute a statement.  The arguments may be given one by one or as
+        a single sequence, as they may be to a pyodbc cursor.
+
+        Arguments:
+            statement - the T-SQL statement
+            argv - the arguments of the statement
+        """
+        sql, declarations = translate_statement(statement)
+        self._cursor.execute(sql, bind_arguments(declarations, flatten_arguments(argv)))
+        self._columns = [column[0] for column in self._cursor.description] if self._cursor.description else []
+        converters = self.connection.converters(sql, self._columns) if len(self._columns) > 0 else ()
+        self._converters = converters if any(converter is not None for converter in converters) else ()
+        return self
+
+    def executemany(self, statement: str, rows: Iterable):
+        """
+        Translate a statement and execute it once for each sequence of arguments.
+
+        Arguments:
+            statement - the T-SQL statement
+            rows - the sequences of arguments
+        """
+        sql, declarations = translate_statement(statement)
+        self._cursor.executemany(sql, (bind_arguments(declarations, tuple(row)) for row in rows))
+        self._columns = []
+        self._converters = ()
+        return
+
+    def fetchone(self) -> Optional[Any]:
+        """
+        Return the next row of the result, or None if there are no more rows.
+        """
+        row = self._cursor.fetchone()
+        return make_rows(self._columns, self._convert([row]))[0] if row is not None else None
+
+    def fetchmany(self, size: Optional[int] = None) -> list:
+        """
+        Return the next rows of the result.
+
+        Arguments:
+            size - the maximum number of rows, or None for the array size of the cursor
+        """
+        return make_rows(self._columns,
+                         self._convert(self._cursor.fetchmany(size if size is not None else self.arraysize)))
+
+    def fetchall(self) -> list:
+        """
+        Return the remaining rows of the result.
+        """
+        return make_rows(self._columns, self._convert(self._cursor.fetchall()))
+
+    def commit(self):
+        """
+        Commit the current transaction of the connection.
+        """
+        self.connection.commit()
+        return
+
+    def close(self):
+        """
+        Close the cursor.
+        """
+        self._cursor.close()
+        return
+
+    # ---------------------------------------------------------------------------
+    #  Support Functions
+    # ---------------------------------------------------------------------------
+
+    def _convert(self, rows: list) -> list:
+        """
+        Return the rows with the values of the columns of declared types converted.
+
+        Arguments:
+            rows - the rows read from the SQLite cursor
+        """
+        if len(self._converters) > 0:
+            rows = [tuple(value if converter is None or value is None else converter(value)
+                          for converter, value in zip(self._converters, row)) for row in rows]
+        return rows
+
+
+# -------------------------------------------------------------------------------
+#  Functions
+# -------------------------------------------------------------------------------
+
+
+@lru_cache(maxsize=256)
+def translate_statement(statement: str) -> tuple[str, tuple[tuple[str, str], ...]]:
+    """
+    Return a T-SQL statement translated to SQLite and the names and types of its declared
+    parameters, in the order of their declarations.
+
+    Arguments:
+        statement - the T-SQL statement
+    """
+    declarations = tuple((name, sql_type.upper()) for name, sql_type in DECLARATION_PATTERN.findall(statement))
+    sql = DECLARATION_PATTERN.sub("", statement)
+    sql = SAMPLE_BUCKET_PATTERN.sub(r"sample_bucket(\1, \2)", sql)
+    limit = TOP_PATTERN.search(sql)
+    if limit is not None:
+        assert len(TOP_PATTERN.findall(sql)) == 1, "Only one TOP clause can be translated"
+        sql = sql[:limit.start()] + sql[limit.end():]
+        sql = sql.rstrip().rstrip(";") + "\nLIMIT " + limit.group(1)
+    sql = PARAMETER_PATTERN.sub(r":\1", sql)
+    return sql.strip(), declarations
+
+
+def flatten_arguments(argv: tuple) -> tuple:
+    """
+    Return the arguments of a statement as one tuple.  A single list or tuple holds the
+    arguments, as it may for a pyodbc cursor.
+
+    Arguments:
+        argv - the arguments given to execute
+    """
+    if len(argv) == 1 and isinstance(argv[0], (list, tuple)):
+        argv = tuple(argv[0])
+    return argv
+
+
+def bind_arguments(declarations: tuple[tuple[str, str], ...], argv: tuple):
+    """
+    Return the parameters of a translated statement.  A statement with declared parameters
+    takes a dictionary of the named parameters.  A statement without declarations takes
+    its arguments in order.
+
+    Arguments:
+        declarations - the names and types of the declared parameters
+        argv - the arguments of the statement
+    """
+    if len(declarations) > 0:
+        assert len(argv) == len(declarations), \
+            "Statement declares " + str(len(declarations)) + " parameters but has " + str(len(argv)) + " arguments"
+        result = {name: convert_argument(value, sql_type in DATE_TYPES)
+                  for (name, sql_type), value in zip(declarations, argv)}
+    else:
+        result = tuple(convert_argument(value, False) for value in argv)
+    return result
+
+
+def convert_argument(value: Any, date_only: bool) -> Any:
+    """
+    Return an argument as a value that SQLite stores and compares as SQL Server does.
+    Dates and times become ISO 8601 text, which sorts in time order.
+
+    Arguments:
+        value - the argument
+        date_only - True if the parameter is declared as a date without a time
+    """
+    if isinstance(value, datetime):
+        result = value.date().isoformat() if date_only else value.isoformat(" ")
+    elif isinstance(value, date):
+        result = value.isoformat()
+    elif isinstance(value, Decimal):
+        result = float(value)
+    else:
+        result = value
+    return result
+
+
+@lru_cache(maxsize=256)
+def source_columns(sql: str) -> dict[str, str]:
+    """
+    Return the column of a table that each alias of a statement is given to, by the alias.
+    The names are in lower case.  An alias of an expression is not included.
+
+    Arguments:
+        sql - the translated statement
+    """
+    return {alias.lower(): column.lower() for column, alias in ALIAS_PATTERN.findall(sql)}
+
+
+def resolve_column(column: str, sources: dict[str, str]) -> str:
+    """
+    Return the name of the column of a table that a column of a result is read from.  An
+    alias of an alias, such as a column of a subquery, is followed to the column of the table.
+
+    Arguments:
+        column - the name of the column of the result
+        sources - the column of a table of each alias of the statement
+    """
+    name = column.lower()
+    followed = set()
+    while name in sources and name not in followed:
+        followed.add(name)
+        name = sources[name]
+    return name
+
+
+def read_declared_types(cnx: sqlite3.Connection) -> dict[str, str]:
+    """
+    Return the declared type of each column of the tables of a database that has a
+    converter, by the name of the column in lower case.
+
+    Arguments:
+        cnx - the SQLite connection
+    """
+    declared_types = {}
+    tables = [row[0] for row in cnx.execute("SELECT name FROM sqlite_master WHERE type = 'table'")]
+    for table in tables:
+        for column in cnx.execute("PRAGMA table_info(\"" + table + "\")"):
+            sql_type = column[2].split("(")[0].strip().upper()
+            if sql_type in CONVERTERS:
+                declared_types[column[1].lower()] = sql_type
+    return declared_types
+
+
+def convert_datetime(value: Any) -> datetime:
+    """
+    Return the datetime stored as ISO 8601 text in a DATE or DATETIME column.
+
+    Arguments:
+        value - the stored text
+    """
+    return datetime.fromisoformat(value) if isinstance(value, str) else value
+
+
+def convert_money(value: Any) -> Decimal:
+    """
+    Return the amount stored in a MONEY column with two decimal places, as SQL Server
+    returns a DECIMAL(18, 2) column.
+
+    Arguments:
+        value - the stored amount
+    """
+    return Decimal(str(value)).quantize(CENTS)
+
+
+#
+# The function that converts the stored values of each declared type
+#
+CONVERTERS = {
+    "DATE": convert_datetime,
+    "DATETIME": convert_datetime,
+    "MONEY": convert_money
+}
@@ -12,7 +12,10 @@ __version__ = "16-Sep-2021"
 This module provides a class for generating a psuedo-random number or a random selection.
 """
 
-from random import randrange, seed
+import hashlib
+import math
+import random
+from typing import Any, Iterable
 
 DEFAULT_SEED = 67889
 
@@ -24,7 +27,9 @@ DEFAULT_SEED = 67889
 
 class Random:
     """
-    Perform certain random activities.
+    Perform certain random activities.  Each instance has its own generator, so the
+    values it produces depend only on its seed and not on other instances, threads,
+    or processes.
     """
 
     # ---------------------------------------------------------------------------
@@ -38,11 +43,10 @@ class Random:
         Arguments:
             sd - the seed to apply to the random number generator.
         """
-        seed(sd)
+        self._generator = random.Random(sd)
         return
 
-    @staticmethod
-    def get_random(number_range: tuple[int, int]) -> str:
+    def get_random(self, number_range: tuple[int, int]) -> str:
         """
         Return a random integer in the specified range as a string.
 
@@ -53,22 +57,20 @@ class Random:
         assert number_range is not None, "Number range must not be None"
         assert len(number_range) == 2, "Number range must have 2 values, not " + str(len(number_range))
         assert number_range[0] < number_range[1], "For number range, first element must be less than second"
-        value = randrange(number_range[0], number_range[1])
+        value = self._generator.randrange(number_range[0], number_range[1])
         return str(value)
 
-    @staticmethod
-    def select(weight: int) -> bool:
+    def select(self, weight: int) -> bool:
         """
         Return True if a random number is less than the weight.
 
         Arguments:
             weight - a value between 0 and 100 inclusive
         """
-        random_num = randrange(0, 100)
+        random_num = self._generator.randrange(0, 100)
         return random_num < weight
 
-    @staticmethod
-    def select_from_list(a_list: list[str]) -> str:
+    def select_from_list(self, a_list: list[str]) -> str:
         """
         Select one of the items in the list at random.
 
@@ -78,5 +80,96 @@ class Random:
         assert a_list is not None, "The list must not be None"
         assert len(a_list) > 0, "The list must not be empty"
         size = len(a_list)
-        random_number = randrange(0, size)
+        random_number = self._generator.randrange(0, size)
         return a_list[random_number]
+
+    def select_weighted(self, a_list: list, weights: list, count: int = 1) -> list:
+        """
+        Return count items selected at random, with repeats, from a list.  Each item is
+        selected in proportion to its weight.
+
+        Arguments:
+            a_list - the items to select from
+            weights - the weight of each item
+            count - the number of items to select
+        """
+        assert a_list is not None, "The list must not be None"
+        assert len(a_list) > 0, "The list must not be empty"
+        assert len(weights) == len(a_list), "There must be a weight for each item in the list"
+        return self._generator.choices(a_list, weights=weights, k=count)
+
+    def get_uniform(self, low: float, high: float) -> float:
+        """
+        Return a random number between low and high.
+
+        Arguments:
+            low - the lowest value
+            high - the highest value
+        """
+        return self._generator.uniform(low, high)
+
+    def get_exponential(self, mean: float) -> float:
+        """
+        Return a random number from an exponential distribution, such as the time between
+        two events that happen at random.
+
+        Arguments:
+            mean - the mean of the distribution, which must be greater than 0
+        """
+        assert mean > 0, "The mean must be greater than 0, not " + str(mean)
+        return self._generator.expovariate(1.0 / mean)
+
+    def get_lognormal(self, median: float, sigma: float) -> float:
+        """
+        Return a random number from a log-normal distribution, such as an amount that is
+        usually near the median but sometimes much larger.
+
+        Arguments:
+            median - the median of the distribution, which must be greater than 0
+            sigma - the standard deviation of the logarithm of the values
+        """
+        assert median > 0, "The median must be greater than 0, not " + str(median)
+        return median * math.exp(self._generator.gauss(0.0, sigma))
+
+    def reservoir_sample(self, items: Iterable[Any], size: int) -> list:
+        """
+        Return a uniform random sample of size items from an iterable, such as the rows
+        yielded by a streaming query, in the order the items were read.  Each item has the
+        same chance of being selected, and only the sample is held in memory.  If there are
+        no more than size items, all of them are returned.
+
+        Arguments:
+            items - the items to sample, read once
+            size - the number of items in the sample
+        """
+        assert items is not None, "The items must not be None"
+        assert size >= 0, "The sample size must not be negative, not " + str(size)
+        reservoir = []
+        for position, item in enumerate(items):
+            if position < size:
+                reservoir.append((position, item))
+            else:
+                slot = self._generator.randrange(0, position + 1)
+                if slot < size:
+                    reservoir[slot] = (position, item)
+        reservoir.sort(key=lambda entry: entry[0])
+        return [item for position, item in reservoir]
+
+
+# -------------------------------------------------------------------------------
+#  Functions
+# -------------------------------------------------------------------------------
+
+
+def sample_bucket(row_id: Any, seed: Any) -> int:
+    """
+    Return the sample bucket of a row, from 0 to 2**32 - 1.  SQL Server computes the bucket
+    as the first 4 bytes of the SHA-256 hash of the text "ID:seed", read as an unsigned
+    big-endian integer, so the same rows are sampled in memory and from a stand-in database.
+
+    Arguments:
+        row_id - the ID of the row
+        seed - the seed of the sample
+    """
+    digest = hashlib.sha256((str(row_id) + ":" + str(seed)).encode("utf-8")).digest()
+    return int.from_bytes(digest[:4], "big")
@@ -9,26 +9,261 @@ __author__ = 'Bill Shaffer'
 __version__ = "15-Sep-2021"
 
 """
-This module produces strings that are unique over time
+This module produces strings that are unique over time.
+
+Identifiers are drawn from a sequence of integers that is shared by every process
+on the machine.  The next free value of the sequence is kept in a reservation file.
+A process reserves a block of values by locking the file, reading the next free value,
+and writing back the value after the block.  The values in the block are then handed
+out without further access to the file.  The sequence never falls behind the number
+of seconds since the epoch, so identifiers remain unique with respect to those
+produced by earlier versions of this module and if the reservation file is lost.
+
+Each identifier is the last MAX_CHARACTERS digits of the value in base 32, padded on
+the left so that all identifiers have the same length.
 """
 
-import time
+import os
 import string
+import threading
+import time
+from pathlib import Path
+
+from base.testexception import TestException
 
 MAX_CHARACTERS = 6
+BASE = 32
 DIGITS = string.digits + string.ascii_lowercase
+DEFAULT_BLOCK_SIZE = 64
+LOCK_TIMEOUT = 30.0
+STALE_LOCK_AGE = 120.0
+
+
+# -------------------------------------------------------------------------------
+#  Unique ID Allocator
+# -------------------------------------------------------------------------------
+
+
+class UniqueIdAllocator:
+    """
+    This class hands out identifiers that are unique across threads, processes, and runs.
+    """
+
+    # ---------------------------------------------------------------------------
+    #  Constructor
+    # ---------------------------------------------------------------------------
+
+    def __init__(self, path: str = None, block_size: int = DEFAULT_BLOCK_SIZE):
+        """
+        Initialize the instance of this class.
+
+        Arguments:
+            path - the full path of the reservation file.  If None, the path is taken from the
+               environment variable ENV_UNIQUEID_FILE or defaults to a file in the home directory.
+            block_size - the number of values reserved each time the reservation file is read
+        """
+        assert block_size > 0, "Block size must be greater than zero, not " + str(block_size)
+        if path is None:
+            path = os.getenv("ENV_UNIQUEID_FILE", str(Path.home() / ".bcgen_uniqueid"))
+        assert len(path) > 0, "Reservation file path must not be an empty string"
+        self._path = path
+        self._lock_path = path + ".lock"
+        self._block_size = block_size
+        self._next_value = 0
+        self._end_value = 0
+        self._mutex = threading.Lock()
+        return
+
+    # ---------------------------------------------------------------------------
+    #  Properties
+    # ---------------------------------------------------------------------------
+
+    @property
+    def path(self) -> str:
+        """
+        Return the full path of the reservation file.
+        """
+        return self._path
+
+    @property
+    def block_size(self) -> int:
+        """
+        Return the number of values reserved at a time.
+        """
+        return self._block_size
+
+    # ---------------------------------------------------------------------------
+    #  Operations
+    # ---------------------------------------------------------------------------
+
+    def next_id(self) -> str:
+        """
+        Return a string with MAX_CHARACTERS characters that is unique from any prior strings returned.
+        """
+        with self._mutex:
+            if self._next_value >= self._end_value:
+                self._next_value = self.reserve(self._block_size)
+                self._end_value = self._next_value + self._block_size
+            value = self._next_value
+            self._next_value += 1
+        return format_id(value)
+
+    def allocate(self, count: int) -> list[str]:
+        """
+        Return a list of count unique identifiers.  The identifiers are reserved with a single
+        access to the reservation file.
+
+        Arguments:
+            count - the number of identifiers required
+        """
+        assert count > 0, "Count must be greater than zero, not " + str(count)
+        assert count < BASE ** MAX_CHARACTERS, "Count is too large for the identifier length: " + str(count)
+        start = self.reserve(count)
+        ids = [format_id(value) for value in range(start, start + count)]
+        return ids
+
+    def reserve(self, count: int) -> int:
+        """
+        Reserve count consecutive values of the sequence and return the first one.
+
+        Arguments:
+            count - the number of values to reserve
+        """
+        assert count > 0, "Count must be greater than zero, not " + str(count)
+        self._acquire_file_lock()
+        try:
+            start = max(self._read_next_value(), round(time.time()))
+            self._write_next_value(start + count)
+        finally:
+            self._release_file_lock()
+        return start
+
+    # ---------------------------------------------------------------------------
+    #  Support Functions
+    # ---------------------------------------------------------------------------
+
+    def _read_next_value(self) -> int:
+        """
+        Return the next free value recorded in the reservation file, or 0 if there is no file.
+        """
+        value = 0
+        try:
+            with open(self._path, "r") as file:
+                text = file.read().strip()
+            if len(text) > 0:
+                value = int(text)
+        except FileNotFoundError:
+            value = 0
+        except (OSError, ValueError) as e:
+            raise TestException("Unable to read reservation file " + self._path + ": " + str(e))
+        return value
+
+    def _write_next_value(self, value: int):
+        """
+        Record the next free value in the reservation file.  The value is written to a temporary
+        file that replaces the reservation file so that a partial write is never observed.
+
+        Arguments:
+            value - the next free value of the sequence
+        """
+        temp_path = self._path + ".tmp"
+        try:
+            with open(temp_path, "w") as file:
+                file.write(str(value))
+            os.replace(temp_path, self._path)
+        except OSError as e:
+            raise TestException("Unable to write reservation file " + self._path + ": " + str(e))
+        return
+
+    def _acquire_file_lock(self):
+        """
+        Acquire the lock file that serializes access to the reservation file between processes.
+        A lock file older than STALE_LOCK_AGE seconds is assumed to belong to a process that
+        died and is removed.
+        """
+        deadline = time.monotonic() + LOCK_TIMEOUT
+        while True:
+            try:
+                handle = os.open(self._lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+                os.close(handle)
+                break
+            except FileExistsError:
+                self._remove_stale_lock()
+                if time.monotonic() > deadline:
+                    raise TestException("Timed out waiting for lock file: " + self._lock_path)
+                time.sleep(0.01)
+        return
+
+    def _remove_stale_lock(self):
+        """
+        Remove the lock file if it is older than STALE_LOCK_AGE seconds.
+        """
+        try:
+            age = time.time() - os.path.getmtime(self._lock_path)
+            if age > STALE_LOCK_AGE:
+                os.remove(self._lock_path)
+        except OSError:
+            pass
+        return
+
+    def _release_file_lock(self):
+        """
+        Release the lock file.
+        """
+        try:
+            os.remove(self._lock_path)
+        except OSError as e:
+            print("Error in removing lock file: " + str(e))
+        return
+
+
+# -------------------------------------------------------------------------------
+#  Functions
+# -------------------------------------------------------------------------------
+
+_default_allocator = None
+_default_allocator_mutex = threading.Lock()
+
+
+def default_allocator() -> UniqueIdAllocator:
+    """
+    Return the allocator shared by the functions in this module.
+    """
+    global _default_allocator
+    with _default_allocator_mutex:
+        if _default_allocator is None:
+            _default_allocator = UniqueIdAllocator()
+    return _default_allocator
 
 
 def gen_unique_id() -> str:
     """
     Return a string with MAX_CHARACTERS characters that is unique from any prior strings returned.
     """
-    time.sleep(2)
-    # number of seconds since the epoch as an integer
-    seconds = round(time.time())
-    value = int_to_str(seconds, 32)
-    value = value[-MAX_CHARACTERS:]
-    return value
+    return default_allocator().next_id()
+
+
+def gen_unique_ids(count: int) -> list[str]:
+    """
+    Return a list of count strings with MAX_CHARACTERS characters that are unique from any
+    prior strings returned.
+
+    Arguments:
+        count - the number of identifiers required
+    """
+    return default_allocator().allocate(count)
+
+
+def format_id(value: int) -> str:
+    """
+    Return the last MAX_CHARACTERS digits of value in base 32, padded on the left with zeros.
+
+    Arguments:
+        value - a positive integer from the sequence
+    """
+    digits = int_to_str(value, BASE)
+    digits = digits[-MAX_CHARACTERS:]
+    return digits.rjust(MAX_CHARACTERS, DIGITS[0])
 
 
 def int_to_str(original_value: int, base: int) -> str:
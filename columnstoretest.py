@@ -0,0 +1,80 @@
+# -------------------------------------------------------------------------------
+#
+#  Copyright (c) 2021 Waysys LLC
+#
+# -------------------------------------------------------------------------------
+# -------------------------------------------------------------------------------
+#
+__author__ = 'Bill Shaffer'
+__version__ = "16-Oct-2021"
+
+"""
+This module tests the column store that holds the rows of a test table.
+"""
+
+import unittest
+
+import xmlrunner
+
+from models.columnstore import ColumnStore, EXTEND_CHUNK_SIZE
+
+
+# -------------------------------------------------------------------------------
+#  Test Column Store
+# -------------------------------------------------------------------------------
+
+
+class TestColumnStore(unittest.TestCase):
+    """
+    This class tests adding rows to a column store and reading them back.
+    """
+
+    # -------------------------------------------------------------------------------
+    #  Tests
+    # -------------------------------------------------------------------------------
+
+    def test_01_append(self):
+        """
+        Test that rows added one at a time are read back in order.
+        """
+        store = ColumnStore(3)
+        store.append(["T-10", "A1", "Check A1"])
+        store.append(("T-11", "A2", "Check A2"))
+        self.assertEqual(2, len(store))
+        self.assertEqual([("T-10", "A1", "Check A1"), ("T-11", "A2", "Check A2")], list(store))
+        self.assertEqual(("T-11", "A2", "Check A2"), store[1])
+        self.assertEqual(["A1", "A2"], store.column(1))
+        self.assertRaises(AssertionError, store.append, ["T-12", "A3"])
+        return
+
+    def test_02_extend(self):
+        """
+        Test that rows added in bulk, over more than one chunk, are read back in order.
+        """
+        count = EXTEND_CHUNK_SIZE * 2 + 5
+        store = ColumnStore(2)
+        store.extend(("T-" + str(index), str(index)) for index in range(count))
+        self.assertEqual(count, len(store))
+        self.assertEqual(("T-0", "0"), store[0])
+        self.assertEqual(("T-" + str(count - 1), str(count - 1)), store[count - 1])
+        self.assertRaises(AssertionError, store.extend, [("T-1", "1"), ("T-2",)])
+        return
+
+    def test_03_extend_columns(self):
+        """
+        Test that rows given as columns are added after the existing rows.
+        """
+        store = ColumnStore(2)
+        store.append(["T-10", "A1"])
+        store.extend_columns([["T-11", "T-12"], ["A2", "A3"]])
+        self.assertEqual([("T-10", "A1"), ("T-11", "A2"), ("T-12", "A3")], list(store))
+        self.assertRaises(AssertionError, store.extend_columns, [["T-13"], []])
+        return
+
+
+if __name__ == '__main__':
+    report_file = '/GFITWorkspaces/COMMON01/columnstore_test.xml'
+    with open(report_file, 'w') as output:
+        unittest.main(
+            testRunner=xmlrunner.XMLTestRunner(output=output),
+            failfast=False, buffer=False, catchbreak=False)
@@ -12,11 +12,16 @@ __version__ = "24-Sep-2021"
 This module defines the configuration for the GFIT2020 project.
 """
 
+import os
+from pathlib import Path
+
+from base.configuration import default_standin_path
 from base.connector import Database, Access
 from base.plan import Project, Environment
 
 PROJECT_NAME = "GFIT2020"
 ENVIRONMENT_NAME = "COMMON01"
+LOCAL_ENVIRONMENT_NAME = "LOCAL"
 BC_APPLICATION_NAME = "BC"
 PC_APPLICATION_NAME = "PC"
 CC_APPLICATION_NAME = "CC"
@@ -69,9 +74,9 @@ class GFIT2020Project(Project):
         This project generates test cases for testing the most recent version of GFIT for PolicyCenter,
         ClaimCenter, and BillingCenter.
         """
-        self.test_suite_base_dir = "C:/git/GfitSupport/TESTSUITES"
+        self.test_suite_base_dir = os.getenv("ENV_TEST_SUITE_DIR", "C:/git/GfitSupport/TESTSUITES")
         assert self.is_base_dir_valid, "Test suite base directory is invalid: " + self.test_suite_base_dir
-        self.product_spec_base_dir = "C:/git/GfitSupport/PRODUCT_SPEC"
+        self.product_spec_base_dir = os.getenv("ENV_PRODUCT_SPEC_DIR", "C:/git/GfitSupport/PRODUCT_SPEC")
         assert self.is_product_spec_dir_valid, "Product spec base directory is invalid: " + self.product_spec_base_dir
         return
 
@@ -103,6 +108,16 @@ class GFIT2020Project(Project):
         # Define the applications in this environment
         #
         self.define_applications(environment)
+        #
+        # Local environment
+        #
+        environment = self.create_environment(LOCAL_ENVIRONMENT_NAME)
+        environment.env_description = """
+        This environment runs on any machine.  PolicyCenter is a SQLite database that stands in for
+        the PolicyCenter database.  It is created by the queries.policycenterstandin module.
+        """
+        environment.test_output_base_dir = os.getenv("ENV_TEST_OUTPUT_DIR", str(Path.home() / "GFITWorkspaces"))
+        self.define_local_applications(environment)
         return
 
     def define_applications(self, environment: Environment):
@@ -138,6 +153,21 @@ class GFIT2020Project(Project):
         application.database = self.define_cc_database()
         return
 
+    def define_local_applications(self, environment: Environment):
+        """
+        Define the applications for the local environment.  Only PolicyCenter, which is
+        read to generate test cases, is defined.
+
+        Arguments:
+            environment - the environment to which this application belongs
+        """
+        application = environment.create_application(PC_APPLICATION_NAME)
+        application.application_description = """
+        PolicyCenter stand-in
+        """
+        application.database = self.define_pc_standin_database()
+        return
+
     @staticmethod
     def define_bc_database() -> Database:
         """
@@ -164,6 +194,17 @@ class GFIT2020Project(Project):
         database.server = "PORTAL15\\SQLEXPRESS"
         return database
 
+    @staticmethod
+    def define_pc_standin_database() -> Database:
+        """
+        Define the SQLite database that stands in for PolicyCenter.
+        """
+        database = Database()
+        database.name = "PolicyCenter"
+        database.access = Access.SQLite
+        database.db_name = default_standin_path()
+        return database
+
     @staticmethod
     def define_cc_database() -> Database:
         """
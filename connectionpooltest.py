@@ -0,0 +1,210 @@
+# -------------------------------------------------------------------------------
+#
+#  Copyright (c) 2021 Waysys LLC
+#
+# -------------------------------------------------------------------------------
+# -------------------------------------------------------------------------------
+#
+__author__ = 'Bill Shaffer'
+__version__ = "16-Oct-2021"
+
+"""
+This module tests the connection pool with connections to the SQLite stand-in for the
+PolicyCenter database: the checkout and reuse of connections, the wait for a connection,
+the validation of idle connections, the closing of idle connections, and the closing of
+the pool.
+"""
+
+import threading
+import time
+import unittest
+from datetime import datetime
+
+import xmlrunner
+
+from base.connectionpool import ConnectionPool, PooledConnection
+from base.testexception import TestException
+from standinfixture import StandInTestCase, POOL_MAX_SIZE
+
+account_statement = "SELECT Count(*) FROM pc_account"
+
+
+# -------------------------------------------------------------------------------
+#  Test Connection Pool
+# -------------------------------------------------------------------------------
+
+
+class TestConnectionPool(StandInTestCase):
+    """
+    This class tests the connection pool.
+    """
+
+    # -------------------------------------------------------------------------------
+    #  Support Functions
+    # -------------------------------------------------------------------------------
+
+    @staticmethod
+    def count_accounts(cnx) -> int:
+        """
+        Return the number of accounts seen by a connection.
+
+        Arguments:
+            cnx - a database connection
+        """
+        cursor = cnx.cursor()
+        try:
+            cursor.execute(account_statement)
+            count = cursor.fetchall()[0][0]
+        finally:
+            cursor.close()
+        return count
+
+    # -------------------------------------------------------------------------------
+    #  Tests
+    # -------------------------------------------------------------------------------
+
+    def test_01_checkout(self):
+        """
+        Test that connections are opened as they are needed and reused once returned.
+        """
+        first = self.pool.checkout()
+        second = self.pool.checkout()
+        self.assertIsInstance(first, PooledConnection)
+        self.assertIsNot(first.connection, second.connection)
+        self.assertEqual(2, self.pool.size)
+        self.assertEqual(0, self.count_accounts(first))
+        underlying = first.connection
+        first.close()
+        first.close()
+        self.assertTrue(first.closed)
+        self.assertEqual(1, self.pool.idle_count)
+        with self.pool.checkout() as third:
+            self.assertIs(underlying, third.connection)
+        second.close()
+        self.assertEqual(2, self.pool.idle_count)
+        self.assertEqual(3, self.pool.statistics.checkouts)
+        self.assertEqual(1, self.pool.statistics.reuses)
+        self.assertEqual(2, self.pool.statistics.max_in_use)
+        return
+
+    def test_02_wait(self):
+        """
+        Test that a checkout waits for a connection when the pool is at its maximum size,
+        and fails when none is returned before the timeout.
+        """
+        connections = [self.pool.checkout() for _ in range(POOL_MAX_SIZE)]
+        self.assertRaises(TestException, self.pool.checkout, 0.05)
+        timer = threading.Timer(0.05, connections[0].close)
+        timer.start()
+        try:
+            cnx = self.pool.checkout(timeout=5.0)
+        finally:
+            timer.join()
+        self.assertEqual(POOL_MAX_SIZE, self.pool.size)
+        self.assertEqual(2, self.pool.statistics.waits)
+        self.assertGreater(self.pool.statistics.wait_time, 0.0)
+        cnx.close()
+        for cnx in connections[1:]:
+            cnx.close()
+        return
+
+    def test_03_validation(self):
+        """
+        Test that an idle connection that fails validation is discarded and replaced.
+        """
+        cnx = self.pool.checkout()
+        underlying = cnx.connection
+        cnx.close()
+        underlying.close()
+        with self.pool.checkout() as cnx:
+            self.assertIsNot(underlying, cnx.connection)
+            self.assertEqual(0, self.count_accounts(cnx))
+        self.assertEqual(1, self.pool.statistics.validation_failures)
+        self.assertEqual(2, self.pool.statistics.connects)
+        self.assertEqual(1, self.pool.size)
+        return
+
+    def test_04_rollback(self):
+        """
+        Test that a transaction left open is rolled back when the connection is returned, and
+        that a connection that cannot be rolled back is closed instead of being kept.
+        """
+        with self.pool.checkout() as cnx:
+            underlying = cnx.connection
+            cnx.execute("INSERT INTO pc_account (id, accountnumber, accountorgtype, accountstatus, createtime, "
+                        "updatetime) VALUES (?, ?, ?, ?, ?, ?)", 1, "A0001", 1, 1,
+                        datetime(2021, 9, 1), datetime(2021, 9, 1))
+            self.assertEqual(1, self.count_accounts(cnx))
+        with self.pool.checkout() as cnx:
+            self.assertIs(underlying, cnx.connection)
+            self.assertEqual(0, self.count_accounts(cnx))
+            underlying.close()
+        self.assertEqual(0, self.pool.size)
+        self.assertEqual(0, self.pool.idle_count)
+        return
+
+    def test_05_idle_timeout(self):
+        """
+        Test that connections beyond the minimum size are closed once they have been idle
+        longer than the idle timeout.
+        """
+        pool = ConnectionPool(self.database_def, min_size=1, max_size=3, idle_timeout=0.05)
+        try:
+            connections = [pool.checkout() for _ in range(3)]
+            for cnx in connections:
+                cnx.close()
+            self.assertEqual(3, pool.idle_count)
+            time.sleep(0.1)
+            with pool.checkout():
+                self.assertEqual(1, pool.size)
+            self.assertEqual(2, pool.statistics.idle_closes)
+            self.assertEqual(1, pool.idle_count)
+        finally:
+            pool.close()
+        return
+
+    def test_06_close(self):
+        """
+        Test that closing the pool closes the idle connections, refuses checkouts, and closes
+        the connections in use when they are returned.
+        """
+        in_use = self.pool.checkout()
+        self.pool.checkout().close()
+        self.pool.close()
+        self.assertEqual(1, self.pool.size)
+        self.assertEqual(0, self.pool.idle_count)
+        self.assertRaises(TestException, self.pool.checkout)
+        in_use.close()
+        self.assertEqual(0, self.pool.size)
+        self.assertEqual(0, self.pool.idle_count)
+        return
+
+    def test_07_get_pool(self):
+        """
+        Test that the pool of a database is shared, and that it grows when a caller asks for
+        a larger maximum size.
+        """
+        try:
+            pool = ConnectionPool.get_pool(self.database_def, max_size=2)
+            self.assertIs(pool, ConnectionPool.get_pool(self.database_def))
+            connections = [pool.checkout() for _ in range(2)]
+            self.assertIs(pool, ConnectionPool.get_pool(self.database_def, max_size=3))
+            self.assertEqual(3, pool.max_size)
+            connections.append(pool.checkout(timeout=0.05))
+            self.assertIs(pool, ConnectionPool.get_pool(self.database_def, max_size=1))
+            self.assertEqual(3, pool.max_size)
+            for cnx in connections:
+                cnx.close()
+            pool.close()
+            self.assertIsNot(pool, ConnectionPool.get_pool(self.database_def))
+        finally:
+            ConnectionPool.close_all()
+        return
+
+
+if __name__ == '__main__':
+    report_file = '/GFITWorkspaces/COMMON01/connection_pool_test.xml'
+    with open(report_file, 'w') as output:
+        unittest.main(
+            testRunner=xmlrunner.XMLTestRunner(output=output),
+            failfast=False, buffer=False, catchbreak=False)
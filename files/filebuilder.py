@@ -22,6 +22,8 @@ __version__ = "31-Dec-2020"
 This module holds the FileBuilder class. 
 """
 
+import os
+
 from base.testexception import TestException
 from models.testcase import TestCase
 from models.spec import TestCaseSpecification
@@ -30,6 +32,8 @@ from models.spec import TestCaseSpecification
 #  FileBuilder class
 # -------------------------------------------------------------------------------
 
+OUTPUT_BUFFER_SIZE = 1024 * 1024
+
 
 class FileBuilder:
     """
@@ -38,13 +42,15 @@ class FileBuilder:
     The main role of this class is to handle the input/output for the test case.
     """
 
-    def __init__(self, spec: TestCaseSpecification, test_suite_dir: str, num: int):
+    def __init__(self, spec: TestCaseSpecification, test_suite_dir: str, num: int, pretty: bool = True):
         """
         Initialize this class.
 
         Arguments:
             spec - the test case specification
             test_suite_dir - the directory where the test suite will be placed
+            num - the number of the test case
+            pretty - True if the HTML is to be indented, False for compact output
         """
         assert spec is not None, "FileBuilder: Test specification must not be None"
         assert test_suite_dir is not None, "FileBuilder: test suite library must not be null"
@@ -53,6 +59,7 @@ class FileBuilder:
         self._spec = spec
         self._test_suite_dir = test_suite_dir
         self._num = num
+        self._pretty = pretty
         return
 
     # ---------------------------------------------------------------------------
@@ -105,24 +112,25 @@ class FileBuilder:
 
     def produce_test_case(self):
         """
-        Generate a test case file in the test suite directory.
+        Generate a test case file in the test suite directory.  The test case is written
+        to a temporary file as it is produced, since the rows of the tables may be produced
+        while it is written.  The temporary file replaces the test case file only when the
+        test case is complete, so a failure does not leave a partial test case.
         """
         test_case = TestCase(self._spec, 1)
-        html = test_case.initialize()
-        self.output(html)
-        return
-
-    def output(self, html):
-        """
-        Output the HTML to its file.
-        """
+        temporary_filename = self.test_case_filename + ".tmp"
         file = None
         try:
-            file = open(self.test_case_filename, 'w')
-            file.write(html)
+            file = open(temporary_filename, 'w', buffering=OUTPUT_BUFFER_SIZE)
+            test_case.write(file, self._pretty)
+            file.close()
+            file = None
+            os.replace(temporary_filename, self.test_case_filename)
         except Exception as e:
-            raise TestException(e)
-        finally:
             if file is not None:
                 file.close()
+                file = None
+            if os.path.exists(temporary_filename):
+                os.remove(temporary_filename)
+            raise TestException(str(e))
         return
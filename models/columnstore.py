@@ -0,0 +1,139 @@
+# -------------------------------------------------------------------------------
+#
+#  Copyright (c) 2021 Waysys LLC
+#
+# -------------------------------------------------------------------------------
+# -------------------------------------------------------------------------------
+#
+__author__ = 'Bill Shaffer'
+__version__ = "16-Oct-2021"
+
+"""
+This module contains the ColumnStore class, which holds the rows of a test table by
+column.  Each column is one list of values, so a table of many rows holds one list per
+column instead of one list per row.  The rows are added one at a time or in bulk, and
+are read back one row at a time as tuples of values, in the order they were added.
+"""
+
+from itertools import islice
+from typing import Iterable, Iterator, Sequence
+
+#
+# The number of rows transposed into the columns at a time by extend
+#
+EXTEND_CHUNK_SIZE = 1024
+
+
+# -------------------------------------------------------------------------------
+#  Column Store
+# -------------------------------------------------------------------------------
+
+
+class ColumnStore:
+    """
+    This class stores the rows of a table as one list of values for each column.
+    """
+
+    # ---------------------------------------------------------------------------
+    #  Constructor
+    # ---------------------------------------------------------------------------
+
+    def __init__(self, width: int):
+        """
+        Initialize the instance of this class.
+
+        Arguments:
+            width - the number of columns
+        """
+        assert width > 0, "The number of columns must be greater than 0, not " + str(width)
+        self._columns: list[list[str]] = [[] for _ in range(width)]
+        return
+
+    # ---------------------------------------------------------------------------
+    #  Properties
+    # ---------------------------------------------------------------------------
+
+    @property
+    def width(self) -> int:
+        """
+        Return the number of columns.
+        """
+        return len(self._columns)
+
+    # ---------------------------------------------------------------------------
+    #  Operations
+    # ---------------------------------------------------------------------------
+
+    def append(self, row: Sequence[str]):
+        """
+        Add a row.
+
+        Arguments:
+            row - the values of the row, one for each column
+        """
+        assert len(row) == len(self._columns), "Number of values in row does not equal number of columns"
+        for column, value in zip(self._columns, row):
+            column.append(value)
+        return
+
+    def extend(self, rows: Iterable[Sequence[str]]):
+        """
+        Add rows in bulk.  The rows are transposed into the columns in chunks, and the
+        widths of the rows of a chunk are checked together.
+
+        Arguments:
+            rows - the rows, each with one value for each column
+        """
+        iterator = iter(rows)
+        width = len(self._columns)
+        while True:
+            chunk = list(islice(iterator, EXTEND_CHUNK_SIZE))
+            if len(chunk) == 0:
+                break
+            assert {len(row) for row in chunk} == {width}, "Number of values in row does not equal number of columns"
+            for column, values in zip(self._columns, zip(*chunk)):
+                column.extend(values)
+        return
+
+    def extend_columns(self, columns: Sequence[Sequence[str]]):
+        """
+        Add rows given as columns of values.
+
+        Arguments:
+            columns - the values of the rows, one sequence for each column
+        """
+        assert len(columns) == len(self._columns), "Number of value columns does not equal number of columns"
+        assert len({len(values) for values in columns}) <= 1, "The value columns must have the same length"
+        for column, values in zip(self._columns, columns):
+            column.extend(values)
+        return
+
+    def column(self, index: int) -> list[str]:
+        """
+        Return the values of a column.  The list must not be changed.
+
+        Arguments:
+            index - the index of the column
+        """
+        return self._columns[index]
+
+    def __len__(self) -> int:
+        """
+        Return the number of rows.
+        """
+        return len(self._columns[0])
+
+    def __iter__(self) -> Iterator[tuple[str, ...]]:
+        """
+        Return an iterator of the rows, as tuples of values.
+        """
+        return zip(*self._columns)
+
+    def __getitem__(self, index: int) -> tuple[str, ...]:
+        """
+        Return a row as a tuple of values.
+
+        Arguments:
+            index - the index of the row
+        """
+        return tuple(column[index] for column in self._columns)
@@ -0,0 +1,246 @@
+# -------------------------------------------------------------------------------
+#
+#  Copyright (c) 2021 Waysys LLC
+#
+# -------------------------------------------------------------------------------
+#
+#  Waysys LLC MAKES NO REPRESENTATIONS OR WARRANTIES ABOUT THE SUITABILITY OF
+#  THE SOFTWARE, EITHER EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED
+#  TO THE IMPLIED WARRANTIES OF MERCHANTABILITY, FITNESS FOR A
+#  PARTICULAR PURPOSE, OR NON-INFRINGEMENT. CastleBay SHALL NOT BE LIABLE FOR
+#  ANY DAMAGES SUFFERED BY LICENSEE AS A RESULT OF USING, MODIFYING OR
+#  DISTRIBUTING THIS SOFTWARE OR ITS DERIVATIVES.
+#
+# For further information, contact wshaffer@waysysweb.com
+#
+# -------------------------------------------------------------------------------
+
+__author__ = 'Bill Shaffer'
+__version__ = "10-Oct-2021"
+
+"""
+This module contains the HtmlWriter class.  The writer outputs the elements of a
+test case directly to a file as they are produced, so a test case never has to be
+held in memory as a tree.  In pretty mode, the output has the same layout as the
+minidom pretty printer.  In compact mode, no whitespace is added between elements.
+"""
+
+from typing import TextIO, Optional
+
+# -------------------------------------------------------------------------------
+#  HTML Writer class
+# -------------------------------------------------------------------------------
+
+XML_DECLARATION = '<?xml version="1.0" ?>'
+
+
+class HtmlWriter:
+    """
+    This class writes XHTML elements to a text file.
+    """
+
+    # ---------------------------------------------------------------------------
+    #  Constructor
+    # ---------------------------------------------------------------------------
+
+    def __init__(self, file: TextIO, pretty: bool = True, indent: str = "  "):
+        """
+        Initialize the instance of this class.
+
+        Arguments:
+            file - a text file open for writing
+            pretty - True if elements are to be placed on separate, indented lines
+            indent - the string used for each level of indentation in pretty mode
+        """
+        assert file is not None, "File must not be None"
+        assert indent is not None, "Indent must not be None"
+        self._file = file
+        self._pretty = pretty
+        self._indent = indent
+        self._newline = "\n" if pretty else ""
+        self._depth = 0
+        self._open_tags: list[str] = []
+        return
+
+    # ---------------------------------------------------------------------------
+    #  Properties
+    # ---------------------------------------------------------------------------
+
+    @property
+    def pretty(self) -> bool:
+        """
+        Return True if the output is indented.
+        """
+        return self._pretty
+
+    @property
+    def depth(self) -> int:
+        """
+        Return the number of elements that have been started but not ended.
+        """
+        return len(self._open_tags)
+
+    @property
+    def margin(self) -> str:
+        """
+        Return the indentation for an element at the current depth.
+        """
+        if self._pretty:
+            result = self._indent * len(self._open_tags)
+        else:
+            result = ""
+        return result
+
+    # ---------------------------------------------------------------------------
+    #  Operations
+    # ---------------------------------------------------------------------------
+
+    def start_document(self):
+        """
+        Write the XML declaration.
+        """
+        self._file.write(XML_DECLARATION + self._newline)
+        return
+
+    def end_document(self):
+        """
+        Check that all elements have been ended.
+        """
+        assert len(self._open_tags) == 0, "Elements were not ended: " + ", ".join(self._open_tags)
+        return
+
+    def start_element(self, tag: str, attrib: Optional[dict[str, str]] = None):
+        """
+        Write the start tag of an element that will contain other elements.
+
+        Arguments:
+            tag - the name of the element
+            attrib - a dictionary of attribute names and values, or None
+        """
+        self._file.write(self.margin + "<" + tag + format_attributes(attrib) + ">" + self._newline)
+        self._open_tags.append(tag)
+        return
+
+    def end_element(self, tag: str):
+        """
+        Write the end tag of the most recently started element.
+
+        Arguments:
+            tag - the name of the element
+        """
+        assert len(self._open_tags) > 0, "There is no element to end: " + tag
+        open_tag = self._open_tags.pop()
+        assert open_tag == tag, "Expected end of " + open_tag + ", not " + tag
+        self._file.write(self.margin + "</" + tag + ">" + self._newline)
+        return
+
+    def text_element(self, tag: str, text: Optional[str], attrib: Optional[dict[str, str]] = None):
+        """
+        Write an element whose only content is text.  An element without text is written
+        as an empty element.
+
+        Arguments:
+            tag - the name of the element
+            text - the content of the element
+            attrib - a dictionary of attribute names and values, or None
+        """
+        self._file.write(self.margin + format_element(tag, text, attrib) + self._newline)
+        return
+
+    def empty_element(self, tag: str, attrib: Optional[dict[str, str]] = None):
+        """
+        Write an element with no content.
+
+        Arguments:
+            tag - the name of the element
+            attrib - a dictionary of attribute names and values, or None
+        """
+        self.text_element(tag, None, attrib)
+        return
+
+    def row(self, values: list[str], is_unique: Optional[list[bool]] = None):
+        """
+        Write a table row with one cell for each value.  The row is formatted as one
+        string and written with a single call.
+
+        Arguments:
+            values - a list of strings for the content of the cells
+            is_unique - a list of booleans.  Entry is True if the cell has the unique class.
+              This parameter can be None, if there are not unique column settings.
+        """
+        assert values is not None, "Values must not be None"
+        assert len(values) > 0, "row: there must be at least one value in a row"
+        if is_unique is not None:
+            assert len(values) == len(is_unique), \
+                "Length of is_unique list " + str(len(is_unique)) + " must equal length of values list " + \
+                str(len(values))
+        margin = self.margin
+        cell_margin = margin + self._indent if self._pretty else ""
+        newline = self._newline
+        parts = [margin, "<tr>", newline]
+        for index, value in enumerate(values):
+            attrib = UNIQUE_ATTRIBUTE if (is_unique is not None) and is_unique[index] else None
+            parts.append(cell_margin)
+            parts.append(format_element("td", value, attrib))
+            parts.append(newline)
+        parts.append(margin)
+        parts.append("</tr>")
+        parts.append(newline)
+        self._file.write("".join(parts))
+        return
+
+
+# -------------------------------------------------------------------------------
+#  Formatting Functions
+# -------------------------------------------------------------------------------
+
+UNIQUE_ATTRIBUTE = {"class": "unique"}
+
+
+def escape(text: str) -> str:
+    """
+    Return the text with the characters that are special in XML replaced by entities.
+
+    Arguments:
+        text - the text of an element or the value of an attribute
+    """
+    if "&" in text:
+        text = text.replace("&", "&amp;")
+    if "<" in text:
+        text = text.replace("<", "&lt;")
+    if "\"" in text:
+        text = text.replace("\"", "&quot;")
+    if ">" in text:
+        text = text.replace(">", "&gt;")
+    return text
+
+
+def format_attributes(attrib: Optional[dict[str, str]]) -> str:
+    """
+    Return the attributes formatted for a start tag, including a leading space.
+
+    Arguments:
+        attrib - a dictionary of attribute names and values, or None
+    """
+    result = ""
+    if attrib:
+        for name, value in attrib.items():
+            result += " " + name + "=\"" + escape(value) + "\""
+    return result
+
+
+def format_element(tag: str, text: Optional[str], attrib: Optional[dict[str, str]] = None) -> str:
+    """
+    Return an element whose content is only text.  An element without text is
+    formatted as an empty element.
+
+    Arguments:
+        tag - the name of the element
+        text - the content of the element
+        attrib - a dictionary of attribute names and values, or None
+    """
+    if text:
+        result = "<" + tag + format_attributes(attrib) + ">" + escape(text) + "</" + tag + ">"
+    else:
+        result = "<" + tag + format_attributes(attrib) + "/>"
+    return result
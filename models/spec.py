@@ -10,8 +10,28 @@ __version__ = "01-Sep-2021"
 
 """
 This module specifies the format for defining the test case.
+
+The rows of a test table are produced lazily.  A test case specification adds each table
+with the function that produces its rows, and the function runs when the rows are first
+needed, usually when the table is written.  A specification can therefore be created and
+inspected without reading the database.  The tables are evaluated in the order they were
+added, so a table can use data recorded while the rows of an earlier table were produced.
+
+A test table can instead stream its rows.  The table is given a row source, a function of
+a database connection that yields the rows, and the rows are read from the source while
+the table is written.  The rows of a streamed table are not kept, so the memory used to
+write it does not depend on the number of rows, and they can be read only once.
+
+The rows that are kept are held by column in a column store, which is created with the
+width of the columns of the table when the first rows are added.
 """
 
+from concurrent.futures import Future
+from typing import Any, Callable, Iterable, Iterator, Optional, Sequence
+
+from base.prefetch import Prefetcher
+from models.columnstore import ColumnStore
+
 # -------------------------------------------------------------------------------
 #  Test Table Specification
 # -------------------------------------------------------------------------------
@@ -37,14 +57,50 @@ class TestTableSpecification:
         self.test_id_prefix = ""
         self.test_id_start = 10
         self.spec = None
-        self.rows: list[list[str]] = []
+        self.cnx = None
+        self.data_needs: dict[str, Callable[[Any], Any]] = {}
+        self.omit_if_empty = False
+        self._prefetched: dict[str, Future] = {}
+        self.stream_cnx = None
+        self._store: Optional[ColumnStore] = None
+        self._producer: Optional[Callable[[], Any]] = None
+        self._source: Optional[Callable[[Any], Iterable[list[str]]]] = None
         return
 
+    # ---------------------------------------------------------------------------
+    #  Properties
+    # ---------------------------------------------------------------------------
+
+    @property
+    def is_evaluated(self) -> bool:
+        """
+        Return True if the rows of the table have been produced.
+        """
+        return self._producer is None
+
+    @property
+    def is_streamed(self) -> bool:
+        """
+        Return True if the table has rows to be read from a row source.
+        """
+        return self._source is not None
+
+    @property
+    def rows(self) -> ColumnStore:
+        """
+        Return the rows that have been added to the table, stored by column.
+        """
+        if self._store is None:
+            assert self.columns is not None, "columns must not be None"
+            assert len(self.columns) > 0, "Table columns must be set before adding rows"
+            self._store = ColumnStore(len(self.columns))
+        return self._store
+
     # ---------------------------------------------------------------------------
     #  Operations
     # ---------------------------------------------------------------------------
 
-    def add_row(self, row: list[str]):
+    def add_row(self, row: Sequence[str]):
         """
         Add a test row to the test table.
 
@@ -52,19 +108,135 @@ class TestTableSpecification:
             row - a row of test values
         """
         assert row is not None, "row must not be None"
-        assert self.columns is not None, "columns must not be None"
-        assert len(self.columns) > 0, "Table columns must be set before adding rows"
-        assert len(self.columns) == len(row), "Number of values in row does not equal number of columns"
         self.rows.append(row)
         return
 
+    def add_rows(self, rows: Iterable[Sequence[str]]):
+        """
+        Add test rows to the test table in bulk.
+
+        Arguments:
+            rows - the rows of test values
+        """
+        assert rows is not None, "rows must not be None"
+        self.rows.extend(rows)
+        return
+
+    def defer(self, producer: Callable[[], Any]):
+        """
+        Set the function that produces the rows of the table.  The function is called
+        once, when the rows are first needed.
+
+        Arguments:
+            producer - a function without arguments that adds the rows to the table
+        """
+        assert producer is not None, "producer must not be None"
+        assert self.is_evaluated, "The rows of the table are already deferred"
+        self._producer = producer
+        return
+
+    def evaluate(self):
+        """
+        Produce the rows of the table, if they have not been produced.
+        """
+        if self._producer is not None:
+            producer = self._producer
+            self._producer = None
+            producer()
+        return
+
+    def stream(self, source: Callable[[Any], Iterable[list[str]]]):
+        """
+        Set the function that yields the rows of the table as the table is written.  The
+        rows follow any rows added to the table, and they are not kept.
+
+        Arguments:
+            source - a function that takes a database connection and returns an iterable
+               of the rows
+        """
+        assert source is not None, "source must not be None"
+        assert not self.is_streamed, "The table already has a row source"
+        self._source = source
+        return
+
+    def iter_rows(self) -> Iterator[Sequence[str]]:
+        """
+        Return an iterator of the rows of the table.  The rows are produced if they have not
+        been produced.  The rows of a row source are read from the connection in stream_cnx,
+        or from the connection of the table, and are checked as they are read.
+        """
+        self.evaluate()
+        if self._store is not None:
+            yield from self._store
+        if self._source is not None:
+            source = self._source
+            self._source = None
+            cnx = self.stream_cnx if self.stream_cnx is not None else self.cnx
+            for row in source(cnx):
+                assert len(self.columns) == len(row), "Number of values in row does not equal number of columns"
+                yield row
+        return
+
+    def declare_need(self, name: str, function: Callable[[Any], Any]):
+        """
+        Declare data that the table needs to generate its rows.  The data is produced by
+        a function of a database connection, so that it can be read ahead on another
+        connection.
+
+        Arguments:
+            name - the name of the data
+            function - a function that takes a database connection and returns the data
+        """
+        assert name is not None, "name must not be None"
+        assert function is not None, "function must not be None"
+        self.data_needs[name] = function
+        return
+
+    def prefetch(self, prefetcher: Optional[Prefetcher] = None):
+        """
+        Start reading the data the table needs.  Nothing is started if there is no prefetcher.
+
+        Arguments:
+            prefetcher - the prefetcher to use, or None to use the default prefetcher
+        """
+        if prefetcher is None:
+            prefetcher = Prefetcher.default
+        if prefetcher is not None:
+            for name, function in self.data_needs.items():
+                if name not in self._prefetched:
+                    future = prefetcher.submit(function)
+                    if future is not None:
+                        self._prefetched[name] = future
+        return
+
+    def fetch(self, name: str):
+        """
+        Return data the table needs.  Data that was prefetched is returned when it is
+        available.  Otherwise, it is read on the connection of the table.
+
+        Arguments:
+            name - the name of the data
+        """
+        assert name in self.data_needs, "Data need has not been declared: " + name
+        future = self._prefetched.pop(name, None)
+        if future is not None:
+            result = future.result()
+        else:
+            assert self.cnx is not None, "The table has no connection to read " + name
+            result = self.data_needs[name](self.cnx)
+        return result
+
     @property
     def number_rows(self):
         """
         The number of the row in the table.  The first row with data, after
-        the fixture and headings, is number 1.
+        the fixture and headings, is number 1.  The rows are produced if they
+        have not been produced.  The number of rows of a streamed table is not
+        known until the table is written.
         """
-        return len(self.rows) - 1
+        assert not self.is_streamed, "The number of rows of a streamed table is not known"
+        self.evaluate()
+        return (len(self._store) if self._store is not None else 0) - 1
 
     @property
     def has_rows(self):
@@ -115,22 +287,84 @@ class TestCaseSpecification:
         """
         return len(self.tables)
 
+    @property
+    def is_evaluated(self) -> bool:
+        """
+        Return True if the rows of every table have been produced.
+        """
+        return all(table.is_evaluated for table in self.tables)
+
     # ---------------------------------------------------------------------------
     #  Operations
     # ---------------------------------------------------------------------------
 
-    def add_test_table(self, test_table: TestTableSpecification):
+    def add_test_table(self, test_table: TestTableSpecification, producer: Optional[Callable[[], Any]] = None,
+                       omit_if_empty: bool = False):
         """
         Add a test table specification to the test case specification.
 
         Arguments:
             test_table - an instance of the test table
+            producer - the function that produces the rows of the table when they are
+               needed, or None if the table already has its rows
+            omit_if_empty - True if the table is left out of the test case when it has
+               no rows of data
         """
         assert test_table is not None, "test table must not be None"
+        if producer is not None:
+            test_table.defer(producer)
+        test_table.omit_if_empty = omit_if_empty
         self.tables.append(test_table)
         test_table.spec = self
         return
 
+    def iter_tables(self) -> Iterator[TestTableSpecification]:
+        """
+        Return an iterator of the tables of the test case.  The rows of each table are
+        produced when the iterator reaches the table, and a table without rows of data
+        is skipped if it may be omitted.
+        """
+        for table in self.tables:
+            table.evaluate()
+            if not (table.omit_if_empty and not table.is_streamed and not table.has_rows):
+                yield table
+        return
+
+    def evaluate(self) -> "TestCaseSpecification":
+        """
+        Produce the rows of every table and return this specification.  The rows of a
+        row source are not read until the table is written.
+        """
+        for table in self.tables:
+            table.evaluate()
+        return self
+
+    def prefetch(self, prefetcher: Optional[Prefetcher] = None) -> "TestCaseSpecification":
+        """
+        Start reading the data the tables need and return this specification.  Creating a
+        specification does not read the database, so this is called once the specification
+        is chosen to be written.  Nothing is started if there is no prefetcher.
+
+        Arguments:
+            prefetcher - the prefetcher to use, or None to use the default prefetcher
+        """
+        for table in self.tables:
+            table.prefetch(prefetcher)
+        return self
+
+    def attach(self, cnx):
+        """
+        Set the connection from which the streamed tables read their rows.  A specification
+        prepared on another connection is attached to the connection used to write it.
+
+        Arguments:
+            cnx - a connection to the database
+        """
+        assert cnx is not None, "connection must not be None"
+        for table in self.tables:
+            table.stream_cnx = cnx
+        return
+
     def build_test_suite_directory(self, test_suite_directory):
         """
         Construct the full test suite directory consisting of:
@@ -23,11 +23,14 @@ __version__ = "03-Sep-2021"
 The test case module contains the TestCase class.
 """
 
+import sys
+from typing import TextIO
 from xml.dom import minidom
 from xml.etree.ElementTree import Element
 from xml.etree.ElementTree import tostring
 from _datetime import date
 
+from models.htmlwriter import HtmlWriter
 from models.spec import TestCaseSpecification, TestTableSpecification
 from models.testcasetable import ColumnTestTable
 
@@ -36,6 +39,28 @@ from models.testcasetable import ColumnTestTable
 #  Test Case Class
 # -------------------------------------------------------------------------------
 
+HTML_ATTRIBUTES = {
+    "xmlns": "http://www.w3.org/1999/xhtml",
+    "xml:lang": "en"
+}
+
+STYLE_ATTRIBUTES = {
+    "type": "text/css"
+}
+
+STYLE_CSS = """
+              td.unique
+              {
+                color : red;
+                font : bold
+              }
+              td.claimnumber
+              {
+                color : purple;
+                font  : bold
+              }
+              """
+
 
 class TestCase:
     """
@@ -59,7 +84,6 @@ class TestCase:
         """
         assert spec is not None, "Test specification must not be None"
         assert num > 0, "Test case number must be positive, not: " + str(num)
-        self._html: Element = Element("html")
         self._author: str = spec.author
         self._description: str = spec.description
         self._test_case_number: int = num
@@ -117,18 +141,6 @@ class TestCase:
     #  Element Creation Operations
     # ---------------------------------------------------------------------------
 
-    def initialize(self) -> str:
-        """
-        Create the initial hierarchy of a test case file.
-        """
-        root = self.create_html()
-        head = self.create_head()
-        root.append(head)
-        body = self.create_body()
-        root.append(body)
-        self._html = self.prettify(root)
-        return self._html
-
     @staticmethod
     def create_html() -> Element:
         """
@@ -137,11 +149,7 @@ class TestCase:
         Returns:
             HTML element
         """
-        attrib = {
-            "xmlns": "http://www.w3.org/1999/xhtml",
-            "xml:lang": "en"
-        }
-        root = Element("html", attrib)
+        root = Element("html", HTML_ATTRIBUTES)
         return root
 
     def create_head(self) -> Element:
@@ -161,24 +169,8 @@ class TestCase:
         """
         Create the style element that defines the unique and claim number classes.
         """
-        attrib = {
-            "type": "text/css"
-        }
-
-        style = Element("style", attrib)
-        css = """
-              td.unique
-              {
-                color : red;
-                font : bold
-              }
-              td.claimnumber
-              {
-                color : purple;
-                font  : bold
-              }
-              """
-        style.text = css
+        style = Element("style", STYLE_ATTRIBUTES)
+        style.text = STYLE_CSS
         return style
 
     def create_body(self) -> Element:
@@ -205,7 +197,7 @@ class TestCase:
             spec - the test specification
         """
 
-        for table_spec in self._spec.tables:
+        for table_spec in self._spec.iter_tables():
             self.format_test_table(body, table_spec)
         return
 
@@ -238,12 +230,8 @@ class TestCase:
         Create a description list element with information about the test case.
         """
         dl = Element("dl")
-        TestCase.create_dl_dt(dl, "Project:", self.project)
-        TestCase.create_dl_dt(dl, "Author:", self.author)
-        a_date = str(date.today())
-        TestCase.create_dl_dt(dl, "Date:", a_date)
-        TestCase.create_dl_dt(dl, "Repeatable:", self._spec.repeatable)
-        TestCase.create_dl_dt(dl, "Description:", self.description)
+        for term, description in self.description_items():
+            TestCase.create_dl_dt(dl, term, description)
         return dl
 
     @staticmethod
@@ -264,6 +252,88 @@ class TestCase:
         dl.append(dd)
         return
 
+    # ---------------------------------------------------------------------------
+    #  Streaming Operations
+    # ---------------------------------------------------------------------------
+
+    def write(self, file: TextIO, pretty: bool = True):
+        """
+        Write the test case to a file.  The head, the description list, and each row of
+        each test table are written as they are produced, so the test case is never
+        held in memory as a whole.
+
+        Arguments:
+            file - a text file open for writing
+            pretty - True if the elements are to be indented on separate lines
+        """
+        writer = HtmlWriter(file, pretty)
+        writer.start_document()
+        writer.start_element("html", HTML_ATTRIBUTES)
+        self.write_head(writer)
+        writer.start_element("body")
+        self.write_test_description(writer)
+        writer.empty_element("hr")
+        for table_spec in self._spec.iter_tables():
+            self.write_test_table(writer, table_spec)
+        writer.end_element("body")
+        writer.end_element("html")
+        writer.end_document()
+        return
+
+    def write_head(self, writer: HtmlWriter):
+        """
+        Write the head element.
+
+        Arguments:
+            writer - the writer for the test case file
+        """
+        writer.start_element("head")
+        writer.text_element("title", self.title)
+        writer.text_element("style", STYLE_CSS, STYLE_ATTRIBUTES)
+        writer.end_element("head")
+        return
+
+    def write_test_description(self, writer: HtmlWriter):
+        """
+        Write a description list element with information about the test case.
+
+        Arguments:
+            writer - the writer for the test case file
+        """
+        writer.start_element("dl")
+        for term, description in self.description_items():
+            writer.text_element("dt", term)
+            writer.text_element("dd", description)
+        writer.end_element("dl")
+        return
+
+    @staticmethod
+    def write_test_table(writer: HtmlWriter, table_spec: TestTableSpecification):
+        """
+        Write the H2 heading and the test table.
+
+        Arguments:
+            writer - the writer for the test case file
+            table_spec - an instance of the test table specification
+        """
+        writer.text_element("h2", table_spec.heading)
+        table = ColumnTestTable(None, table_spec)
+        table.write_table(writer)
+        return
+
+    def description_items(self) -> list[tuple[str, str]]:
+        """
+        Return the terms and descriptions in the description list.
+        """
+        items = [
+            ("Project:", self.project),
+            ("Author:", self.author),
+            ("Date:", str(date.today())),
+            ("Repeatable:", self._spec.repeatable),
+            ("Description:", self.description)
+        ]
+        return items
+
     # ---------------------------------------------------------------------------
     #  Output Operations
     # ---------------------------------------------------------------------------
@@ -281,5 +351,5 @@ class TestCase:
         """
         Output the file to standard out.
         """
-        print(TestCase.prettify(self._html))
+        self.write(sys.stdout)
         return
@@ -25,8 +25,11 @@ column headings.  If the fixture is an action fixture, there is no row of column
 The remaining rows contain the test data.
 """
 
+from typing import Optional
 from xml.etree.ElementTree import Element
 
+from models.columnstore import ColumnStore
+from models.htmlwriter import HtmlWriter
 from models.spec import TestTableSpecification
 
 # -------------------------------------------------------------------------------
@@ -45,15 +48,15 @@ class TestTable:
     #  Constructor
     # ---------------------------------------------------------------------------
 
-    def __init__(self, body: Element, table_spec: TestTableSpecification):
+    def __init__(self, body: Optional[Element], table_spec: TestTableSpecification):
         """
         Initialize the instance of this class.
 
         Arguments:
-            body - the HTML body element
+            body - the HTML body element.  The body can be None when the table is written
+              with write_table.
             table_spec - the specification for the table
         """
-        assert body is not None, "Test case body must not be None"
         assert table_spec is not None, "Product specification must not be None"
         self._table_spec: TestTableSpecification = table_spec
         self._body: Element = body
@@ -111,10 +114,11 @@ class TestTable:
         return self._table_spec
 
     @property
-    def rows(self) -> list[list[str]]:
+    def rows(self) -> ColumnStore:
         """
-        Return the list of row values.
+        Return the row values.  The rows are produced if they have not been produced.
         """
+        self._table_spec.evaluate()
         return self._table_spec.rows
 
     # ---------------------------------------------------------------------------
@@ -167,6 +171,28 @@ class TestTable:
         self.add_row(row, None)
         return
 
+    def write_table(self, writer: HtmlWriter):
+        """
+        Write the table element directly to the output.
+
+        Arguments:
+            writer - the writer for the test case file
+        """
+        writer.start_element("table", {"border": "1"})
+        writer.row([self.fixture])
+        self.write_rows(writer)
+        writer.end_element("table")
+        return
+
+    def write_rows(self, writer: HtmlWriter):
+        """
+        Write the rows that follow the fixture.  This function is implemented in the subclass.
+
+        Arguments:
+            writer - the writer for the test case file
+        """
+        return
+
 
 # -------------------------------------------------------------------------------
 #  Column fixture test table
@@ -187,7 +213,8 @@ class ColumnTestTable(TestTable):
         Initialize this instance of this class.
 
         Arguments:
-            body -
+            body - the HTML body element, or None when the table is written with write_table
+            table_spec - the specification for the table
         """
         super().__init__(body, table_spec)
         # set the row number to -1 to account for the fixture and heading rows.
@@ -212,7 +239,7 @@ class ColumnTestTable(TestTable):
         The number of the row in the table.  The first row with data, after
         the fixture and headings, is number 1.
         """
-        return len(self._table_spec.rows) - 1
+        return self._table_spec.number_rows
 
     @property
     def has_rows(self):
@@ -237,10 +264,24 @@ class ColumnTestTable(TestTable):
         #
         # Add the test rows
         #
-        for row in self.rows:
+        for row in self.table_spec.iter_rows():
             self.add_row(row, None)
         return self._table
 
+    def write_rows(self, writer: HtmlWriter):
+        """
+        Write the column headings and the test rows.  Each row is written as soon as it is
+        obtained from the table specification, so the rows of a streamed table go from the
+        database cursor to the file without being kept.
+
+        Arguments:
+            writer - the writer for the test case file
+        """
+        writer.row(self.headings, self.table_spec.is_unique)
+        for row in self.table_spec.iter_rows():
+            writer.row(row)
+        return
+
     def add_row(self, values, is_unique):
         """
         Overriding add_row in super class to increment row number.
@@ -0,0 +1,169 @@
+# -------------------------------------------------------------------------------
+#
+#  Copyright (c) 2021 Waysys LLC
+#
+# -------------------------------------------------------------------------------
+# -------------------------------------------------------------------------------
+#
+__author__ = 'Bill Shaffer'
+__version__ = "16-Oct-2021"
+
+"""
+This module tests dividing a query over a range of dates into ranges that are queried
+at the same time, and combining the results of the ranges in order.  The accounts are
+read from the SQLite stand-in for the PolicyCenter database.
+"""
+
+import threading
+import time
+import unittest
+from datetime import datetime, timedelta
+
+import xmlrunner
+
+from base.partition import split_date_range, run_partitioned, iter_partitioned
+from queries.policycenterqueries import PolicyCenterQueries
+from standinfixture import StandInTestCase
+
+#
+# The number of accounts in the stand-in
+#
+NUMBER_ACCOUNTS = 30
+
+
+# -------------------------------------------------------------------------------
+#  Test Partition
+# -------------------------------------------------------------------------------
+
+
+class TestPartition(StandInTestCase):
+    """
+    This class tests the division of date ranges and the order of the combined results.
+    """
+
+    # -------------------------------------------------------------------------------
+    #  Support Functions
+    # -------------------------------------------------------------------------------
+
+    def setUp(self):
+        """
+        Create a stand-in database with accounts created over ten days.  Some accounts share
+        a creation time.
+        """
+        super().setUp()
+        for index in range(1, NUMBER_ACCOUNTS + 1):
+            created = datetime(2021, 9, 1) + timedelta(hours=(index // 2) * 7)
+            self.add_account(index, "A" + str(index).rjust(4, "0"), created)
+        self.cnx.commit()
+        self.selection_start = datetime(2021, 9, 1)
+        self.selection_end = datetime(2021, 9, 11)
+        return
+
+    @staticmethod
+    def delayed(index: int, delay: float):
+        """
+        Return a function of a connection that waits and then returns its index and the
+        name of the thread it ran on.
+
+        Arguments:
+            index - the index of the function
+            delay - the number of seconds to wait
+        """
+        def function(cnx):
+            time.sleep(delay)
+            return index, threading.current_thread().name
+        return function
+
+    # -------------------------------------------------------------------------------
+    #  Tests
+    # -------------------------------------------------------------------------------
+
+    def test_01_split_date_range(self):
+        """
+        Test that the ranges are consecutive whole days that cover the selection.
+        """
+        ranges = split_date_range(self.selection_start, self.selection_end, 4)
+        self.assertEqual([3, 3, 2, 2], [(end - start).days for start, end in ranges])
+        self.assertEqual(self.selection_start, ranges[0][0])
+        self.assertEqual(self.selection_end, ranges[-1][1])
+        for prior, following in zip(ranges, ranges[1:]):
+            self.assertEqual(prior[1], following[0])
+        self.assertEqual(2, len(split_date_range(datetime(2021, 9, 1), datetime(2021, 9, 3), 4)))
+        short = split_date_range(datetime(2021, 9, 1, 8), datetime(2021, 9, 1, 20), 4)
+        self.assertEqual([(datetime(2021, 9, 1, 8), datetime(2021, 9, 1, 20))], short)
+        self.assertRaises(AssertionError, split_date_range, self.selection_start, self.selection_end, 0)
+        return
+
+    def test_02_run_partitioned(self):
+        """
+        Test that the results are in the order of the functions when the later functions
+        finish first, and that the functions run at the same time only on a pooled connection.
+        """
+        functions = [self.delayed(index, 0.05 * (3 - index)) for index in range(3)]
+        pooled_cnx = self.pool.checkout()
+        try:
+            results = run_partitioned(pooled_cnx, functions)
+        finally:
+            pooled_cnx.close()
+        self.assertEqual([0, 1, 2], [index for index, thread_name in results])
+        self.assertEqual(threading.current_thread().name, results[0][1])
+        self.assertTrue(all(thread_name.startswith("partition") for index, thread_name in results[1:]))
+        results = run_partitioned(self.cnx, functions)
+        self.assertEqual([(index, threading.current_thread().name) for index in range(3)], results)
+        return
+
+    def test_03_iter_partitioned(self):
+        """
+        Test that the rows are yielded in the order of the functions, that a failure is
+        raised to the caller, and that the functions stop when the caller stops reading.
+        """
+        functions = [lambda cnx, first=first: iter(range(first, first + 10)) for first in (0, 10, 20)]
+        pooled_cnx = self.pool.checkout()
+        try:
+            self.assertEqual(list(range(30)), list(iter_partitioned(pooled_cnx, functions, buffer_size=2)))
+            rows = iter_partitioned(pooled_cnx, functions, buffer_size=2)
+            self.assertEqual([0, 1, 2], [next(rows) for _ in range(3)])
+            rows.close()
+
+            def failing(cnx):
+                yield 10
+                raise ValueError("range failed")
+
+            rows = iter_partitioned(pooled_cnx, [functions[0], failing], buffer_size=2)
+            self.assertRaises(ValueError, list, rows)
+        finally:
+            pooled_cnx.close()
+        self.assertEqual(self.pool.size, self.pool.idle_count, "A range did not return its connection")
+        self.assertEqual(list(range(30)), list(iter_partitioned(self.cnx, functions)))
+        return
+
+    def test_04_accounts(self):
+        """
+        Test that the accounts read in ranges are the accounts read in one range, in the
+        order of their creation.
+        """
+        expected = [row.AccountNumber for row in PolicyCenterQueries(self.cnx).query_accounts(
+            self.selection_start, self.selection_end, partitions=1)]
+        self.assertEqual(NUMBER_ACCOUNTS, len(expected))
+        self.assertEqual(sorted(expected), expected)
+        pooled_cnx = self.pool.checkout()
+        try:
+            queries = PolicyCenterQueries(pooled_cnx)
+            for partitions in (2, 4, 20):
+                rows = queries.query_accounts(self.selection_start, self.selection_end, partitions=partitions)
+                self.assertEqual(expected, [row.AccountNumber for row in rows], "Partitions " + str(partitions))
+                rows = list(queries.iter_accounts(self.selection_start, self.selection_end, page_size=2,
+                                                  partitions=partitions))
+                self.assertEqual(expected, [row.AccountNumber for row in rows], "Partitions " + str(partitions))
+            self.assertEqual("Active", rows[0].AccountStatus)
+        finally:
+            pooled_cnx.close()
+        return
+
+
+if __name__ == '__main__':
+    report_file = '/GFITWorkspaces/COMMON01/partition_test.xml'
+    with open(report_file, 'w') as output:
+        unittest.main(
+            testRunner=xmlrunner.XMLTestRunner(output=output),
+            failfast=False, buffer=False, catchbreak=False)
@@ -0,0 +1,130 @@
+# -------------------------------------------------------------------------------
+#
+#  Copyright (c) 2021 Waysys LLC
+#
+# -------------------------------------------------------------------------------
+# -------------------------------------------------------------------------------
+#
+__author__ = 'Bill Shaffer'
+__version__ = "16-Oct-2021"
+
+"""
+This module tests the samples of producer codes read from the SQLite stand-in for the
+PolicyCenter database, both when they are chosen by the database and when they are chosen
+from the producer codes held in the reference data store.  A sample depends only on its
+seed and the IDs of the producer codes.
+"""
+
+import os
+import unittest
+
+import xmlrunner
+
+from base.referencedata import ReferenceDataStore
+from queries.policycenterqueries import PolicyCenterQueries
+from standinfixture import StandInTestCase
+
+#
+# The number of producer codes in the stand-in.  Every tenth one is inactive.
+#
+NUMBER_PRODUCER_CODES = 200
+
+
+# -------------------------------------------------------------------------------
+#  Test Producer Code
+# -------------------------------------------------------------------------------
+
+
+class TestProducerCode(StandInTestCase):
+    """
+    This class tests the samples of producer codes.
+    """
+
+    # -------------------------------------------------------------------------------
+    #  Support Functions
+    # -------------------------------------------------------------------------------
+
+    def setUp(self):
+        """
+        Create a stand-in database with producer codes.
+        """
+        super().setUp()
+        for index in range(1, NUMBER_PRODUCER_CODES + 1):
+            status = "Inactive" if index % 10 == 0 else "Active"
+            self.add_producer_code(index, "PC" + str(index).rjust(4, "0"), status)
+        self.cnx.commit()
+        self.queries = PolicyCenterQueries(self.cnx)
+        return
+
+    def tearDown(self):
+        """
+        Remove the reference data store set by a test.
+        """
+        ReferenceDataStore.default_store = None
+        super().tearDown()
+        return
+
+    def use_store(self) -> ReferenceDataStore:
+        """
+        Set a reference data store in a temporary directory as the default store.
+        """
+        store = ReferenceDataStore(os.path.join(self.directory.name, "reference"), self.cnx.identity)
+        ReferenceDataStore.default_store = store
+        return store
+
+    @staticmethod
+    def codes(rows) -> list[str]:
+        """
+        Return the producer code of each row.
+
+        Arguments:
+            rows - the rows of a producer code query
+        """
+        return [row.ProducerCode for row in rows]
+
+    # -------------------------------------------------------------------------------
+    #  Tests
+    # -------------------------------------------------------------------------------
+
+    def test_01_store_sample(self):
+        """
+        Test that the samples chosen from the reference data store are the samples chosen by
+        the database, and that the store reads the producer codes only once.
+        """
+        percent_sample = self.codes(self.queries.sample_producer_codes(30, seed=11))
+        reservoir_sample = self.codes(self.queries.reservoir_producer_codes(15, seed=11))
+        store = self.use_store()
+        self.assertEqual(percent_sample, self.codes(self.queries.sample_producer_codes(30, seed=11)))
+        self.assertEqual(reservoir_sample, self.codes(self.queries.reservoir_producer_codes(15, seed=11)))
+        self.assertEqual(1, store.loads)
+        producer_codes = self.queries.query_producer_codes()
+        self.assertEqual(NUMBER_PRODUCER_CODES - NUMBER_PRODUCER_CODES // 10, len(producer_codes))
+        self.assertEqual(sorted(self.codes(producer_codes)), self.codes(producer_codes))
+        self.assertEqual("Active", producer_codes[0].ProducerStatus)
+        self.assertEqual("CA", producer_codes[0].State)
+        return
+
+    def test_02_seeded_sample(self):
+        """
+        Test that the database chooses the same sample for the same seed, a different sample
+        for a different seed, and about the requested share of the producer codes.
+        """
+        active = NUMBER_PRODUCER_CODES - NUMBER_PRODUCER_CODES // 10
+        sample = self.codes(self.queries.sample_producer_codes(30, seed=11))
+        self.assertEqual(sample, self.codes(self.queries.sample_producer_codes(30, seed=11)))
+        self.assertEqual(sorted(sample), sample)
+        self.assertNotEqual(sample, self.codes(self.queries.sample_producer_codes(30, seed=12)))
+        self.assertTrue(0.2 * active <= len(sample) <= 0.4 * active, "Sample of " + str(len(sample)))
+        self.assertEqual([], self.queries.sample_producer_codes(0, seed=11))
+        self.assertEqual(active, len(self.queries.sample_producer_codes(100, seed=11)))
+        larger = self.codes(self.queries.sample_producer_codes(60, seed=11))
+        self.assertTrue(set(sample) < set(larger), "A larger share must include the smaller share")
+        return
+
+
+if __name__ == '__main__':
+    report_file = '/GFITWorkspaces/COMMON01/producer_code_test.xml'
+    with open(report_file, 'w') as output:
+        unittest.main(
+            testRunner=xmlrunner.XMLTestRunner(output=output),
+            failfast=False, buffer=False, catchbreak=False)
@@ -0,0 +1,553 @@
+# -------------------------------------------------------------------------------
+#
+#  Copyright (c) 2021 Waysys LLC
+#
+# -------------------------------------------------------------------------------
+# -------------------------------------------------------------------------------
+#
+__author__ = 'Bill Shaffer'
+__version__ = "16-Oct-2021"
+
+"""
+This module fills a PolicyCenter stand-in database with synthetic accounts, policies,
+policy periods, payment plan summaries, and producer codes.  The volumes are set by the
+caller.  The values follow the distributions below, which are meant to resemble a
+production PolicyCenter database, so that test case generation can be timed on a data
+set of realistic size and shape.
+
+The rows are inserted in batches of accounts, with one executemany per table and one
+commit per batch.  Rows are added after the rows already in the database, so a data set
+can be grown in several runs.  The same seed and volumes produce the same data.
+
+Usage:
+    python -m queries.policycenterdatagen --accounts 1000000 [--path FILE] [--seed N]
+"""
+
+import argparse
+import sqlite3
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+from typing import Optional
+
+from base.configuration import default_standin_path
+from base.testexception import TestException
+from base.testrandom import Random, DEFAULT_SEED
+from models.billingperiodicity import BillingPeriodicity
+from models.policyperiod import PolicyPeriod
+from queries.policycenterstandin import create_standin
+
+#
+# The number of accounts whose rows are inserted with each batch
+#
+DEFAULT_BATCH_ACCOUNTS = 20000
+
+DEFAULT_PRODUCER_CODES = 500
+
+DEFAULT_INDUSTRY_CODES = 60
+
+#
+# The weights of the values of each column.  Each value is selected in proportion to its
+# weight.
+#
+ACCOUNT_STATUS_WEIGHTS = {"Active": 90, "Pending": 7, "Withdrawn": 3}
+ACCOUNT_ORG_TYPE_WEIGHTS = {"individual": 70, "corporation": 12, "llc": 8, "partnership": 4,
+                            "soleproprietorship": 4, "other": 2}
+CONTACT_TYPE_WEIGHTS = {"Person": 80, "Company": 20}
+PRODUCER_STATUS_WEIGHTS = {"Active": 85, "Inactive": 10, "Terminated": 5}
+POLICY_PERIOD_STATUS_WEIGHTS = {"Bound": 82, "Quoted": 6, "Draft": 4, "Withdrawn": 3, "Declined": 2,
+                                "NotTaken": 2, "Binding": 1}
+BILLING_PERIODICITY_WEIGHTS = {
+    BillingPeriodicity.monthly: 45,
+    BillingPeriodicity.everyyear: 15,
+    BillingPeriodicity.quarterly: 15,
+    BillingPeriodicity.everysixmonths: 10,
+    BillingPeriodicity.twicepermonth: 5,
+    BillingPeriodicity.everyothermonth: 4,
+    BillingPeriodicity.everyfourmonths: 3,
+    BillingPeriodicity.everyweek: 1,
+    BillingPeriodicity.everyotherweek: 1,
+    BillingPeriodicity.everyotheryear: 1
+}
+
+#
+# The weights of the number of policies of an account and of the number of terms of a policy
+#
+POLICIES_PER_ACCOUNT_WEIGHTS = {1: 62, 2: 24, 3: 9, 4: 5}
+TERMS_PER_POLICY_WEIGHTS = {1: 70, 2: 22, 3: 8}
+
+#
+# The weights of the length of a term in months
+#
+TERM_MONTHS_WEIGHTS = {12: 85, 6: 15}
+
+#
+# The percentage of accounts with an industry code, of accounts with a named insured
+# in addition to the account holder, and of bound policy periods that are cancelled
+#
+INDUSTRY_CODE_PERCENT = 70
+NAMED_INSURED_PERCENT = 25
+CANCELLATION_PERCENT = 8
+
+#
+# The premium is log-normal.  The taxes are a percentage of the premium.
+#
+PREMIUM_MEDIAN = 1200.0
+PREMIUM_SIGMA = 0.6
+TAX_RATE_RANGE = (0.03, 0.08)
+
+#
+# The greatest number of days from the creation of an account to the start of its first
+# policy period, and from the creation of a policy period to its start
+#
+FIRST_PERIOD_DAYS = 60
+QUOTE_DAYS = 30
+
+FIRST_NAMES = ["James", "Mary", "Robert", "Patricia", "John", "Jennifer", "Michael", "Linda", "David",
+               "Elizabeth", "William", "Barbara", "Richard", "Susan", "Joseph", "Jessica", "Thomas", "Sarah",
+               "Charles", "Karen", "Daniel", "Lisa", "Matthew", "Nancy", "Anthony", "Betty", "Mark", "Sandra"]
+LAST_NAMES = ["Smith", "Johnson", "Williams", "Brown", "Jones", "Garcia", "Miller", "Davis", "Rodriguez",
+              "Martinez", "Hernandez", "Lopez", "Gonzalez", "Wilson", "Anderson", "Thomas", "Taylor", "Moore",
+              "Jackson", "Martin", "Lee", "Perez", "Thompson", "White", "Harris", "Sanchez", "Clark", "Lewis"]
+COMPANY_SUFFIXES = ["Inc.", "LLC", "Corp.", "Partners", "Group", "Holdings"]
+CITIES = ["Springfield", "Riverside", "Franklin", "Greenville", "Bristol", "Clinton", "Fairview", "Salem",
+          "Madison", "Georgetown", "Arlington", "Ashland", "Dover", "Oxford", "Jackson", "Burlington"]
+STREETS = ["Main St", "Oak Ave", "Pine St", "Maple Ave", "Cedar Ln", "Elm St", "Washington Blvd", "Lake Dr"]
+
+insert_statements = {
+    "pc_account": "INSERT INTO pc_account (id, accountnumber, accountorgtype, accountstatus, industrycodeid, "
+                  "retired, createtime, updatetime) VALUES (?, ?, ?, ?, ?, 0, ?, ?)",
+    "pc_contact": "INSERT INTO pc_contact (id, subtype, firstname, lastname, name, retired) "
+                  "VALUES (?, ?, ?, ?, ?, 0)",
+    "pc_accountcontact": "INSERT INTO pc_accountcontact (id, account, contact, retired) VALUES (?, ?, ?, 0)",
+    "pc_accountcontactrole": "INSERT INTO pc_accountcontactrole (id, accountcontact, subtype, retired) "
+                             "VALUES (?, ?, ?, 0)",
+    "pc_policy": "INSERT INTO pc_policy (id, accountid, retired) VALUES (?, ?, 0)",
+    "pc_policyperiod": "INSERT INTO pc_policyperiod (id, policyid, policynumber, periodstart, periodend, "
+                       "cancellationdate, taxsurchargesrpt, totalpremiumrpt, totalcostrpt, status, retired, "
+                       "createtime, updatetime) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 0, ?, ?)",
+    "pc_paymentplansummary": "INSERT INTO pc_paymentplansummary (id, policyperiod, name, invoicefrequency, "
+                             "paymentplantype, billingid, retired, updatetime) VALUES (?, ?, ?, ?, ?, ?, 0, ?)",
+    "pc_industrycode": "INSERT INTO pc_industrycode (id, code, retired) VALUES (?, ?, 0)",
+    "pc_organization": "INSERT INTO pc_organization (id, name, retired, updatetime) VALUES (?, ?, 0, ?)",
+    "pc_address": "INSERT INTO pc_address (id, addressline1, city, state, postalcode, retired) "
+                  "VALUES (?, ?, ?, ?, ?, 0)",
+    "pc_producercode": "INSERT INTO pc_producercode (id, code, producerstatus, organizationid, addressid, "
+                       "retired, updatetime) VALUES (?, ?, ?, ?, ?, 0, ?)"
+}
+
+
+# -------------------------------------------------------------------------------
+#  PolicyCenter Data Generator
+# -------------------------------------------------------------------------------
+
+
+class PolicyCenterDataGenerator:
+    """
+    This class fills a PolicyCenter stand-in database with synthetic data.
+    """
+
+    # ---------------------------------------------------------------------------
+    #  Constructor
+    # ---------------------------------------------------------------------------
+
+    def __init__(self, path: str, seed: int = DEFAULT_SEED, batch_accounts: int = DEFAULT_BATCH_ACCOUNTS):
+        """
+        Initialize the instance of this class.  The stand-in database is created if it does
+        not exist.
+
+        Arguments:
+            path - the path of the stand-in database
+            seed - the seed of the random values
+            batch_accounts - the number of accounts whose rows are inserted with each batch
+        """
+        assert path is not None, "Database path must not be None"
+        assert batch_accounts > 0, "The batch size must be greater than 0, not " + str(batch_accounts)
+        self.path = path
+        self.random = Random(seed)
+        self.batch_accounts = batch_accounts
+        self.counts: dict[str, int] = {table: 0 for table in insert_statements}
+        self._cnx: Optional[sqlite3.Connection] = None
+        self._typelists: dict[str, dict[str, int]] = {}
+        self._next_ids: dict[str, int] = {}
+        self._industry_code_ids: list[int] = []
+        self._payment_plans: list[tuple] = []
+        return
+
+    # ---------------------------------------------------------------------------
+    #  Properties
+    # ---------------------------------------------------------------------------
+
+    @property
+    def total_rows(self) -> int:
+        """
+        Return the number of rows inserted.
+        """
+        return sum(self.counts.values())
+
+    # ---------------------------------------------------------------------------
+    #  Operations
+    # ---------------------------------------------------------------------------
+
+    def generate(self, accounts: int, start: datetime, end: datetime,
+                 producer_codes: int = DEFAULT_PRODUCER_CODES, industry_codes: int = DEFAULT_INDUSTRY_CODES):
+        """
+        Add accounts created between the start and the end, with their contacts, policies,
+        policy periods, and payment plan summaries.  Add the producer codes and industry
+        codes first.
+
+        Arguments:
+            accounts - the number of accounts
+            start - the creation time of the first account
+            end - the time after the creation of the last account
+            producer_codes - the number of producer codes
+            industry_codes - the number of industry codes, which are added only once
+        """
+        assert accounts >= 0, "The number of accounts must not be negative, not " + str(accounts)
+        assert start < end, "start " + str(start) + " must be before end " + str(end)
+        create_standin(self.path)
+        self._open()
+        try:
+            self._generate_industry_codes(industry_codes)
+            self._generate_producer_codes(producer_codes, end)
+            self._cnx.commit()
+            mean_gap = (end - start).total_seconds() / max(accounts, 1)
+            create_time = start
+            remaining = accounts
+            while remaining > 0:
+                count = min(self.batch_accounts, remaining)
+                create_time = self._generate_accounts(count, create_time, mean_gap, end)
+                self._cnx.commit()
+                remaining -= count
+        finally:
+            self._close()
+        return
+
+    def report(self) -> str:
+        """
+        Return a summary of the number of rows inserted into each table.
+        """
+        return "\n".join(table.ljust(24) + str(count).rjust(12) for table, count in self.counts.items()) + \
+            "\n" + "Total".ljust(24) + str(self.total_rows).rjust(12)
+
+    # ---------------------------------------------------------------------------
+    #  Support Functions
+    # ---------------------------------------------------------------------------
+
+    def _open(self):
+        """
+        Open the database for a bulk load and read the typelists and the next IDs.  The
+        journal is kept in memory and writes are not synchronized, so a load that is
+        interrupted may leave a damaged database that must be created again.
+        """
+        try:
+            self._cnx = sqlite3.connect(self.path)
+        except sqlite3.Error as e:
+            raise TestException("Unable to open stand-in database " + self.path + ": " + str(e))
+        self._cnx.execute("PRAGMA journal_mode = MEMORY")
+        self._cnx.execute("PRAGMA synchronous = OFF")
+        self._cnx.execute("PRAGMA cache_size = -200000")
+        for table in insert_statements:
+            self._next_ids[table] = self._cnx.execute("SELECT Coalesce(Max(id), 0) + 1 FROM " + table).fetchone()[0]
+        for (table,) in self._cnx.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name LIKE 'pctl_%'"):
+            self._typelists[table] = dict(self._cnx.execute("SELECT typecode, id FROM " + table).fetchall())
+        self._industry_code_ids = [row[0] for row in self._cnx.execute("SELECT id FROM pc_industrycode")]
+        self._payment_plans = self._define_payment_plans()
+        return
+
+    def _close(self):
+        """
+        Close the database.
+        """
+        if self._cnx is not None:
+            self._cnx.close()
+            self._cnx = None
+        return
+
+    def _insert(self, table: str, rows: list[tuple]):
+        """
+        Insert rows into a table.
+
+        Arguments:
+            table - the name of the table
+            rows - the values of the rows
+        """
+        if len(rows) > 0:
+            self._cnx.executemany(insert_statements[table], rows)
+            self.counts[table] += len(rows)
+        return
+
+    def _take_ids(self, table: str, count: int) -> int:
+        """
+        Reserve IDs for new rows of a table and return the first one.
+
+        Arguments:
+            table - the name of the table
+            count - the number of IDs
+        """
+        first = self._next_ids[table]
+        self._next_ids[table] = first + count
+        return first
+
+    def _select(self, weights: dict, count: int) -> list:
+        """
+        Return count values selected in proportion to their weights.
+
+        Arguments:
+            weights - the weight of each value
+            count - the number of values
+        """
+        return self.random.select_weighted(list(weights), list(weights.values()), count)
+
+    def _typelist_ids(self, table: str, weights: dict, count: int) -> list[int]:
+        """
+        Return count typelist IDs selected in proportion to the weights of their typecodes.
+
+        Arguments:
+            table - the name of the typelist table
+            weights - the weight of each typecode
+            count - the number of IDs
+        """
+        ids = self._typelists[table]
+        return [ids[typecode] for typecode in self._select(weights, count)]
+
+    def _define_payment_plans(self) -> list[tuple]:
+        """
+        Return the payment plans, one for each billing periodicity.  Each plan has its name,
+        its periodicity ID, its payment method ID, and its BillingCenter ID.
+        """
+        periodicity_ids = self._typelists["pctl_billingperiodicity"]
+        method_ids = self._typelists["pctl_paymentmethod"]
+        plans = []
+        for periodicity in BILLING_PERIODICITY_WEIGHTS:
+            if periodicity.number_installments > 0:
+                name = periodicity.name.capitalize() + " " + str(periodicity.number_invoices) + " Payments"
+                method = "Installments"
+            else:
+                name = periodicity.name.capitalize() + " Pay In Full"
+                method = "PaidInFull"
+            plans.append((name, periodicity_ids[periodicity.name], method_ids[method], "pp:" + periodicity.name))
+        return plans
+
+    def _generate_industry_codes(self, count: int):
+        """
+        Add the industry codes if there are none.
+
+        Arguments:
+            count - the number of industry codes
+        """
+        if len(self._industry_code_ids) == 0 and count > 0:
+            first_id = self._take_ids("pc_industrycode", count)
+            rows = [(first_id + index, str(1000 + index * 37)) for index in range(count)]
+            self._insert("pc_industrycode", rows)
+            self._industry_code_ids = [row[0] for row in rows]
+        return
+
+    def _generate_producer_codes(self, count: int, update_time: datetime):
+        """
+        Add producer codes, each with its own organization and address.
+
+        Arguments:
+            count - the number of producer codes
+            update_time - the time the producer codes were last updated
+        """
+        if count == 0:
+            return
+        first_id = self._take_ids("pc_producercode", count)
+        first_org_id = self._take_ids("pc_organization", count)
+        first_address_id = self._take_ids("pc_address", count)
+        statuses = self._typelist_ids("pctl_producerstatus", PRODUCER_STATUS_WEIGHTS, count)
+        states = list(self._typelists["pctl_state"].values())
+        updated = update_time.replace(microsecond=0).isoformat(" ")
+        organizations, addresses, codes = [], [], []
+        for index in range(count):
+            name = self.random.select_from_list(LAST_NAMES) + " " + \
+                self.random.select_from_list(["Insurance", "Agency", "Brokers", "Associates"])
+            organizations.append((first_org_id + index, name, updated))
+            addresses.append((first_address_id + index,
+                              self.random.get_random((1, 9999)) + " " + self.random.select_from_list(STREETS),
+                              self.random.select_from_list(CITIES),
+                              self.random.select_from_list(states),
+                              self.random.get_random((10000, 99999))))
+            codes.append((first_id + index, "PRC" + str(first_id + index).zfill(6), statuses[index],
+                          first_org_id + index, first_address_id + index, updated))
+        self._insert("pc_organization", organizations)
+        self._insert("pc_address", addresses)
+        self._insert("pc_producercode", codes)
+        return
+
+    def _generate_accounts(self, count: int, create_time: datetime, mean_gap: float, end: datetime) -> datetime:
+        """
+        Add a batch of accounts, each with a contact, its roles, its policies, and their
+        policy periods and payment plan summaries.  The accounts are created one after
+        another at random intervals.  Return the creation time of the last account.
+
+        Arguments:
+            count - the number of accounts
+            create_time - the creation time of the prior account
+            mean_gap - the mean number of seconds between the creation of two accounts
+            end - the time after the creation of the last account
+        """
+        random = self.random
+        first_id = self._take_ids("pc_account", count)
+        first_contact_id = self._take_ids("pc_contact", count)
+        first_account_contact_id = self._take_ids("pc_accountcontact", count)
+        statuses = self._typelist_ids("pctl_accountstatus", ACCOUNT_STATUS_WEIGHTS, count)
+        org_types = self._typelist_ids("pctl_accountorgtype", ACCOUNT_ORG_TYPE_WEIGHTS, count)
+        contact_types = self._select(CONTACT_TYPE_WEIGHTS, count)
+        policy_counts = self._select(POLICIES_PER_ACCOUNT_WEIGHTS, count)
+        contact_type_ids = self._typelists["pctl_contact"]
+        roles = self._typelists["pctl_accountcontactrole"]
+        accounts, contacts, account_contacts, contact_roles, policies = [], [], [], [], []
+        for index in range(count):
+            account_id = first_id + index
+            contact_id = first_contact_id + index
+            account_contact_id = first_account_contact_id + index
+            create_time = min(create_time + timedelta(seconds=random.get_exponential(mean_gap)),
+                              end - timedelta(seconds=1))
+            created = create_time.replace(microsecond=0).isoformat(" ")
+            industry_code = random.select_from_list(self._industry_code_ids) \
+                if self._industry_code_ids and random.select(INDUSTRY_CODE_PERCENT) else None
+            accounts.append((account_id, "A" + str(account_id).zfill(10), org_types[index], statuses[index],
+                             industry_code, created, created))
+            first_name = random.select_from_list(FIRST_NAMES)
+            last_name = random.select_from_list(LAST_NAMES)
+            if contact_types[index] == "Person":
+                contacts.append((contact_id, contact_type_ids["Person"], first_name, last_name, None))
+            else:
+                contacts.append((contact_id, contact_type_ids["Company"], None, None,
+                                 last_name + " " + random.select_from_list(COMPANY_SUFFIXES)))
+            account_contacts.append((account_contact_id, account_id, contact_id))
+            contact_roles.append((account_contact_id, roles["AccountHolder"]))
+            if random.select(NAMED_INSURED_PERCENT):
+                contact_roles.append((account_contact_id, roles["NamedInsured"]))
+            for policy in range(policy_counts[index]):
+                policies.append((account_id, create_time))
+        first_role_id = self._take_ids("pc_accountcontactrole", len(contact_roles))
+        contact_roles = [(first_role_id + index,) + role for index, role in enumerate(contact_roles)]
+        self._insert("pc_account", accounts)
+        self._insert("pc_contact", contacts)
+        self._insert("pc_accountcontact", account_contacts)
+        self._insert("pc_accountcontactrole", contact_roles)
+        self._generate_policies(policies)
+        return create_time
+
+    def _generate_policies(self, policies: list[tuple]):
+        """
+        Add policies with their policy periods and payment plan summaries.  The first term
+        of a policy starts soon after its account is created.  Each renewal term starts when
+        the prior term ends.
+
+        Arguments:
+            policies - the account ID and account creation time of each policy
+        """
+        random = self.random
+        count = len(policies)
+        first_id = self._take_ids("pc_policy", count)
+        term_counts = self._select(TERMS_PER_POLICY_WEIGHTS, count)
+        periods = []
+        for index, (account_id, account_created) in enumerate(policies):
+            policy_id = first_id + index
+            start = account_created.replace(hour=0, minute=0, second=0, microsecond=0) + \
+                timedelta(days=int(random.get_uniform(0, FIRST_PERIOD_DAYS)))
+            months = self._select(TERM_MONTHS_WEIGHTS, 1)[0]
+            for term in range(term_counts[index]):
+                period = PolicyPeriod()
+                period.policy_number = "P" + str(policy_id).zfill(9)
+                period.period_start = start
+                period.period_end = add_months(start, months)
+                periods.append((policy_id, account_created, period))
+                start = period.period_end
+        period_count = len(periods)
+        first_period_id = self._take_ids("pc_policyperiod", period_count)
+        first_summary_id = self._take_ids("pc_paymentplansummary", period_count)
+        status_codes = self._select(POLICY_PERIOD_STATUS_WEIGHTS, period_count)
+        statuses = self._typelists["pctl_policyperiodstatus"]
+        plans = self.random.select_weighted(self._payment_plans, list(BILLING_PERIODICITY_WEIGHTS.values()),
+                                            period_count)
+        policy_rows, period_rows, summary_rows = [], [], []
+        for policy_index in range(count):
+            policy_rows.append((first_id + policy_index, policies[policy_index][0]))
+        for index, (policy_id, account_created, period) in enumerate(periods):
+            period_id = first_period_id + index
+            period.status = status_codes[index]
+            premium = round(random.get_lognormal(PREMIUM_MEDIAN, PREMIUM_SIGMA), 2)
+            period.premium = Decimal(str(premium))
+            period.taxes = Decimal(str(round(premium * random.get_uniform(*TAX_RATE_RANGE), 2)))
+            if period.status == "Bound" and random.select(CANCELLATION_PERCENT):
+                term_days = (period.period_end - period.period_start).days
+                period.cancellation_date = period.period_start + timedelta(days=int(random.get_uniform(1, term_days)))
+            created = max(account_created,
+                          period.period_start - timedelta(seconds=random.get_uniform(0, QUOTE_DAYS * 86400)))
+            created_text = created.replace(microsecond=0).isoformat(" ")
+            period_rows.append((period_id, policy_id, period.policy_number, period.period_start.isoformat(" "),
+                                period.period_end.isoformat(" "),
+                                period.cancellation_date.isoformat(" ") if period.cancellation_date else None,
+                                float(period.taxes), float(period.premium), float(period.total_invoiced_amount),
+                                statuses[period.status], created_text, created_text))
+            name, periodicity_id, method_id, billing_id = plans[index]
+            summary_rows.append((first_summary_id + index, period_id, name, periodicity_id, method_id, billing_id,
+                                 created_text))
+        self._insert("pc_policy", policy_rows)
+        self._insert("pc_policyperiod", period_rows)
+        self._insert("pc_paymentplansummary", summary_rows)
+        return
+
+
+# -------------------------------------------------------------------------------
+#  Functions
+# -------------------------------------------------------------------------------
+
+
+def add_months(dte: datetime, months: int) -> datetime:
+    """
+    Return the date a number of months after a date.  If the later month is shorter, the
+    date is the last day of that month.
+
+    Arguments:
+        dte - the date
+        months - the number of months
+    """
+    month_index = dte.month - 1 + months
+    year = dte.year + month_index // 12
+    month = month_index % 12 + 1
+    day = dte.day
+    while True:
+        try:
+            result = dte.replace(year=year, month=month, day=day)
+            break
+        except ValueError:
+            day -= 1
+    return result
+
+
+# -------------------------------------------------------------------------------
+#  Main Program
+# -------------------------------------------------------------------------------
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        prog="policycenterdatagen",
+        description="Fill a PolicyCenter stand-in database with synthetic data.")
+    parser.add_argument("--accounts", type=int, required=True, metavar="N",
+                        help="the number of accounts to add")
+    parser.add_argument("--path", default=default_standin_path(), metavar="FILE",
+                        help="the stand-in database, which is created if it does not exist")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED, metavar="N",
+                        help="the seed of the random values")
+    parser.add_argument("--start", type=datetime.fromisoformat, default=datetime(2018, 1, 1), metavar="YYYY-MM-DD",
+                        help="the creation date of the first account")
+    parser.add_argument("--end", type=datetime.fromisoformat, default=None, metavar="YYYY-MM-DD",
+                        help="the day after the creation of the last account, by default today")
+    parser.add_argument("--producers", type=int, default=DEFAULT_PRODUCER_CODES, metavar="N",
+                        help="the number of producer codes to add")
+    parser.add_argument("--batch", type=int, default=DEFAULT_BATCH_ACCOUNTS, metavar="N",
+                        help="the number of accounts whose rows are inserted with each batch")
+    args = parser.parse_args()
+    last = args.end if args.end else datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    generator = PolicyCenterDataGenerator(args.path, args.seed, args.batch)
+    started = time.perf_counter()
+    generator.generate(args.accounts, args.start, last, args.producers)
+    print(generator.report())
+    print("Generated in {:.2f} seconds: ".format(time.perf_counter() - started) + args.path)
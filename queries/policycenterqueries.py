@@ -13,25 +13,72 @@ This module contains queries of PolicyCenter
 """
 
 from datetime import datetime
+from functools import lru_cache, partial
+from typing import TYPE_CHECKING, Iterator, Optional
 
-from pyodbc import Connection
+from base.dates import convert_to_datetime
+from base.partition import split_date_range, run_partitioned, iter_partitioned
+from base.query import Query, DEFAULT_BATCH_SIZE, DEFAULT_PAGE_SIZE, connection_identity
+from base.referencedata import ReferenceDataStore
+from base.testexception import TestException
+from base.testrandom import Random, DEFAULT_SEED, sample_bucket
+from queries.selection import Selection
+from queries.typelistcache import TypelistCache
 
-from base.query import Query
+if TYPE_CHECKING:
+    from pyodbc import Connection
+
+#
+# The number of seconds the result of each query may be kept in the query cache
+#
+ACCOUNT_QUERY_TTL = 4 * 3600.0
+POLICY_PERIOD_QUERY_TTL = 3600.0
+PRODUCER_CODE_QUERY_TTL = 24 * 3600.0
+PAYMENT_PLAN_QUERY_TTL = 24 * 3600.0
+
+#
+# The number of date ranges the account query is divided into.  The ranges are
+# queried at the same time on pooled connections.
+#
+ACCOUNT_QUERY_PARTITIONS = 4
+
+#
+# The maximum number of policy periods read with each query of a paged selection
+#
+POLICY_PERIOD_PAGE_SIZE = 200
+
+#
+# The number of policy periods selected from each stratum by the stratified selection
+#
+POLICY_PERIODS_PER_STRATUM = 2
+
+#
+# The maximum number of accounts read with each query of a paged selection
+#
+ACCOUNT_PAGE_SIZE = 500
+
+#
+# The expression that assigns a row to a pseudo-random sample bucket from 0 to 2**32 - 1.
+# The bucket depends only on the ID of the row and the seed, so a sample is reproducible.
+#
+SAMPLE_BUCKET = "CONVERT(BIGINT, CONVERT(BINARY(4), HASHBYTES('SHA2_256', CONCAT({id}, ':', @Seed))))"
 
 account_query = """
 DECLARE @SelectionStart DATE = ?
 DECLARE @SelectionEnd DATE = ?
+DECLARE @AccountHolderRole INT = ?
+DECLARE @ActiveStatus INT = ?
 
-SELECT [accountnumber] AS AccountNumber,
-       cnt.firstname   AS FirstName,
-       cnt.lastname    AS LastName,
-       cnt.NAME        AS CompanyName,
-       ct.typecode     AS ContactType,
-       aot.typecode    AS AccountOrgType,
-       ast.typecode    AS AccountStatus,
-       ic.code         AS IndustryCode,
-       acrt.typecode   AS Role,
-       acct.createtime AS CreateDate
+SELECT [accountnumber]     AS AccountNumber,
+       cnt.firstname       AS FirstName,
+       cnt.lastname        AS LastName,
+       cnt.NAME            AS CompanyName,
+       cnt.subtype         AS ContactType,
+       acct.accountorgtype AS AccountOrgType,
+       acct.accountstatus  AS AccountStatus,
+       ic.code             AS IndustryCode,
+       acr.subtype         AS Role,
+       acct.createtime     AS CreateDate
 FROM   [pc_account] acct
        JOIN pc_accountcontact ac
          ON ac.account = acct.id
@@ -41,88 +88,388 @@ FROM   [pc_account] acct
          ON ac.contact = cnt.id
        LEFT JOIN pc_industrycode ic
               ON acct.industrycodeid = ic.id
-       JOIN pctl_accountorgtype aot
-         ON acct.accountorgtype = aot.id
-       JOIN pctl_accountcontactrole acrt
-         ON acr.subtype = acrt.id
-       JOIN pctl_contact ct
-         ON cnt.subtype = ct.id
-       JOIN pctl_accountstatus ast
-         ON acct.accountstatus = ast.id
 WHERE  acct.retired = 0
-       AND acrt.typecode = 'AccountHolder'
+       AND acr.subtype = @AccountHolderRole
        AND acct.createtime >= @SelectionStart
        AND acct.createtime < @SelectionEnd 
-       AND ast.typecode = 'Active'
+       AND acct.accountstatus = @ActiveStatus
+       AND acct.accountorgtype IS NOT NULL
+ORDER  BY acct.createtime,
+          acct.id 
 """
 
-
-policy_periods_query = """
+#
+# The paged account query continues after the creation time and the account contact
+# role ID of the last row of the prior page.  The role ID makes the key unique, because
+# an account can have more than one account holder.
+#
+account_paged_query = """
+DECLARE @SelectionStart DATE = ?
 DECLARE @SelectionEnd DATE = ?
+DECLARE @AccountHolderRole INT = ?
+DECLARE @ActiveStatus INT = ?
 DECLARE @NumberRows INT = ?
+DECLARE @LastCreateTime DATETIME2 = ?
+DECLARE @LastID BIGINT = ?
 
-SELECT TOP (@NumberRows) ac.accountnumber    AS AccountNumber,
-                         pp.policynumber     AS PolicyNumber,
-                         pp.periodstart      AS PeriodStart,
-                         pp.periodend        AS PeriodEnd,
-                         pp.cancellationdate AS CancellationDate,
-                         pp.taxsurchargesrpt AS Taxes,
-                         pp.totalpremiumrpt  AS Premium,
-                         pp.totalcostrpt     AS TotalInvoicedAmount,
-                         ps.NAME             AS PaymentPlan,
-                         bp.typecode         AS BillingPeriodicity,
-                         pps.typecode        AS Status,
-                         ps.billingid        AS BillingID
-FROM   pc_policyperiod pp
-       JOIN pc_policy pl
-         ON pp.policyid = pl.id
-       JOIN pc_account ac
-         ON pl.accountid = ac.id
-       JOIN pc_paymentplansummary ps
-         ON ps.policyperiod = pp.id
-       JOIN pctl_billingperiodicity bp
-         ON ps.invoicefrequency = bp.id
-       JOIN pctl_policyperiodstatus pps
-         ON pp.status = pps.id
+SELECT TOP (@NumberRows)
+       [accountnumber]     AS AccountNumber,
+       cnt.firstname       AS FirstName,
+       cnt.lastname        AS LastName,
+       cnt.NAME            AS CompanyName,
+       cnt.subtype         AS ContactType,
+       acct.accountorgtype AS AccountOrgType,
+       acct.accountstatus  AS AccountStatus,
+       ic.code             AS IndustryCode,
+       acr.subtype         AS Role,
+       acct.createtime     AS CreateDate,
+       acr.id              AS AccountContactRoleID
+FROM   [pc_account] acct
+       JOIN pc_accountcontact ac
+         ON ac.account = acct.id
+       JOIN pc_accountcontactrole acr
+         ON acr.accountcontact = ac.id
+       JOIN pc_contact cnt
+         ON ac.contact = cnt.id
+       LEFT JOIN pc_industrycode ic
+              ON acct.industrycodeid = ic.id
+WHERE  acct.retired = 0
+       AND acr.subtype = @AccountHolderRole
+       AND acct.createtime >= @SelectionStart
+       AND acct.createtime < @SelectionEnd 
+       AND acct.accountstatus = @ActiveStatus
+       AND acct.accountorgtype IS NOT NULL
+       AND ( acct.createtime > @LastCreateTime
+              OR ( acct.createtime = @LastCreateTime
+                   AND acr.id > @LastID ) )
+ORDER  BY acct.createtime,
+          acr.id 
+"""
+
+#
+# The columns that hold the key of a row of the paged account query
+#
+ACCOUNT_KEY_COLUMNS = ("CreateDate", "AccountContactRoleID")
+
+#
+# The typelist tables of the account query columns that hold typelist IDs
+#
+ACCOUNT_TYPELIST_COLUMNS = {
+    "ContactType": "pctl_contact",
+    "AccountOrgType": "pctl_accountorgtype",
+    "AccountStatus": "pctl_accountstatus",
+    "Role": "pctl_accountcontactrole"
+}
+
+
+#
+# The columns that can be selected by the policy period queries.  Each column has
+# the expression that computes it and the alias of the table it comes from.
+#
+POLICY_PERIOD_COLUMNS = {
+    "AccountNumber": ("ac.accountnumber", "ac"),
+    "PolicyNumber": ("pp.policynumber", "pp"),
+    "PeriodStart": ("pp.periodstart", "pp"),
+    "PeriodEnd": ("pp.periodend", "pp"),
+    "CancellationDate": ("pp.cancellationdate", "pp"),
+    "Taxes": ("pp.taxsurchargesrpt", "pp"),
+    "Premium": ("pp.totalpremiumrpt", "pp"),
+    "TotalInvoicedAmount": ("pp.totalcostrpt", "pp"),
+    "PaymentPlan": ("ps.NAME", "ps"),
+    "BillingPeriodicity": ("ps.invoicefrequency", "ps"),
+    "Status": ("pp.status", "pp"),
+    "BillingID": ("ps.billingid", "ps")
+}
+
+#
+# The columns the paged queries always select, so that each page can continue
+# after the last row of the prior page.  A policy period has a row for each of its
+# payment plan summaries, so the summary ID is part of the key.
+#
+POLICY_PERIOD_KEY_COLUMNS = {
+    "CreateTime": ("pp.createtime", "pp"),
+    "PolicyPeriodID": ("pp.id", "pp"),
+    "PaymentPlanSummaryID": ("ps.id", "ps")
+}
+
+#
+# The tables that can be joined to pc_policyperiod, in the order they are joined.
+# Each table has its join clause and the alias of the table it is joined through.
+#
+POLICY_PERIOD_JOINS = {
+    "pl": ("pc_policy pl\n         ON pp.policyid = pl.id", "pp"),
+    "ac": ("pc_account ac\n         ON pl.accountid = ac.id", "pl"),
+    "ps": ("pc_paymentplansummary ps\n         ON ps.policyperiod = pp.id", "pp")
+}
+
+#
+# The tables that are always joined because the selection conditions refer to them.
+# The payment plan summary also determines the number of rows for a policy period.
+#
+POLICY_PERIOD_REQUIRED_JOINS = ("ps",)
+
+#
+# The columns whose combinations of values divide the policy periods into strata for
+# the stratified selection.  The status and cancellation of the candidates are fixed by
+# the selection conditions, so they do not divide them.
+#
+POLICY_PERIOD_STRATUM_COLUMNS = ("BillingPeriodicity", "PaymentPlan")
+
+#
+# The typelist tables of the policy period columns that hold typelist IDs
+#
+POLICY_PERIOD_TYPELIST_COLUMNS = {
+    "BillingPeriodicity": "pctl_billingperiodicity",
+    "Status": "pctl_policyperiodstatus"
+}
+
+policy_periods_declarations = """
+DECLARE @SelectionEnd DATE = ?
+DECLARE @BoundStatus INT = ?
+"""
+
+policy_periods_as_of_declaration = """DECLARE @AsOf DATETIME2 = ?
+"""
+
+policy_periods_seed_declaration = """DECLARE @Seed INT = ?
+"""
+
+policy_periods_per_stratum_declaration = """DECLARE @PerStratum INT = ?
+"""
+
+policy_periods_number_rows_declaration = """DECLARE @NumberRows INT = ?
+"""
+
+policy_periods_keyset_declarations = """DECLARE @LastCreateTime DATETIME2 = ?
+DECLARE @LastID BIGINT = ?
+DECLARE @LastSummaryID BIGINT = ?
+"""
+
+policy_periods_conditions = """
 WHERE  pp.retired = 0
        AND ps.retired = 0
        AND pp.createtime < @SelectionEnd
-       AND pps.typecode = 'Bound'
+       AND pp.status = @BoundStatus
        AND pp.cancellationdate IS NULL
-ORDER  BY pp.createtime DESC 
+       AND ps.invoicefrequency IS NOT NULL
+"""
+
+policy_periods_in_effect_conditions = """       AND pp.periodstart <= @AsOf
+       AND pp.periodend > @AsOf
+"""
+
+policy_periods_keyset_conditions = """       AND ( pp.createtime < @LastCreateTime
+              OR ( pp.createtime = @LastCreateTime
+                   AND ( pp.id < @LastID
+                         OR ( pp.id = @LastID
+                              AND ps.id < @LastSummaryID ) ) ) )
 """
 
+policy_periods_order = """ORDER  BY pp.createtime DESC 
+"""
+
+policy_periods_keyset_order = """ORDER  BY pp.createtime DESC,
+          pp.id DESC,
+          ps.id DESC 
+"""
+
+policy_periods_stratified_conditions = """WHERE  StratumRow <= @PerStratum
+ORDER  BY StratumRow,
+          SampleBucket,
+          PolicyPeriodID 
+"""
+
+policy_periods_sample_order = "ORDER  BY " + SAMPLE_BUCKET.format(id="pp.id") + """,
+          pp.id 
+"""
+
+
+@lru_cache(maxsize=64)
+def build_policy_periods_query(columns: tuple[str, ...], in_effect: bool, paged: bool = False,
+                               selection: Selection = Selection.recent) -> str:
+    """
+    Return a policy period query that selects only the specified columns and joins only
+    the tables those columns and the selection conditions need.
+
+    The arguments of the query are the selection end, the bound status, the as of date
+    if in_effect is True, the seed for the sample and stratified selections, the number
+    of rows in each stratum for the stratified selection, the number of rows, and the
+    creation time, ID, and payment plan summary ID of the last row of the prior page if
+    paged is True.
+
+    Arguments:
+        columns - the names of the columns to select, from POLICY_PERIOD_COLUMNS
+        in_effect - True for the query of policy periods in effect on a date
+        paged - True for the query of a page that continues after the last row of the prior page
+        selection - the way the policy periods are chosen.  The reservoir selection is chosen
+           by the caller, so its query is the query of the recent selection.
+    """
+    assert len(columns) > 0, "At least one policy period column must be selected"
+    sampled = selection in (Selection.sample, Selection.stratified)
+    assert not (paged and sampled), "A " + selection.value + " policy period query cannot be paged"
+    selected = {}
+    for column in columns:
+        if column not in POLICY_PERIOD_COLUMNS:
+            raise TestException("Unknown policy period column: " + column)
+        selected[column] = POLICY_PERIOD_COLUMNS[column]
+    if paged:
+        selected.update(POLICY_PERIOD_KEY_COLUMNS)
+    elif selection == Selection.stratified:
+        selected["SampleBucket"] = (SAMPLE_BUCKET.format(id="pp.id"), "pp")
+        selected["PolicyPeriodID"] = POLICY_PERIOD_KEY_COLUMNS["PolicyPeriodID"]
+    strata = [POLICY_PERIOD_COLUMNS[column] for column in POLICY_PERIOD_STRATUM_COLUMNS]
+    #
+    # Add each table needed by a column or a condition, and the tables it is joined through
+    #
+    needed = set()
+    pending = [alias for expression, alias in selected.values()] + list(POLICY_PERIOD_REQUIRED_JOINS)
+    if selection == Selection.stratified:
+        pending += [alias for expression, alias in strata]
+    while len(pending) > 0:
+        alias = pending.pop()
+        if alias in POLICY_PERIOD_JOINS and alias not in needed:
+            needed.add(alias)
+            pending.append(POLICY_PERIOD_JOINS[alias][1])
+    select_list = ",\n".join(
+        "       " + expression.ljust(20) + " AS " + column for column, (expression, alias) in selected.items())
+    joins = "".join(
+        "       JOIN " + join + "\n" for alias, (join, through) in POLICY_PERIOD_JOINS.items() if alias in needed)
+    declarations = policy_periods_declarations
+    conditions = policy_periods_conditions
+    if in_effect:
+        declarations += policy_periods_as_of_declaration
+        conditions += policy_periods_in_effect_conditions
+    if sampled:
+        declarations += policy_periods_seed_declaration
+    if selection == Selection.stratified:
+        declarations += policy_periods_per_stratum_declaration
+    declarations += policy_periods_number_rows_declaration
+    if selection == Selection.stratified:
+        #
+        # Number the candidates of each stratum in sample order, and keep the first rows of
+        # each stratum.  The first row of every stratum comes before the second row of any
+        # stratum, so the number of rows limits the rows in each stratum, not the strata.
+        # The strata that fill the last round are chosen in sample order.
+        #
+        partition = ", ".join(expression for expression, alias in strata)
+        select_list += ",\n       Row_number() OVER (PARTITION BY " + partition + \
+            "\n                          ORDER BY " + SAMPLE_BUCKET.format(id="pp.id") + \
+            ", pp.id) AS StratumRow"
+        candidates = "SELECT\n" + select_list + "\n" + \
+            "FROM   pc_policyperiod pp\n" + joins.rstrip("\n") + conditions
+        statement = declarations + "\nSELECT TOP (@NumberRows)\n" + \
+            ",\n".join("       " + column for column in columns) + "\n" + \
+            "FROM   (" + candidates.replace("\n", "\n        ") + ") candidates\n" + \
+            policy_periods_stratified_conditions
+    else:
+        if paged:
+            declarations += policy_periods_keyset_declarations
+            conditions += policy_periods_keyset_conditions + policy_periods_keyset_order
+        elif sampled:
+            conditions += policy_periods_sample_order
+        else:
+            conditions += policy_periods_order
+        statement = declarations + "\nSELECT TOP (@NumberRows)\n" + select_list + "\n" + \
+            "FROM   pc_policyperiod pp\n" + joins.rstrip("\n") + conditions
+    return statement
+
+
+policy_periods_query = build_policy_periods_query(tuple(POLICY_PERIOD_COLUMNS), False)
+
+policy_periods_in_effect_query = build_policy_periods_query(tuple(POLICY_PERIOD_COLUMNS), True, True)
+
+policy_periods_paged_query = build_policy_periods_query(tuple(POLICY_PERIOD_COLUMNS), False, True)
+
 producer_code_query = """
-SELECT org.NAME         AS ProducerName,
-       code             AS ProducerCode,
-       prs.typecode     AS ProducerStatus,
-       adr.addressline1 AS AddressLine1,
-       adr.city         AS City,
-       st.typecode      AS State,
-       adr.postalcode   AS PostalCode
+DECLARE @ActiveStatus INT = ?
+
+SELECT prc.id             AS ProducerCodeID,
+       org.NAME           AS ProducerName,
+       code               AS ProducerCode,
+       prc.producerstatus AS ProducerStatus,
+       adr.addressline1   AS AddressLine1,
+       adr.city           AS City,
+       adr.state          AS State,
+       adr.postalcode     AS PostalCode
+FROM   pc_producercode prc
+       JOIN pc_organization org
+         ON prc.organizationid = org.id
+       JOIN pc_address adr
+         ON prc.addressid = adr.id
+WHERE  prc.retired = 0
+       AND prc.producerstatus = @ActiveStatus
+       AND adr.state IS NOT NULL
+ORDER  BY prc.code 
+"""
+
+producer_code_sample_query = """
+DECLARE @ActiveStatus INT = ?
+DECLARE @Seed INT = ?
+DECLARE @Percent INT = ?
+
+SELECT prc.id             AS ProducerCodeID,
+       org.NAME           AS ProducerName,
+       code               AS ProducerCode,
+       prc.producerstatus AS ProducerStatus,
+       adr.addressline1   AS AddressLine1,
+       adr.city           AS City,
+       adr.state          AS State,
+       adr.postalcode     AS PostalCode
 FROM   pc_producercode prc
        JOIN pc_organization org
          ON prc.organizationid = org.id
-       JOIN pctl_producerstatus prs
-         ON prc.producerstatus = prs.id
        JOIN pc_address adr
          ON prc.addressid = adr.id
-       JOIN pctl_state st
-         ON adr.state = st.id
 WHERE  prc.retired = 0
-       AND prs.typecode = 'Active' 
+       AND prc.producerstatus = @ActiveStatus
+       AND adr.state IS NOT NULL
+       AND """ + SAMPLE_BUCKET.format(id="prc.id") + """ % 100 < @Percent
+ORDER  BY prc.code 
 """
 
-payment_plan_query = """
-DECLARE @CurrentID VARCHAR(20) = ?
+#
+# The typelist tables of the producer code query columns that hold typelist IDs
+#
+PRODUCER_CODE_TYPELIST_COLUMNS = {
+    "ProducerStatus": "pctl_producerstatus",
+    "State": "pctl_state"
+}
+
+installment_plan_query = """
+DECLARE @InstallmentsType INT = ?
 
 SELECT DISTINCT pps.billingid AS BillingID,
                 pps.NAME      AS PlanName
 FROM   pc_paymentplansummary pps
-       JOIN pctl_paymentmethod pt
-         ON pps.paymentplantype = pt.id
-WHERE  pt.typecode = 'Installments'
-       AND billingid <> @CurrentID 
+WHERE  pps.paymentplantype = @InstallmentsType
+       AND pps.billingid IS NOT NULL
+ORDER  BY pps.billingid,
+          pps.NAME 
+"""
+
+#
+# The queries that compute the versions of the reference data sets.  Changes to the
+# addresses of producers are picked up when the data set reaches its maximum age.  The
+# version of the installment plans is the number of plans in the catalogue, so a plan
+# that is renamed is picked up when the data set reaches its maximum age.
+#
+producer_code_version_query = """
+SELECT Count(*)                 AS NumberRows,
+       Max(prc.updatetime)      AS LastUpdate,
+       (SELECT Max(org.updatetime)
+        FROM   pc_organization org) AS OrganizationUpdate
+FROM   pc_producercode prc
+"""
+
+installment_plan_version_query = """
+DECLARE @InstallmentsType INT = ?
+
+SELECT Count(*) AS NumberPlans
+FROM   (SELECT DISTINCT pps.billingid,
+                        pps.NAME
+        FROM   pc_paymentplansummary pps
+        WHERE  pps.paymentplantype = @InstallmentsType
+               AND pps.billingid IS NOT NULL) plans
 """
 
 # -------------------------------------------------------------------------------
@@ -133,13 +480,25 @@ WHERE  pt.typecode = 'Installments'
 class PolicyCenterQueries:
     """
     This class contains queries of PolicyCenter.
+
+    The selection dates are declared as DATE in the queries, so SQL Server ignores the
+    time of day.  The dates are passed without the time of day, so that repeated queries
+    on the same day have the same arguments and can be answered from the query cache.
+
+    The queries do not join the typelist tables.  They filter on typelist IDs and return
+    typelist IDs, which are replaced by typecodes from the typelist cache.
+
+    The producer codes and installment plans are reference data.  If a reference data store
+    has been set in ReferenceDataStore.default_store, they are read from the store, which
+    queries the database only when the data has changed, and the samples of producer codes
+    are chosen from the producer codes held in the store.
     """
 
     # ---------------------------------------------------------------------------
     #  Constructor
     # ---------------------------------------------------------------------------
 
-    def __init__(self, cnx: Connection):
+    def __init__(self, cnx: "Connection"):
         """
         Initialize the instance of a class.
 
@@ -149,16 +508,137 @@ class PolicyCenterQueries:
         assert cnx is not None, "Connection for query must not be null"
         self._cnx = cnx
         self.query = Query(self._cnx)
+        self.reference_query = Query(self._cnx, use_cache=False)
+        self.typelists = TypelistCache(self.query, connection_identity(cnx))
         return
 
+    # ---------------------------------------------------------------------------
+    #  Properties
+    # ---------------------------------------------------------------------------
+
+    @property
+    def bound_status(self) -> int:
+        """
+        Return the typelist ID of the bound policy period status.
+        """
+        return self.typelists.id_of("pctl_policyperiodstatus", "Bound")
+
+    @property
+    def installments_type(self) -> int:
+        """
+        Return the typelist ID of the installments payment method.
+        """
+        return self.typelists.id_of("pctl_paymentmethod", "Installments")
+
     # ---------------------------------------------------------------------------
     #  Queries
     # ---------------------------------------------------------------------------
 
-    def query_accounts(self, selection_start: datetime, selection_end: datetime) -> list:
+    def query_accounts(self, selection_start: datetime, selection_end: datetime,
+                       partitions: int = ACCOUNT_QUERY_PARTITIONS) -> list:
         """
         Return a selection of accounts created on or after the selection start and before the
-        selection end.
+        selection end, in the order of their creation.
+
+        The selection is divided into ranges of days, which are queried at the same time on
+        pooled connections.  The accounts of the ranges are combined in the order of the ranges,
+        so they remain in the order of their creation.
+
+        Arguments:
+            selection_start - the earliest date when the accounts were created
+            selection_end - the date before which the accounts must have been created
+            partitions - the maximum number of ranges
+        """
+        self.check_account_selection(selection_start, selection_end)
+        assert partitions > 0, "The number of partitions must be greater than 0, not " + str(partitions)
+        arguments = self.account_arguments(selection_start, selection_end)
+        ranges = split_date_range(arguments[0], arguments[1], partitions)
+        functions = [partial(self.query_account_range, range_start, range_end, arguments[2:])
+                     for range_start, range_end in ranges]
+        results = []
+        for rows in run_partitioned(self._cnx, functions):
+            results.extend(self.typelists.resolve(rows, ACCOUNT_TYPELIST_COLUMNS))
+        return results
+
+    @staticmethod
+    def query_account_range(range_start: datetime, range_end: datetime, typelist_ids: tuple, cnx) -> list:
+        """
+        Return the accounts created in one range of days, with typelist IDs.
+
+        Arguments:
+            range_start - the first day of the range
+            range_end - the day after the last day of the range
+            typelist_ids - the IDs of the account holder role and the active account status
+            cnx - the connection used for the query
+        """
+        results = Query(cnx).query(account_query, range_start, range_end, *typelist_ids, ttl=ACCOUNT_QUERY_TTL)
+        return list(results)
+
+    def iter_accounts(self, selection_start: datetime, selection_end: datetime,
+                      page_size: int = ACCOUNT_PAGE_SIZE, partitions: int = 1) -> Iterator:
+        """
+        Yield the accounts created on or after the selection start and before the selection end,
+        in the order of their creation.  The accounts are read in pages of at most page_size rows,
+        each continuing after the creation time and account contact role ID of the last row of
+        the prior page, so only one page is held in memory.
+
+        With more than one partition, the selection is divided into ranges of days, which are
+        read at the same time on pooled connections.  The accounts of each range after the first
+        are read ahead into a buffer of limited size, and the ranges are yielded in order.
+
+        Arguments:
+            selection_start - the earliest date when the accounts were created
+            selection_end - the date before which the accounts must have been created
+            page_size - the maximum number of accounts read with each query
+            partitions - the maximum number of ranges read at the same time
+        """
+        self.check_account_selection(selection_start, selection_end)
+        assert partitions > 0, "The number of partitions must be greater than 0, not " + str(partitions)
+        arguments = self.account_arguments(selection_start, selection_end)
+        ranges = split_date_range(arguments[0], arguments[1], partitions)
+        functions = [partial(self.iter_account_range, range_start, range_end, arguments[2:], page_size)
+                     for range_start, range_end in ranges]
+        results = iter_partitioned(self._cnx, functions, buffer_size=2 * page_size)
+        return self.typelists.resolve(results, ACCOUNT_TYPELIST_COLUMNS)
+
+    @staticmethod
+    def iter_account_range(range_start: datetime, range_end: datetime, typelist_ids: tuple, page_size: int,
+                           cnx) -> Iterator:
+        """
+        Yield the accounts created in one range of days, with typelist IDs, a page at a time.
+
+        Arguments:
+            range_start - the first day of the range
+            range_end - the day after the last day of the range
+            typelist_ids - the IDs of the account holder role and the active account status
+            page_size - the maximum number of accounts read with each query
+            cnx - the connection used for the query
+        """
+        #
+        # The first page starts at the range start.  Every role ID is greater than 0.
+        #
+        return Query(cnx).iter_pages(account_paged_query, range_start, range_end, *typelist_ids,
+                                first_key=(range_start, 0), key_columns=ACCOUNT_KEY_COLUMNS,
+                                page_size=page_size, ttl=ACCOUNT_QUERY_TTL)
+
+    def account_arguments(self, selection_start: datetime, selection_end: datetime) -> tuple:
+        """
+        Return the arguments of the account query.
+
+        Arguments:
+            selection_start - the earliest date when the accounts were created
+            selection_end - the date before which the accounts must have been created
+        """
+        arguments = (convert_to_datetime(selection_start),
+                     convert_to_datetime(selection_end),
+                     self.typelists.id_of("pctl_accountcontactrole", "AccountHolder"),
+                     self.typelists.id_of("pctl_accountstatus", "Active"))
+        return arguments
+
+    @staticmethod
+    def check_account_selection(selection_start: datetime, selection_end: datetime):
+        """
+        Check the arguments of the account query.
 
         Arguments:
             selection_start - the earliest date when the accounts were created
@@ -168,37 +648,367 @@ class PolicyCenterQueries:
         assert selection_end is not None, "selection end must not be None"
         assert selection_start < selection_end, "selection start " + str(selection_start) + \
                                                 " must be before selection end " + str(selection_end)
-        results = self.query.query(account_query, selection_start, selection_end)
-        return list(results)
+        return
 
-    def query_policy_periods(self, selection_end: datetime, number_rows: int) -> list:
+    def query_policy_periods(self, selection_end: datetime, number_rows: int,
+                             as_of: Optional[datetime] = None,
+                             columns: Optional[list[str]] = None,
+                             selection: Selection = Selection.recent,
+                             seed: int = DEFAULT_SEED,
+                             per_stratum: int = POLICY_PERIODS_PER_STRATUM) -> list:
         """
         Return a list of policy periods created before the selection end date.  The list
         is limited to the number indicated by number_rows.
 
-        The most recently created policy periods are listed first, so this query will return
-        the most recently created policy periods created prior to the selection_end date.
+        With the recent selection, the most recently created policy periods are listed first,
+        so this query will return the most recently created policy periods created prior to the
+        selection_end date.  With the sample selection, a pseudo-random sample determined by
+        the seed is chosen by the database.  With the reservoir selection, a pseudo-random
+        sample determined by the seed is chosen while all the candidates are streamed.  With
+        the stratified selection, up to per_stratum policy periods are chosen by the database
+        from each combination of billing periodicity and payment plan.
 
         The policy periods will be bound and will not include cancelled policy periods.
+        If an as of date is given, only the policy periods in effect on that date are returned.
+
+        Arguments:
+            selection_end - the date before which the policy periods must have been created
+            number_rows - the maximum number of policy periods
+            as_of - the date on which the policy periods must be in effect, or None
+            columns - the names of the columns to select, or None for all the columns
+            selection - the way the policy periods are chosen
+            seed - the seed of the sample, reservoir, and stratified selections
+            per_stratum - the maximum number of policy periods from each stratum of the stratified selection
         """
         assert selection_end is not None, "selection end must not be None"
         assert number_rows > 0, "The number of rows must be greater than 0, not " + str(number_rows)
-        results = self.query.query(policy_periods_query, selection_end, number_rows)
-        return list(results)
+        if selection == Selection.sample:
+            results = self.sample_policy_periods(selection_end, number_rows, seed, as_of=as_of, columns=columns)
+        elif selection == Selection.stratified:
+            results = self.stratify_policy_periods(selection_end, number_rows, seed, per_stratum,
+                                                   as_of=as_of, columns=columns)
+        elif selection == Selection.reservoir:
+            results = self.reservoir_policy_periods(selection_end, number_rows, seed, as_of=as_of, columns=columns)
+        elif as_of is None:
+            statement = self.policy_periods_statement(columns, False)
+            rows = self.query.query(statement, convert_to_datetime(selection_end), self.bound_status, number_rows,
+                                    ttl=POLICY_PERIOD_QUERY_TTL)
+            results = list(self.typelists.resolve(rows, POLICY_PERIOD_TYPELIST_COLUMNS))
+        else:
+            results = self.query_policy_periods_in_effect(selection_end, as_of, number_rows, columns=columns)
+        return results
+
+    def stream_policy_periods(self, selection_end: datetime, number_rows: int,
+                              as_of: Optional[datetime] = None,
+                              columns: Optional[list[str]] = None,
+                              selection: Selection = Selection.recent,
+                              seed: int = DEFAULT_SEED,
+                              per_stratum: int = POLICY_PERIODS_PER_STRATUM,
+                              batch_size: int = DEFAULT_BATCH_SIZE) -> Iterator:
+        """
+        Yield the policy periods that query_policy_periods returns, in the same order.  The
+        rows are fetched from the cursor in batches of batch_size rows and are not kept, so
+        only one batch is held in memory.  The rows are not kept in the query cache, and the
+        connection cannot be used for another query until the rows have been read.
+
+        The reservoir selection holds its sample in memory, since it is not known until all
+        the candidates have been read.
+
+        Arguments:
+            selection_end - the date before which the policy periods must have been created
+            number_rows - the maximum number of policy periods
+            as_of - the date on which the policy periods must be in effect, or None
+            columns - the names of the columns to select, or None for all the columns
+            selection - the way the policy periods are chosen
+            seed - the seed of the sample, reservoir, and stratified selections
+            per_stratum - the maximum number of policy periods from each stratum of the stratified selection
+            batch_size - the number of rows fetched from the database at a time
+        """
+        assert selection_end is not None, "selection end must not be None"
+        assert number_rows > 0, "The number of rows must be greater than 0, not " + str(number_rows)
+        if selection == Selection.reservoir:
+            return iter(self.reservoir_policy_periods(selection_end, number_rows, seed, as_of=as_of, columns=columns))
+        statement = self.policy_periods_statement(columns, as_of is not None, selection=selection)
+        as_of_arguments = (as_of,) if as_of is not None else ()
+        if selection == Selection.sample:
+            selection_arguments = (seed, number_rows)
+        elif selection == Selection.stratified:
+            assert per_stratum > 0, "The number of rows per stratum must be greater than 0, not " + str(per_stratum)
+            selection_arguments = (seed, per_stratum, number_rows)
+        else:
+            selection_arguments = (number_rows,)
+        rows = self.query.iter_query(statement, convert_to_datetime(selection_end), self.bound_status,
+                                     *as_of_arguments, *selection_arguments, batch_size=batch_size)
+        return self.typelists.resolve(rows, POLICY_PERIOD_TYPELIST_COLUMNS)
+
+    def sample_policy_periods(self, selection_end: datetime, number_rows: int, seed: int,
+                              as_of: Optional[datetime] = None,
+                              columns: Optional[list[str]] = None) -> list:
+        """
+        Return a pseudo-random sample of up to number_rows policy periods created before the
+        selection end date.  The database orders the candidates by a hash of their IDs and the
+        seed, so only the sampled policy periods are returned, and the same seed returns the
+        same sample while the candidates are unchanged.
+
+        Arguments:
+            selection_end - the date before which the policy periods must have been created
+            number_rows - the maximum number of policy periods
+            seed - the seed that determines the sample
+            as_of - the date on which the policy periods must be in effect, or None
+            columns - the names of the columns to select, or None for all the columns
+        """
+        assert selection_end is not None, "selection end must not be None"
+        assert number_rows > 0, "The number of rows must be greater than 0, not " + str(number_rows)
+        statement = self.policy_periods_statement(columns, as_of is not None, selection=Selection.sample)
+        as_of_arguments = (as_of,) if as_of is not None else ()
+        rows = self.query.query(statement, convert_to_datetime(selection_end), self.bound_status, *as_of_arguments,
+                                seed, number_rows, ttl=POLICY_PERIOD_QUERY_TTL)
+        return list(self.typelists.resolve(rows, POLICY_PERIOD_TYPELIST_COLUMNS))
+
+    def stratify_policy_periods(self, selection_end: datetime, number_rows: int, seed: int, per_stratum: int,
+                                as_of: Optional[datetime] = None,
+                                columns: Optional[list[str]] = None) -> list:
+        """
+        Return up to per_stratum policy periods from each combination of billing periodicity
+        and payment plan, and no more than number_rows policy periods in all.  The
+        database chooses the policy periods of each stratum in the order of a hash of their
+        IDs and the seed, and returns the first policy period of every stratum before the
+        second policy period of any stratum, so a small number of rows covers every stratum.
+
+        Arguments:
+            selection_end - the date before which the policy periods must have been created
+            number_rows - the maximum number of policy periods
+            seed - the seed that determines the policy periods chosen from each stratum
+            per_stratum - the maximum number of policy periods from each stratum
+            as_of - the date on which the policy periods must be in effect, or None
+            columns - the names of the columns to select, or None for all the columns
+        """
+        assert selection_end is not None, "selection end must not be None"
+        assert number_rows > 0, "The number of rows must be greater than 0, not " + str(number_rows)
+        assert per_stratum > 0, "The number of rows per stratum must be greater than 0, not " + str(per_stratum)
+        statement = self.policy_periods_statement(columns, as_of is not None, selection=Selection.stratified)
+        as_of_arguments = (as_of,) if as_of is not None else ()
+        rows = self.query.query(statement, convert_to_datetime(selection_end), self.bound_status, *as_of_arguments,
+                                seed, per_stratum, number_rows, ttl=POLICY_PERIOD_QUERY_TTL)
+        return list(self.typelists.resolve(rows, POLICY_PERIOD_TYPELIST_COLUMNS))
+
+    def reservoir_policy_periods(self, selection_end: datetime, number_rows: int, seed: int,
+                                 as_of: Optional[datetime] = None,
+                                 columns: Optional[list[str]] = None) -> list:
+        """
+        Return a uniform pseudo-random sample of up to number_rows policy periods created before
+        the selection end date.  All the candidates are streamed from the database a page at a
+        time, and only the sample is held in memory.  The same seed returns the same sample
+        while the candidates are unchanged.
+
+        Arguments:
+            selection_end - the date before which the policy periods must have been created
+            number_rows - the maximum number of policy periods
+            seed - the seed that determines the sample
+            as_of - the date on which the policy periods must be in effect, or None
+            columns - the names of the columns to select, or None for all the columns
+        """
+        assert number_rows > 0, "The number of rows must be greater than 0, not " + str(number_rows)
+        candidates = self.iter_policy_periods(selection_end, columns=columns, as_of=as_of)
+        return Random(seed).reservoir_sample(candidates, number_rows)
 
-    def query_producer_code(self):
+    def query_policy_periods_in_effect(self, selection_end: datetime, as_of: datetime, number_rows: int,
+                                       page_size: int = POLICY_PERIOD_PAGE_SIZE,
+                                       columns: Optional[list[str]] = None) -> list:
         """
-        Return a list of policy codes with producers.
+        Return a list of up to number_rows policy periods created before the selection end date
+        and in effect on the as of date.  A policy period is in effect if it starts on or before
+        the as of date and ends after it.
+
+        The policy periods are read in pages of at most page_size rows, most recently created
+        first.  Pages are read until number_rows policy periods have been found or there
+        are no more policy periods.
+
+        Arguments:
+            selection_end - the date before which the policy periods must have been created
+            as_of - the date on which the policy periods must be in effect
+            number_rows - the maximum number of policy periods
+            page_size - the maximum number of policy periods read with each query
+            columns - the names of the columns to select, or None for all the columns
         """
-        results = self.query.query(producer_code_query)
+        assert selection_end is not None, "selection end must not be None"
+        assert as_of is not None, "as of date must not be None"
+        assert number_rows > 0, "The number of rows must be greater than 0, not " + str(number_rows)
+        statement = self.policy_periods_statement(columns, True, True)
+        results = self.page_policy_periods(statement, (as_of,), number_rows, page_size, selection_end)
         return list(results)
 
-    def query_payment_plan(self, current_id: str):
+    def iter_policy_periods(self, selection_end: datetime, number_rows: Optional[int] = None,
+                            page_size: int = DEFAULT_PAGE_SIZE,
+                            columns: Optional[list[str]] = None,
+                            as_of: Optional[datetime] = None) -> Iterator:
+        """
+        Yield the policy periods created before the selection end date, most recently created
+        first.  The policy periods are read in pages of at most page_size rows, so only one
+        page is held in memory.
+
+        Arguments:
+            selection_end - the date before which the policy periods must have been created
+            number_rows - the maximum number of policy periods, or None for all of them
+            page_size - the maximum number of policy periods read with each query
+            columns - the names of the columns to select, or None for all the columns
+            as_of - the date on which the policy periods must be in effect, or None
+        """
+        assert selection_end is not None, "selection end must not be None"
+        assert number_rows is None or number_rows > 0, \
+            "The number of rows must be greater than 0, not " + str(number_rows)
+        statement = self.policy_periods_statement(columns, as_of is not None, True)
+        as_of_arguments = (as_of,) if as_of is not None else ()
+        return self.page_policy_periods(statement, as_of_arguments, number_rows, page_size, selection_end)
+
+    def page_policy_periods(self, statement: str, as_of_arguments: tuple, number_rows: Optional[int], page_size: int,
+                            selection_end: datetime) -> Iterator:
+        """
+        Return an iterator of the policy periods of a paged policy period query.  Each page
+        continues after the creation time, ID, and payment plan summary ID of the last row of
+        the prior page.
+
+        Arguments:
+            statement - a paged policy period query
+            as_of_arguments - the arguments of the query between the bound status and the number of rows
+            number_rows - the maximum number of policy periods, or None for all of them
+            page_size - the maximum number of policy periods read with each query
+            selection_end - the date before which the policy periods must have been created
+        """
+        selection_end = convert_to_datetime(selection_end)
+        #
+        # No policy period is created at the selection end, so the first page starts there.
+        #
+        results = self.query.iter_pages(statement, selection_end, self.bound_status, *as_of_arguments,
+                                        first_key=(selection_end, 0, 0),
+                                        key_columns=tuple(POLICY_PERIOD_KEY_COLUMNS),
+                                        page_size=page_size, limit=number_rows, ttl=POLICY_PERIOD_QUERY_TTL)
+        return self.typelists.resolve(results, POLICY_PERIOD_TYPELIST_COLUMNS)
+
+    @staticmethod
+    def policy_periods_statement(columns: Optional[list[str]], in_effect: bool, paged: bool = False,
+                                 selection: Selection = Selection.recent) -> str:
+        """
+        Return the policy period query for the specified columns.
+
+        Arguments:
+            columns - the names of the columns to select, or None for all the columns
+            in_effect - True for the query of policy periods in effect on a date
+            paged - True for the query of a page that continues after the last row of the prior page
+            selection - the way the policy periods are chosen
+        """
+        if columns is None:
+            columns = list(POLICY_PERIOD_COLUMNS)
+        statement = build_policy_periods_query(tuple(columns), in_effect, paged, selection)
+        return statement
+
+    def query_producer_codes(self) -> list:
+        """
+        Return a list of policy codes with producers, ordered by producer code.
+        """
+        store = ReferenceDataStore.default_store
+        if store is None:
+            results = self.load_producer_codes(self.query)
+        else:
+            results = store.get("producer_codes",
+                                lambda: self.load_producer_codes(self.reference_query),
+                                lambda: self.reference_version(producer_code_version_query))
+        return results
+
+    def load_producer_codes(self, query: Query) -> list:
+        """
+        Return a list of policy codes with producers read with the specified query.
+
+        Arguments:
+            query - the query used to read the producer codes
+        """
+        active_status = self.typelists.id_of("pctl_producerstatus", "Active")
+        results = query.query(producer_code_query, active_status, ttl=PRODUCER_CODE_QUERY_TTL)
+        return list(self.typelists.resolve(results, PRODUCER_CODE_TYPELIST_COLUMNS))
+
+    def sample_producer_codes(self, percent: int, seed: int = DEFAULT_SEED) -> list:
+        """
+        Return a pseudo-random sample of about percent percent of the policy codes with
+        producers, ordered by producer code.  The sample is chosen from a hash of the ID of
+        each producer code and the seed, so the same seed returns the same sample.  The hash
+        is computed by the database, so only the sampled producer codes are read, unless the
+        producer codes are held in the reference data store.
+
+        Arguments:
+            percent - the percentage of the producer codes to select, from 0 to 100
+            seed - the seed that determines the sample
+        """
+        assert 0 <= percent <= 100, "The percentage must be between 0 and 100, not " + str(percent)
+        if ReferenceDataStore.default_store is None:
+            active_status = self.typelists.id_of("pctl_producerstatus", "Active")
+            rows = self.query.query(producer_code_sample_query, active_status, seed, percent,
+                                    ttl=PRODUCER_CODE_QUERY_TTL)
+            results = list(self.typelists.resolve(rows, PRODUCER_CODE_TYPELIST_COLUMNS))
+        else:
+            results = [code for code in self.query_producer_codes()
+                       if sample_bucket(code.ProducerCodeID, seed) % 100 < percent]
+        return results
+
+    def reservoir_producer_codes(self, number_rows: int, seed: int = DEFAULT_SEED) -> list:
         """
-        Return a list of installment payment plans, excluding the current plan.
+        Return a uniform pseudo-random sample of up to number_rows policy codes with producers,
+        ordered by producer code.  Unless the producer codes are held in the reference data
+        store, they are streamed from the database, and only the sample is held in memory.
 
         Arguments:
-            current_id - the BillingID of the current payment plan
+            number_rows - the maximum number of producer codes
+            seed - the seed that determines the sample
         """
-        results = self.query.query(payment_plan_query, current_id)
+        assert number_rows > 0, "The number of rows must be greater than 0, not " + str(number_rows)
+        if ReferenceDataStore.default_store is None:
+            producer_codes = self.iter_producer_codes()
+        else:
+            producer_codes = self.query_producer_codes()
+        return Random(seed).reservoir_sample(producer_codes, number_rows)
+
+    def iter_producer_codes(self, batch_size: int = DEFAULT_BATCH_SIZE) -> Iterator:
+        """
+        Yield the policy codes with producers, ordered by producer code.  The producer codes
+        are read from the database in batches of batch_size rows.
+
+        Arguments:
+            batch_size - the number of rows fetched from the database at a time
+        """
+        active_status = self.typelists.id_of("pctl_producerstatus", "Active")
+        results = self.query.iter_query(producer_code_query, active_status, batch_size=batch_size)
+        return self.typelists.resolve(results, PRODUCER_CODE_TYPELIST_COLUMNS)
+
+    def query_installment_plans(self):
+        """
+        Return a list of all installment payment plans, ordered by BillingID.
+        """
+        store = ReferenceDataStore.default_store
+        if store is None:
+            results = self.load_installment_plans(self.query)
+        else:
+            results = store.get("installment_plans",
+                                lambda: self.load_installment_plans(self.reference_query),
+                                lambda: self.reference_version(installment_plan_version_query,
+                                                               self.installments_type))
+        return results
+
+    def load_installment_plans(self, query: Query) -> list:
+        """
+        Return a list of all installment payment plans read with the specified query.
+
+        Arguments:
+            query - the query used to read the installment plans
+        """
+        results = query.query(installment_plan_query, self.installments_type, ttl=PAYMENT_PLAN_QUERY_TTL)
         return list(results)
+
+    def reference_version(self, version_query: str, *argv) -> tuple:
+        """
+        Return the current version of a reference data set.
+
+        Arguments:
+            version_query - the query that computes the version of the data set
+            argv - the arguments of the query
+        """
+        results = self.reference_query.query(version_query, *argv)
+        return tuple(results[0])
@@ -0,0 +1,218 @@
+# -------------------------------------------------------------------------------
+#
+#  Copyright (c) 2021 Waysys LLC
+#
+# -------------------------------------------------------------------------------
+# -------------------------------------------------------------------------------
+#
+__author__ = 'Bill Shaffer'
+__version__ = "16-Oct-2021"
+
+"""
+This module creates a SQLite database that stands in for the PolicyCenter database.
+The stand-in has the tables and columns of PolicyCenter that the queries in
+policycenterqueries read, and the typelist entries the queries look up.  With the
+stand-in, test cases can be generated and timed on a machine without SQL Server.
+
+Usage:
+    python -m queries.policycenterstandin [database path]
+
+The default path is taken from the environment variable ENV_PC_STANDIN_DB, or is a file
+in the home directory.
+"""
+
+import sqlite3
+import sys
+from pathlib import Path
+
+from base.configuration import default_standin_path
+from base.testexception import TestException
+from models.billingperiodicity import BillingPeriodicity
+
+#
+# The first ID of the entries of each typelist, as in a Guidewire database
+#
+TYPELIST_FIRST_ID = 10001
+
+standin_tables = """
+CREATE TABLE IF NOT EXISTS pc_account (
+    id             INTEGER PRIMARY KEY,
+    accountnumber  VARCHAR(60) NOT NULL,
+    accountorgtype INTEGER,
+    accountstatus  INTEGER NOT NULL,
+    industrycodeid INTEGER,
+    retired        INTEGER NOT NULL DEFAULT 0,
+    createtime     DATETIME NOT NULL,
+    updatetime     DATETIME NOT NULL
+);
+CREATE INDEX IF NOT EXISTS pc_account_createtime ON pc_account (createtime, id);
+
+CREATE TABLE IF NOT EXISTS pc_contact (
+    id        INTEGER PRIMARY KEY,
+    subtype   INTEGER NOT NULL,
+    firstname VARCHAR(30),
+    lastname  VARCHAR(30),
+    name      VARCHAR(255),
+    retired   INTEGER NOT NULL DEFAULT 0
+);
+
+CREATE TABLE IF NOT EXISTS pc_accountcontact (
+    id      INTEGER PRIMARY KEY,
+    account INTEGER NOT NULL,
+    contact INTEGER NOT NULL,
+    retired INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS pc_accountcontact_account ON pc_accountcontact (account);
+
+CREATE TABLE IF NOT EXISTS pc_accountcontactrole (
+    id             INTEGER PRIMARY KEY,
+    accountcontact INTEGER NOT NULL,
+    subtype        INTEGER NOT NULL,
+    retired        INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS pc_accountcontactrole_accountcontact ON pc_accountcontactrole (accountcontact);
+
+CREATE TABLE IF NOT EXISTS pc_industrycode (
+    id      INTEGER PRIMARY KEY,
+    code    VARCHAR(60) NOT NULL,
+    retired INTEGER NOT NULL DEFAULT 0
+);
+
+CREATE TABLE IF NOT EXISTS pc_policy (
+    id        INTEGER PRIMARY KEY,
+    accountid INTEGER NOT NULL,
+    retired   INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS pc_policy_accountid ON pc_policy (accountid);
+
+CREATE TABLE IF NOT EXISTS pc_policyperiod (
+    id               INTEGER PRIMARY KEY,
+    policyid         INTEGER NOT NULL,
+    policynumber     VARCHAR(40),
+    periodstart      DATETIME NOT NULL,
+    periodend        DATETIME NOT NULL,
+    cancellationdate DATETIME,
+    taxsurchargesrpt MONEY,
+    totalpremiumrpt  MONEY,
+    totalcostrpt     MONEY,
+    status           INTEGER NOT NULL,
+    retired          INTEGER NOT NULL DEFAULT 0,
+    createtime       DATETIME NOT NULL,
+    updatetime       DATETIME NOT NULL
+);
+CREATE INDEX IF NOT EXISTS pc_policyperiod_createtime ON pc_policyperiod (createtime, id);
+
+CREATE TABLE IF NOT EXISTS pc_paymentplansummary (
+    id               INTEGER PRIMARY KEY,
+    policyperiod     INTEGER NOT NULL,
+    name             VARCHAR(255),
+    invoicefrequency INTEGER,
+    paymentplantype  INTEGER,
+    billingid        VARCHAR(255),
+    retired          INTEGER NOT NULL DEFAULT 0,
+    updatetime       DATETIME NOT NULL
+);
+CREATE INDEX IF NOT EXISTS pc_paymentplansummary_policyperiod ON pc_paymentplansummary (policyperiod);
+
+CREATE TABLE IF NOT EXISTS pc_organization (
+    id         INTEGER PRIMARY KEY,
+    name       VARCHAR(255),
+    retired    INTEGER NOT NULL DEFAULT 0,
+    updatetime DATETIME NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS pc_address (
+    id           INTEGER PRIMARY KEY,
+    addressline1 VARCHAR(60),
+    city         VARCHAR(60),
+    state        INTEGER,
+    postalcode   VARCHAR(60),
+    retired      INTEGER NOT NULL DEFAULT 0
+);
+
+CREATE TABLE IF NOT EXISTS pc_producercode (
+    id             INTEGER PRIMARY KEY,
+    code           VARCHAR(60) NOT NULL,
+    producerstatus INTEGER NOT NULL,
+    organizationid INTEGER NOT NULL,
+    addressid      INTEGER,
+    retired        INTEGER NOT NULL DEFAULT 0,
+    updatetime     DATETIME NOT NULL
+);
+"""
+
+typelist_table = """
+CREATE TABLE IF NOT EXISTS {table} (
+    id       INTEGER PRIMARY KEY,
+    typecode VARCHAR(50) NOT NULL UNIQUE,
+    name     VARCHAR(256),
+    retired  INTEGER NOT NULL DEFAULT 0
+);
+"""
+
+typelist_insert = """
+INSERT OR IGNORE INTO {table} (id, typecode, name) VALUES (?, ?, ?)
+"""
+
+#
+# The typecodes of each typelist table in the stand-in.  The typecodes the queries look
+# up by name must be present.  The others give the generated data some variety.
+#
+TYPELIST_TYPECODES = {
+    "pctl_accountcontactrole": ("AccountHolder", "NamedInsured", "BillingContact", "SecondaryContact", "Driver"),
+    "pctl_accountorgtype": ("individual", "corporation", "partnership", "llc", "soleproprietorship", "other"),
+    "pctl_accountstatus": ("Active", "Pending", "Withdrawn"),
+    "pctl_billingperiodicity": tuple(periodicity.name for periodicity in BillingPeriodicity),
+    "pctl_contact": ("Person", "Company"),
+    "pctl_paymentmethod": ("Installments", "PaidInFull"),
+    "pctl_policyperiodstatus": ("Draft", "Quoted", "Binding", "Bound", "Withdrawn", "Declined", "NotTaken"),
+    "pctl_producerstatus": ("Active", "Inactive", "Terminated"),
+    "pctl_state": ("AL", "AK", "AZ", "AR", "CA", "CO", "CT", "DE", "FL", "GA", "HI", "ID", "IL", "IN", "IA",
+                   "KS", "KY", "LA", "ME", "MD", "MA", "MI", "MN", "MS", "MO", "MT", "NE", "NV", "NH", "NJ",
+                   "NM", "NY", "NC", "ND", "OH", "OK", "OR", "PA", "RI", "SC", "SD", "TN", "TX", "UT", "VT",
+                   "VA", "WA", "WV", "WI", "WY")
+}
+
+
+# -------------------------------------------------------------------------------
+#  Functions
+# -------------------------------------------------------------------------------
+
+
+def create_standin(path: str):
+    """
+    Create the tables of the stand-in database and fill the typelist tables.  Tables and
+    typelist entries that already exist are kept, so the function can be run again on a
+    database that has data.
+
+    Arguments:
+        path - the path of the SQLite database file
+    """
+    assert path is not None, "Database path must not be None"
+    try:
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        cnx = sqlite3.connect(path)
+    except (OSError, sqlite3.Error) as e:
+        raise TestException("Unable to create stand-in database " + path + ": " + str(e))
+    try:
+        cnx.executescript(standin_tables)
+        for table, typecodes in TYPELIST_TYPECODES.items():
+            cnx.executescript(typelist_table.format(table=table))
+            cnx.executemany(typelist_insert.format(table=table),
+                            [(TYPELIST_FIRST_ID + index, typecode, typecode)
+                             for index, typecode in enumerate(typecodes)])
+        cnx.commit()
+    finally:
+        cnx.close()
+    return
+
+
+# -------------------------------------------------------------------------------
+#  Main Program
+# -------------------------------------------------------------------------------
+
+
+if __name__ == '__main__':
+    standin_path = sys.argv[1] if len(sys.argv) > 1 else default_standin_path()
+    create_standin(standin_path)
+    print("PolicyCenter stand-in database: " + standin_path)
@@ -0,0 +1,47 @@
+# -------------------------------------------------------------------------------
+#
+#  Copyright (c) 2021 Waysys LLC
+#
+# -------------------------------------------------------------------------------
+# -------------------------------------------------------------------------------
+#
+__author__ = 'Bill Shaffer'
+__version__ = "15-Oct-2021"
+
+"""
+This module defines the ways the rows of a query are chosen from the candidate rows.
+"""
+
+from enum import Enum
+
+
+# -------------------------------------------------------------------------------
+#  Selection
+# -------------------------------------------------------------------------------
+
+
+class Selection(Enum):
+    """
+    This class defines how a query chooses its rows when there are more candidate
+    rows than are needed.
+    """
+
+    #
+    # The most recently created rows
+    #
+    recent = "recent"
+    #
+    # A pseudo-random sample chosen by the database from a hash of the row ID and a
+    # seed, so the same seed selects the same rows
+    #
+    sample = "sample"
+    #
+    # A uniform pseudo-random sample chosen while the candidate rows are streamed from the
+    # database, for use when the database cannot choose the sample
+    #
+    reservoir = "reservoir"
+    #
+    # A few rows from each stratum of the candidate rows, chosen by the database, so
+    # that a small number of rows covers every combination of the stratum columns
+    #
+    stratified = "stratified"
@@ -0,0 +1,218 @@
+# -------------------------------------------------------------------------------
+#
+#  Copyright (c) 2021 Waysys LLC
+#
+# -------------------------------------------------------------------------------
+# -------------------------------------------------------------------------------
+#
+__author__ = 'Bill Shaffer'
+__version__ = "12-Oct-2021"
+
+"""
+This module contains the typelist cache.  A Guidewire typelist table, such as
+pctl_accountstatus, relates the ID stored in an entity table to a typecode.  The cache
+reads each typelist table once, so that queries can select and filter on the typelist
+IDs without joining the typelist tables.  The typelist queries are kept in the query
+cache, when there is one, so later runs do not read the typelist tables again.
+
+The typelists of a database are shared by every cache created with the identity of the
+database, so each typelist table is read once per run, however many connections and
+threads read from the database.
+"""
+
+import threading
+from typing import Iterable, Iterator, Optional
+
+from base.query import Query
+from base.querycache import row_columns, row_type
+from base.testexception import TestException
+
+#
+# The number of seconds a typelist may be kept in the query cache
+#
+TYPELIST_QUERY_TTL = 24 * 3600.0
+
+#
+# The typelist tables that may be read
+#
+TYPELISTS = (
+    "pctl_accountcontactrole",
+    "pctl_accountorgtype",
+    "pctl_accountstatus",
+    "pctl_billingperiodicity",
+    "pctl_contact",
+    "pctl_paymentmethod",
+    "pctl_policyperiodstatus",
+    "pctl_producerstatus",
+    "pctl_state"
+)
+
+#
+# The typecodes by ID, the IDs by typecode, and the lock of the typelists of each
+# database, by the identity of the database
+#
+shared_typelists: dict[str, tuple[dict[str, dict[int, str]], dict[str, dict[str, int]], threading.Lock]] = {}
+shared_typelists_lock = threading.Lock()
+
+typelist_query = """
+SELECT id       AS ID,
+       typecode AS TypeCode
+FROM   {table}
+"""
+
+
+# -------------------------------------------------------------------------------
+#  Typelist Cache
+# -------------------------------------------------------------------------------
+
+
+class TypelistCache:
+    """
+    This class relates typelist IDs to typecodes.
+    """
+
+    # ---------------------------------------------------------------------------
+    #  Constructor
+    # ---------------------------------------------------------------------------
+
+    def __init__(self, query: Query, identity: Optional[str] = None):
+        """
+        Initialize the instance of this class.  The typelist tables are read with the query
+        of the instance, but the typelists read are shared with the other instances for the
+        same database.
+
+        Arguments:
+            query - the query used to read the typelist tables
+            identity - the identity of the database, or None if the typelists read by this
+               instance are not shared
+        """
+        assert query is not None, "Query must not be None"
+        self._query = query
+        self._typecodes, self._ids, self._lock = find_typelists(identity)
+        return
+
+    # ---------------------------------------------------------------------------
+    #  Operations
+    # ---------------------------------------------------------------------------
+
+    def typecode(self, table: str, type_id: Optional[int]) -> Optional[str]:
+        """
+        Return the typecode for a typelist ID, or None if the ID is None.
+
+        Arguments:
+            table - the name of the typelist table
+            type_id - the ID of an entry in the typelist
+        """
+        result = None
+        if type_id is not None:
+            typecodes = self._load(table)[0]
+            if type_id not in typecodes:
+                raise TestException("Typelist " + table + " has no entry with ID " + str(type_id))
+            result = typecodes[type_id]
+        return result
+
+    def id_of(self, table: str, typecode: str) -> int:
+        """
+        Return the ID of a typecode.
+
+        Arguments:
+            table - the name of the typelist table
+            typecode - the typecode of an entry in the typelist
+        """
+        ids = self._load(table)[1]
+        if typecode not in ids:
+            raise TestException("Typelist " + table + " has no typecode " + typecode)
+        return ids[typecode]
+
+    def resolve(self, rows: Iterable, typelist_columns: dict[str, str]) -> Iterator:
+        """
+        Return an iterator of the rows with each typelist ID replaced by its typecode.  The
+        rows are named tuples with the same columns as the rows of the query.
+
+        The typelists are read before the iterator is returned.  When the rows are streamed
+        from a cursor, the typelist queries then do not run on the connection while the
+        cursor is open.
+
+        Arguments:
+            rows - the rows of a query
+            typelist_columns - a dictionary of column names and the typelist tables of
+               the columns.  Columns not in the rows are ignored.
+        """
+        for table in typelist_columns.values():
+            self._load(table)
+        return self._resolve_rows(rows, typelist_columns)
+
+    # ---------------------------------------------------------------------------
+    #  Support Functions
+    # ---------------------------------------------------------------------------
+
+    def _resolve_rows(self, rows: Iterable, typelist_columns: dict[str, str]) -> Iterator:
+        """
+        Yield the rows with each typelist ID replaced by its typecode.
+
+        Arguments:
+            rows - the rows of a query
+            typelist_columns - a dictionary of column names and the typelist tables of the columns
+        """
+        row_class = None
+        positions = []
+        try:
+            for row in rows:
+                if row_class is None:
+                    columns = row_columns(row)
+                    row_class = row_type(tuple(columns))
+                    positions = [(index, typelist_columns[column]) for index, column in enumerate(columns)
+                                 if column in typelist_columns]
+                values = list(row)
+                for index, table in positions:
+                    values[index] = self.typecode(table, values[index])
+                yield row_class._make(values)
+        finally:
+            #
+            # Close a generator of rows, so that its cursor is closed if this generator is closed early.
+            #
+            if hasattr(rows, "close"):
+                rows.close()
+        return
+
+    def _load(self, table: str) -> tuple[dict[int, str], dict[str, int]]:
+        """
+        Return the dictionaries of typecodes by ID and IDs by typecode for a typelist.
+        The typelist table is read the first time it is needed.
+
+        Arguments:
+            table - the name of the typelist table
+        """
+        if table not in TYPELISTS:
+            raise TestException("Unsupported typelist table: " + table)
+        with self._lock:
+            if table not in self._typecodes:
+                rows = self._query.query(typelist_query.format(table=table), ttl=TYPELIST_QUERY_TTL)
+                self._typecodes[table] = {row.ID: row.TypeCode for row in rows}
+                self._ids[table] = {row.TypeCode: row.ID for row in rows}
+            result = (self._typecodes[table], self._ids[table])
+        return result
+
+
+# -------------------------------------------------------------------------------
+#  Functions
+# -------------------------------------------------------------------------------
+
+
+def find_typelists(identity: Optional[str]) -> tuple[dict[str, dict[int, str]], dict[str, dict[str, int]],
+                                                     threading.Lock]:
+    """
+    Return the typecodes by ID, the IDs by typecode, and the lock of the typelists of a
+    database.  They are created the first time they are needed.
+
+    Arguments:
+        identity - the identity of the database, or None for typelists that are not shared
+    """
+    if identity is None:
+        result = ({}, {}, threading.Lock())
+    else:
+        with shared_typelists_lock:
+            if identity not in shared_typelists:
+                shared_typelists[identity] = ({}, {}, threading.Lock())
+            result = shared_typelists[identity]
+    return result
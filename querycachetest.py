@@ -0,0 +1,177 @@
+# -------------------------------------------------------------------------------
+#
+#  Copyright (c) 2021 Waysys LLC
+#
+# -------------------------------------------------------------------------------
+# -------------------------------------------------------------------------------
+#
+__author__ = 'Bill Shaffer'
+__version__ = "16-Oct-2021"
+
+"""
+This module tests the query cache with queries of the SQLite stand-in for the PolicyCenter
+database: the time to live of a result, the keys of results of different databases and
+arguments, the handling of a cache file that cannot be read, and the removal of the least
+recently used results.
+"""
+
+import os
+import time
+import unittest
+from datetime import datetime
+
+import xmlrunner
+
+from base.query import Query
+from base.querycache import QueryCache, CACHE_SUFFIX
+from base.sqliteconnection import SQLiteConnection
+from queries.policycenterstandin import create_standin
+from standinfixture import StandInTestCase
+
+account_statement = """
+DECLARE @CreatedBefore DATETIME2 = ?
+
+SELECT Count(*) AS NumberAccounts
+FROM   pc_account acct
+WHERE  acct.createtime < @CreatedBefore
+"""
+
+
+# -------------------------------------------------------------------------------
+#  Test Query Cache
+# -------------------------------------------------------------------------------
+
+
+class TestQueryCache(StandInTestCase):
+    """
+    This class tests the query cache.
+    """
+
+    # -------------------------------------------------------------------------------
+    #  Support Functions
+    # -------------------------------------------------------------------------------
+
+    def setUp(self):
+        """
+        Create a stand-in database with an account, and a query cache in the temporary
+        directory of the test.
+        """
+        super().setUp()
+        self.add_account(1, "A0001", datetime(2021, 9, 1))
+        self.cnx.commit()
+        self.cache_directory = os.path.join(self.directory.name, "cache")
+        self.cache = QueryCache(self.cache_directory, self.cnx.identity)
+        self.before = datetime(2021, 10, 1)
+        return
+
+    def count_accounts(self, cnx, before: datetime, ttl: float = None, cache: QueryCache = None) -> int:
+        """
+        Return the number of accounts created before a time, read through a query cache.
+
+        Arguments:
+            cnx - the connection to read the accounts on
+            before - the time before which the accounts were created
+            ttl - the number of seconds a cached result is valid, or None for the cache default
+            cache - the query cache, or None for the cache of the test
+        """
+        query = Query(cnx, cache=cache if cache is not None else self.cache)
+        return query.query(account_statement, before, ttl=ttl)[0].NumberAccounts
+
+    def cache_files(self) -> list[str]:
+        """
+        Return the paths of the files in the cache directory.
+        """
+        return [os.path.join(self.cache_directory, name) for name in os.listdir(self.cache_directory)
+                if name.endswith(CACHE_SUFFIX)]
+
+    # -------------------------------------------------------------------------------
+    #  Tests
+    # -------------------------------------------------------------------------------
+
+    def test_01_time_to_live(self):
+        """
+        Test that a result is returned from the cache within its time to live, and is read
+        from the database again once it has expired.
+        """
+        self.assertEqual(1, self.count_accounts(self.cnx, self.before))
+        self.add_account(2, "A0002", datetime(2021, 9, 2))
+        self.cnx.commit()
+        self.assertEqual(1, self.count_accounts(self.cnx, self.before, ttl=3600.0))
+        self.assertEqual(1, self.cache.hits)
+        time.sleep(0.05)
+        self.assertEqual(2, self.count_accounts(self.cnx, self.before, ttl=0.01))
+        self.assertEqual(1, self.cache.expirations)
+        self.assertEqual(2, self.cache.misses)
+        self.assertEqual(2, self.count_accounts(self.cnx, self.before, ttl=3600.0))
+        self.assertEqual(1, len(self.cache_files()))
+        return
+
+    def test_02_keys(self):
+        """
+        Test that results are kept apart by the arguments of the query, by the database of
+        the connection, and by the database of the cache.
+        """
+        self.assertEqual(1, self.count_accounts(self.cnx, self.before))
+        self.assertEqual(0, self.count_accounts(self.cnx, datetime(2021, 8, 1)))
+        other_path = os.path.join(self.directory.name, "other.db")
+        create_standin(other_path)
+        other_cnx = SQLiteConnection(other_path)
+        try:
+            self.assertEqual(0, self.count_accounts(other_cnx, self.before))
+        finally:
+            other_cnx.close()
+        self.assertEqual(0, self.cache.hits)
+        self.assertEqual(3, len(self.cache_files()))
+        other_cache = QueryCache(self.cache_directory, "other")
+        self.add_account(2, "A0002", datetime(2021, 9, 2))
+        self.cnx.commit()
+        self.assertEqual(2, self.count_accounts(self.cnx, self.before, cache=other_cache))
+        self.assertEqual(1, self.count_accounts(self.cnx, self.before))
+        self.assertEqual(1, self.cache.hits)
+        return
+
+    def test_03_corrupt_file(self):
+        """
+        Test that a cache file that cannot be read is treated as a missing result and is
+        replaced by a new result.
+        """
+        self.assertEqual(1, self.count_accounts(self.cnx, self.before))
+        files = self.cache_files()
+        self.assertEqual(1, len(files))
+        with open(files[0], "wb") as file:
+            file.write(b"not a cached result")
+        self.add_account(2, "A0002", datetime(2021, 9, 2))
+        self.cnx.commit()
+        self.assertEqual(2, self.count_accounts(self.cnx, self.before))
+        self.assertEqual(2, self.count_accounts(self.cnx, self.before))
+        self.assertEqual(1, self.cache.hits)
+        self.assertEqual(2, self.cache.stores)
+        return
+
+    def test_04_eviction(self):
+        """
+        Test that the least recently used results are removed when the cache exceeds its
+        size limit, and that reading a result makes it recently used.
+        """
+        statements = ["SELECT " + str(index) + " AS Value" for index in range(3)]
+        for index, statement in enumerate(statements):
+            self.cache.put(statement, (), ["Value"], [(index,)])
+            path = os.path.join(self.cache_directory, self.cache.key(statement, ()) + CACHE_SUFFIX)
+            os.utime(path, (1000.0 * (index + 1), 1000.0 * (index + 1)))
+        self.assertIsNotNone(self.cache.get(statements[0], ()))
+        self.cache.max_bytes = self.cache.total_bytes - 1
+        self.cache.evict()
+        self.assertEqual(1, self.cache.evictions)
+        self.assertIsNone(self.cache.get(statements[1], ()))
+        self.assertEqual([(0,)], self.cache.get(statements[0], ()))
+        self.assertEqual([(2,)], self.cache.get(statements[2], ()))
+        self.assertLessEqual(self.cache.total_bytes, self.cache.max_bytes)
+        return
+
+
+if __name__ == '__main__':
+    report_file = '/GFITWorkspaces/COMMON01/query_cache_test.xml'
+    with open(report_file, 'w') as output:
+        unittest.main(
+            testRunner=xmlrunner.XMLTestRunner(output=output),
+            failfast=False, buffer=False, catchbreak=False)
@@ -0,0 +1,214 @@
+# -------------------------------------------------------------------------------
+#
+#  Copyright (c) 2021 Waysys LLC
+#
+# -------------------------------------------------------------------------------
+# -------------------------------------------------------------------------------
+#
+__author__ = 'Bill Shaffer'
+__version__ = "16-Oct-2021"
+
+"""
+This module tests the keyset paging of queries against the SQLite stand-in for the
+PolicyCenter database.  Each policy period has two payment plan summaries, so the
+query has more than one row for each policy period, and a page can end between them.
+It also tests when the installment plans held in the reference data store are read again.
+"""
+
+import os
+import unittest
+from collections import Counter
+from datetime import datetime, timedelta
+
+import xmlrunner
+
+from base.query import Query
+from base.referencedata import ReferenceDataStore
+from base.sqliteconnection import SQLiteConnection
+from queries.policycenterqueries import PolicyCenterQueries
+from queries.selection import Selection
+from standinfixture import StandInTestCase
+
+#
+# The number of policy periods in the stand-in.  Some share a creation time.
+#
+NUMBER_PERIODS = 7
+
+unpaged_statement = """
+DECLARE @SelectionEnd DATE = ?
+DECLARE @BoundStatus INT = ?
+
+SELECT pp.policynumber AS PolicyNumber,
+       ps.NAME         AS PaymentPlan
+FROM   pc_policyperiod pp
+       JOIN pc_paymentplansummary ps
+         ON ps.policyperiod = pp.id
+WHERE  pp.createtime < @SelectionEnd
+       AND pp.status = @BoundStatus
+ORDER  BY pp.createtime DESC,
+          pp.id DESC,
+          ps.id DESC
+"""
+
+
+# -------------------------------------------------------------------------------
+#  Test Query
+# -------------------------------------------------------------------------------
+
+
+class TestQuery(StandInTestCase):
+    """
+    This class tests that paged queries return the same rows as a query without pages.
+    """
+
+    # -------------------------------------------------------------------------------
+    #  Support Functions
+    # -------------------------------------------------------------------------------
+
+    def setUp(self):
+        """
+        Create a stand-in database with policy periods that have two payment plan summaries.
+        """
+        super().setUp()
+        self.bound_status = self.typelist_id("pctl_policyperiodstatus", "Bound")
+        self.selection_end = datetime(2021, 10, 1)
+        for index in range(1, NUMBER_PERIODS + 1):
+            created = datetime(2021, 9, 1) + timedelta(days=index // 2)
+            self.add_policy_period(index, "P" + str(index), created)
+            for plan in range(2):
+                self.add_payment_plan_summary(index * 10 + plan, index, "Plan " + str(plan), updated=created)
+        self.cnx.commit()
+        return
+
+    @staticmethod
+    def plans(rows) -> list[tuple[str, str]]:
+        """
+        Return the policy number and payment plan of each row.
+
+        Arguments:
+            rows - the rows of a policy period query
+        """
+        return [(row.PolicyNumber, row.PaymentPlan) for row in rows]
+
+    # -------------------------------------------------------------------------------
+    #  Tests
+    # -------------------------------------------------------------------------------
+
+    def test_01_iter_pages(self):
+        """
+        Test that every page size returns the rows of the query without pages, in the
+        same order, when pages end between the rows of one policy period.
+        """
+        expected = self.plans(Query(self.cnx).query(unpaged_statement, self.selection_end, self.bound_status))
+        self.assertEqual(NUMBER_PERIODS * 2, len(expected))
+        statement = PolicyCenterQueries.policy_periods_statement(["PolicyNumber", "PaymentPlan"], False, True)
+        for page_size in (1, 2, 3, 5, 100):
+            rows = Query(self.cnx).iter_pages(statement, self.selection_end, self.bound_status,
+                                              first_key=(self.selection_end, 0, 0),
+                                              key_columns=("CreateTime", "PolicyPeriodID", "PaymentPlanSummaryID"),
+                                              page_size=page_size)
+            self.assertEqual(expected, self.plans(rows), "Page size " + str(page_size))
+        return
+
+    def test_02_iter_policy_periods(self):
+        """
+        Test that the policy periods read in small pages are the policy periods read in one page.
+        """
+        queries = PolicyCenterQueries(self.cnx)
+        columns = ["PolicyNumber", "PaymentPlan"]
+        expected = self.plans(queries.iter_policy_periods(self.selection_end, page_size=1000, columns=columns))
+        self.assertEqual(NUMBER_PERIODS * 2, len(expected))
+        for page_size in (1, 3):
+            rows = self.plans(queries.iter_policy_periods(self.selection_end, page_size=page_size, columns=columns))
+            self.assertEqual(expected, rows, "Page size " + str(page_size))
+        limited = self.plans(queries.iter_policy_periods(self.selection_end, number_rows=5, page_size=2,
+                                                         columns=columns))
+        self.assertEqual(expected[:5], limited)
+        self.assertEqual(Counter(expected), Counter(self.plans(
+            queries.query_policy_periods_in_effect(self.selection_end, datetime(2021, 9, 10), 100, page_size=3,
+                                                   columns=columns))))
+        return
+
+    def test_03_billing_periodicity(self):
+        """
+        Test that a policy period without a billing periodicity is not selected.
+        """
+        self.add_policy_period(99, "P99", datetime(2021, 9, 20))
+        self.add_payment_plan_summary(990, 99, "Plan 0", periodicity=None, updated=datetime(2021, 9, 20))
+        self.cnx.commit()
+        queries = PolicyCenterQueries(self.cnx)
+        columns = ["PolicyNumber", "BillingPeriodicity"]
+        for rows in (queries.query_policy_periods(self.selection_end, 100, columns=columns),
+                     list(queries.iter_policy_periods(self.selection_end, page_size=3, columns=columns))):
+            self.assertEqual(NUMBER_PERIODS * 2, len(rows))
+            self.assertNotIn("P99", [row.PolicyNumber for row in rows])
+            self.assertNotIn(None, [row.BillingPeriodicity for row in rows])
+        return
+
+    def test_04_shared_typelists(self):
+        """
+        Test that the typelists read on one connection are used by the queries of another
+        connection to the same database.
+        """
+        first = PolicyCenterQueries(self.cnx)
+        self.assertEqual(self.bound_status, first.bound_status)
+        self.cnx.execute("DELETE FROM pctl_policyperiodstatus")
+        self.cnx.commit()
+        other_cnx = SQLiteConnection(self.path)
+        try:
+            self.assertEqual(self.bound_status, PolicyCenterQueries(other_cnx).bound_status)
+        finally:
+            other_cnx.close()
+        return
+
+    def test_05_stratified_selection(self):
+        """
+        Test that the stratified selection chooses a policy period of every combination of
+        billing periodicity and payment plan before a second policy period of any of them.
+        """
+        self.add_policy_period(99, "P99", datetime(2021, 9, 20))
+        self.add_payment_plan_summary(990, 99, "Plan 0", periodicity="everyweek", updated=datetime(2021, 9, 20))
+        self.cnx.commit()
+        queries = PolicyCenterQueries(self.cnx)
+        columns = ["PolicyNumber", "PaymentPlan", "BillingPeriodicity"]
+        strata = Counter((row.BillingPeriodicity, row.PaymentPlan) for row in queries.query_policy_periods(
+            self.selection_end, 100, columns=columns, selection=Selection.stratified, per_stratum=2))
+        self.assertEqual({("monthly", "Plan 0"): 2, ("monthly", "Plan 1"): 2, ("everyweek", "Plan 0"): 1}, strata)
+        rows = queries.query_policy_periods(self.selection_end, 3, columns=columns, selection=Selection.stratified,
+                                            per_stratum=2)
+        self.assertEqual(3, len(set((row.BillingPeriodicity, row.PaymentPlan) for row in rows)))
+        return
+
+    def test_06_installment_plan_version(self):
+        """
+        Test that the installment plans held in the reference data store are read again when
+        a plan is added to the catalogue, and not when a policy period gets a plan that is
+        already in it or a plan that is not paid in installments.
+        """
+        store = ReferenceDataStore(os.path.join(self.directory.name, "reference"), self.cnx.identity,
+                                   check_interval=0)
+        ReferenceDataStore.default_store = store
+        try:
+            queries = PolicyCenterQueries(self.cnx)
+            self.assertEqual(["Plan 0", "Plan 1"], [plan.PlanName for plan in queries.query_installment_plans()])
+            self.add_payment_plan_summary(900, 1, "Plan 1", updated=datetime(2021, 9, 20))
+            self.add_payment_plan_summary(901, 1, "Full", plan_type="PaidInFull", updated=datetime(2021, 9, 20))
+            self.cnx.commit()
+            queries.query_installment_plans()
+            self.assertEqual(1, store.loads)
+            self.add_payment_plan_summary(902, 2, "Plan 2", updated=datetime(2021, 9, 20))
+            self.cnx.commit()
+            self.assertEqual(["Plan 0", "Plan 1", "Plan 2"],
+                             [plan.PlanName for plan in queries.query_installment_plans()])
+            self.assertEqual(2, store.loads)
+        finally:
+            ReferenceDataStore.default_store = None
+        return
+
+
+if __name__ == '__main__':
+    report_file = '/GFITWorkspaces/COMMON01/query_test.xml'
+    with open(report_file, 'w') as output:
+        unittest.main(
+            testRunner=xmlrunner.XMLTestRunner(output=output),
+            failfast=False, buffer=False, catchbreak=False)
@@ -0,0 +1,113 @@
+# -------------------------------------------------------------------------------
+#
+#  Copyright (c) 2021 Waysys LLC
+#
+# -------------------------------------------------------------------------------
+# -------------------------------------------------------------------------------
+#
+__author__ = 'Bill Shaffer'
+__version__ = "16-Oct-2021"
+
+"""
+This module tests preparing test case specifications ahead of the time they are written.
+A specification is prepared on a connection of a prefetcher, and its streamed tables read
+their rows on the connection of the batch once it is attached.  The data is read from the
+SQLite stand-in for the PolicyCenter database.
+"""
+
+import unittest
+from concurrent.futures import Future
+from datetime import datetime
+
+import xmlrunner
+
+from base.prefetch import Prefetcher
+from standinfixture import StandInTestCase
+from testspecs.account_test_case import AccountCheckTest
+from testspecs.registry import determine_spec, prepare_specs
+
+#
+# The account numbers in the stand-in
+#
+ACCOUNT_NUMBERS = ["A0001", "A0002", "A0003"]
+
+
+# -------------------------------------------------------------------------------
+#  Test Registry
+# -------------------------------------------------------------------------------
+
+
+class TestRegistry(StandInTestCase):
+    """
+    This class tests the specifications prepared by the prefetcher.
+    """
+
+    # -------------------------------------------------------------------------------
+    #  Support Functions
+    # -------------------------------------------------------------------------------
+
+    def setUp(self):
+        """
+        Create a stand-in database with three accounts created in the selection of the
+        account check test case.
+        """
+        super().setUp()
+        for index, account_number in enumerate(ACCOUNT_NUMBERS, start=1):
+            self.add_account(index, account_number, datetime(2021, 9, 1, index))
+        self.cnx.commit()
+        return
+
+    # -------------------------------------------------------------------------------
+    #  Tests
+    # -------------------------------------------------------------------------------
+
+    def test_01_prepare_specs(self):
+        """
+        Test that a specification is prepared once on a connection of the prefetcher, and
+        that its streamed table reads the accounts on the connection it is attached to.
+        """
+        prefetcher = Prefetcher(self.pool, workers=2)
+        pending: dict[str, Future] = {}
+        try:
+            prepare_specs(prefetcher, ["AccountCheckTest"], pending)
+            prepare_specs(prefetcher, ["AccountCheckTest"], pending)
+            self.assertEqual(1, prefetcher.submitted)
+            spec = pending.pop("AccountCheckTest").result()
+        finally:
+            prefetcher.close()
+        self.assertIsInstance(spec, AccountCheckTest)
+        self.assertTrue(spec.is_evaluated)
+        table = spec.tables[0]
+        self.assertTrue(table.is_streamed)
+        self.assertTrue(table.cnx.closed)
+        spec.attach(self.cnx)
+        rows = [list(row) for row in table.iter_rows()]
+        self.assertEqual([["ACCT-CHECK-" + str(index + 10), number, "Check account " + number]
+                          for index, number in enumerate(ACCOUNT_NUMBERS)], rows)
+        return
+
+    def test_02_prefetch(self):
+        """
+        Test that creating a specification does not read the database when there is a
+        default prefetcher, and that its data is read ahead once it is chosen to be written.
+        """
+        prefetcher = Prefetcher(self.pool, workers=2)
+        Prefetcher.default = prefetcher
+        try:
+            spec = determine_spec("PaymentPlanChange", self.cnx)
+            self.assertEqual(0, prefetcher.submitted)
+            self.assertIs(spec, spec.prefetch())
+            self.assertEqual(2, prefetcher.submitted)
+            self.assertEqual(0, spec.tables[0].number_rows + 1)
+        finally:
+            Prefetcher.default = None
+            prefetcher.close()
+        return
+
+
+if __name__ == '__main__':
+    report_file = '/GFITWorkspaces/COMMON01/registry_test.xml'
+    with open(report_file, 'w') as output:
+        unittest.main(
+            testRunner=xmlrunner.XMLTestRunner(output=output),
+            failfast=False, buffer=False, catchbreak=False)
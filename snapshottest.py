@@ -0,0 +1,105 @@
+# -------------------------------------------------------------------------------
+#
+#  Copyright (c) 2021 Waysys LLC
+#
+# -------------------------------------------------------------------------------
+# -------------------------------------------------------------------------------
+#
+__author__ = 'Bill Shaffer'
+__version__ = "16-Oct-2021"
+
+"""
+This module tests recording query results in a snapshot and replaying them.
+"""
+
+import os
+import tempfile
+import unittest
+from datetime import datetime
+
+import xmlrunner
+
+from base.snapshot import QuerySnapshot
+from base.testexception import TestException
+
+statement = """
+DECLARE @SelectionEnd DATE = ?
+
+SELECT TOP 10 pp.policynumber AS PolicyNumber
+FROM   pc_policyperiod pp
+WHERE  pp.createtime < @SelectionEnd
+"""
+
+
+# -------------------------------------------------------------------------------
+#  Test Query Snapshot
+# -------------------------------------------------------------------------------
+
+
+class TestQuerySnapshot(unittest.TestCase):
+    """
+    This class tests replaying a recorded snapshot by arguments and by order.
+    """
+
+    # -------------------------------------------------------------------------------
+    #  Support Functions
+    # -------------------------------------------------------------------------------
+
+    def setUp(self):
+        """
+        Record a snapshot with two results for the same statement.
+        """
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "queries.snapshot")
+        self.first_end = datetime(2021, 10, 1, 9, 30)
+        self.second_end = datetime(2021, 10, 2, 9, 30)
+        snapshot = QuerySnapshot(self.path)
+        snapshot.record(statement, (self.first_end,), [("P1",)], ["PolicyNumber"])
+        snapshot.record(statement, (self.second_end,), [("P2",)], ["PolicyNumber"])
+        snapshot.save()
+        return
+
+    def tearDown(self):
+        """
+        Remove the snapshot.
+        """
+        self.directory.cleanup()
+        return
+
+    # -------------------------------------------------------------------------------
+    #  Tests
+    # -------------------------------------------------------------------------------
+
+    def test_01_replay(self):
+        """
+        Test that a result is replayed for the arguments it was recorded for.
+        """
+        snapshot = QuerySnapshot(self.path, replaying=True)
+        self.assertEqual("P2", snapshot.replay(statement, (self.second_end,))[0].PolicyNumber)
+        self.assertEqual("P1", snapshot.replay(statement, (self.first_end,))[0].PolicyNumber)
+        self.assertEqual("P1", snapshot.replay(statement, (self.first_end,))[0].PolicyNumber)
+        self.assertEqual(0, snapshot.replayed_in_order)
+        return
+
+    def test_02_replay_other_arguments(self):
+        """
+        Test that a query with other arguments is an error, unless the snapshot is replayed
+        by order.
+        """
+        later_end = datetime(2021, 10, 1, 10, 45)
+        snapshot = QuerySnapshot(self.path, replaying=True)
+        self.assertRaises(TestException, snapshot.replay, statement, (later_end,))
+        snapshot = QuerySnapshot(self.path, replaying=True, by_order=True)
+        self.assertEqual("P1", snapshot.replay(statement, (later_end,))[0].PolicyNumber)
+        self.assertEqual("P2", snapshot.replay(statement, (later_end,))[0].PolicyNumber)
+        self.assertEqual(2, snapshot.replayed_in_order)
+        self.assertRaises(TestException, snapshot.replay, "SELECT 1", ())
+        return
+
+
+if __name__ == '__main__':
+    report_file = '/GFITWorkspaces/COMMON01/snapshot_test.xml'
+    with open(report_file, 'w') as output:
+        unittest.main(
+            testRunner=xmlrunner.XMLTestRunner(output=output),
+            failfast=False, buffer=False, catchbreak=False)
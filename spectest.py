@@ -0,0 +1,215 @@
+# -------------------------------------------------------------------------------
+#
+#  Copyright (c) 2021 Waysys LLC
+#
+# -------------------------------------------------------------------------------
+# -------------------------------------------------------------------------------
+#
+__author__ = 'Bill Shaffer'
+__version__ = "16-Oct-2021"
+
+"""
+This module tests how the tables of a test case specification read their data: the data
+needs read ahead on the connections of a prefetcher or on the connection of the table,
+the tables left out when they are empty, and the rows streamed from the connection a
+specification is attached to.  The data is read from the SQLite stand-in for the
+PolicyCenter database.
+"""
+
+import unittest
+from datetime import datetime
+
+import xmlrunner
+
+from base.connectionpool import PooledConnection
+from base.prefetch import Prefetcher
+from base.query import Query
+from models.spec import TestTableSpecification, TestCaseSpecification
+from standinfixture import StandInTestCase
+
+#
+# The account numbers in the stand-in
+#
+ACCOUNT_NUMBERS = ["A0001", "A0002", "A0003"]
+
+account_statement = """
+SELECT acct.accountnumber AS AccountNumber
+FROM   pc_account acct
+ORDER  BY acct.id
+"""
+
+
+# -------------------------------------------------------------------------------
+#  Test Specification
+# -------------------------------------------------------------------------------
+
+
+class TestSpecification(StandInTestCase):
+    """
+    This class tests the data needs, the prefetching, and the streamed rows of the tables
+    of a specification.
+    """
+
+    # -------------------------------------------------------------------------------
+    #  Support Functions
+    # -------------------------------------------------------------------------------
+
+    def setUp(self):
+        """
+        Create a stand-in database with three accounts.
+        """
+        super().setUp()
+        for index, account_number in enumerate(ACCOUNT_NUMBERS, start=1):
+            self.add_account(index, account_number, datetime(2021, 9, 1))
+        self.cnx.commit()
+        self.used: list = []
+        return
+
+    def read_accounts(self, cnx) -> list[str]:
+        """
+        Return the account numbers, and record the connection they were read on.
+
+        Arguments:
+            cnx - the connection to read the accounts on
+        """
+        self.used.append(cnx)
+        return [row.AccountNumber for row in Query(cnx).query(account_statement)]
+
+    def stream_accounts(self, cnx):
+        """
+        Yield a row for each account, and record the connection the accounts are read on.
+
+        Arguments:
+            cnx - the connection to read the accounts on
+        """
+        for account_number in self.read_accounts(cnx):
+            yield [account_number, "Check account " + account_number]
+        return
+
+    @staticmethod
+    def create_table() -> TestTableSpecification:
+        """
+        Return a test table with two columns.
+        """
+        table = TestTableSpecification()
+        table.columns = ["Account Number", "Comment"]
+        table.is_unique = [False, False]
+        return table
+
+    # -------------------------------------------------------------------------------
+    #  Tests
+    # -------------------------------------------------------------------------------
+
+    def test_01_fetch(self):
+        """
+        Test that data is read on the connection of the table when there is no prefetcher.
+        """
+        table = self.create_table()
+        table.cnx = self.cnx
+        table.declare_need("accounts", self.read_accounts)
+        table.prefetch()
+        self.assertEqual(ACCOUNT_NUMBERS, table.fetch("accounts"))
+        self.assertEqual([self.cnx], self.used)
+        self.assertRaises(AssertionError, table.fetch, "policy_periods")
+        return
+
+    def test_02_prefetch(self):
+        """
+        Test that data is read ahead on pooled connections, and that data fetched a second
+        time is read on the connection of the table.
+        """
+        prefetcher = Prefetcher(self.pool, workers=2)
+        try:
+            table = self.create_table()
+            table.declare_need("accounts", self.read_accounts)
+            table.declare_need("count", lambda cnx: len(self.read_accounts(cnx)))
+            table.prefetch(prefetcher)
+            table.prefetch(prefetcher)
+            self.assertEqual(2, prefetcher.submitted)
+            self.assertEqual(ACCOUNT_NUMBERS, table.fetch("accounts"))
+            self.assertEqual(len(ACCOUNT_NUMBERS), table.fetch("count"))
+            self.assertEqual(2, len(self.used))
+            for cnx in self.used:
+                self.assertIsInstance(cnx, PooledConnection)
+                self.assertTrue(cnx.closed)
+            self.assertRaises(AssertionError, table.fetch, "accounts")
+            table.cnx = self.cnx
+            self.assertEqual(ACCOUNT_NUMBERS, table.fetch("accounts"))
+            self.assertIs(self.cnx, self.used[-1])
+            #
+            # Work submitted by a worker is not started, so the worker runs it itself
+            #
+            self.assertIsNone(prefetcher.submit(lambda cnx: prefetcher.submit(self.read_accounts)).result())
+        finally:
+            prefetcher.close()
+        return
+
+    def test_03_omit_if_empty(self):
+        """
+        Test that the tables are evaluated in order, and that an empty table is skipped
+        only if it may be omitted and its rows are not streamed.
+        """
+        evaluated = []
+
+        def producer(name: str, table: TestTableSpecification, count: int):
+            evaluated.append(name)
+            table.add_rows([ACCOUNT_NUMBERS[index], "Check"] for index in range(count))
+
+        spec = TestCaseSpecification()
+        tables = {}
+        for name, count, omit_if_empty in (("full", 3, False), ("empty", 0, True), ("kept", 0, False)):
+            table = self.create_table()
+            spec.add_test_table(table, lambda name=name, table=table, count=count: producer(name, table, count),
+                                omit_if_empty=omit_if_empty)
+            tables[name] = table
+        streamed = self.create_table()
+        streamed.cnx = self.cnx
+        streamed.stream(lambda cnx: iter([]))
+        spec.add_test_table(streamed, omit_if_empty=True)
+        self.assertFalse(spec.is_evaluated)
+        self.assertEqual([tables["full"], tables["kept"], streamed], list(spec.iter_tables()))
+        self.assertEqual(["full", "empty", "kept"], evaluated)
+        self.assertTrue(spec.is_evaluated)
+        return
+
+    def test_04_attach(self):
+        """
+        Test that a specification prepared on a pooled connection streams its rows on the
+        connection it is attached to, after the pooled connection has been returned.
+        """
+        def prepare(cnx) -> TestCaseSpecification:
+            spec = TestCaseSpecification()
+            table = self.create_table()
+            table.cnx = cnx
+            table.declare_need("accounts", self.read_accounts)
+            spec.add_test_table(table, lambda: table.add_row([str(len(table.fetch("accounts"))), "Count"]))
+            streamed = self.create_table()
+            streamed.cnx = cnx
+            streamed.stream(self.stream_accounts)
+            spec.add_test_table(streamed)
+            return spec.evaluate()
+
+        prefetcher = Prefetcher(self.pool, workers=1)
+        try:
+            spec = prefetcher.submit(prepare).result()
+            unattached = prefetcher.submit(prepare).result()
+        finally:
+            prefetcher.close()
+        pooled_cnx = spec.tables[0].cnx
+        self.assertTrue(pooled_cnx.closed)
+        self.assertEqual([pooled_cnx, unattached.tables[0].cnx], self.used)
+        spec.attach(self.cnx)
+        rows = [list(row) for table in spec.iter_tables() for row in table.iter_rows()]
+        self.assertEqual([["3", "Count"]] + [[number, "Check account " + number] for number in ACCOUNT_NUMBERS], rows)
+        self.assertIs(self.cnx, self.used[-1])
+        self.assertEqual([], list(spec.tables[1].iter_rows()))
+        self.assertRaises(AssertionError, list, unattached.tables[1].iter_rows())
+        return
+
+
+if __name__ == '__main__':
+    report_file = '/GFITWorkspaces/COMMON01/spec_test.xml'
+    with open(report_file, 'w') as output:
+        unittest.main(
+            testRunner=xmlrunner.XMLTestRunner(output=output),
+            failfast=False, buffer=False, catchbreak=False)
@@ -0,0 +1,163 @@
+# -------------------------------------------------------------------------------
+#
+#  Copyright (c) 2021 Waysys LLC
+#
+# -------------------------------------------------------------------------------
+# -------------------------------------------------------------------------------
+#
+__author__ = 'Bill Shaffer'
+__version__ = "16-Oct-2021"
+
+"""
+This module tests the SQLite connection that stands in for the PolicyCenter database.
+"""
+
+import hashlib
+import sqlite3
+import unittest
+from datetime import datetime
+from decimal import Decimal
+
+import xmlrunner
+
+from base.sqliteconnection import sample_bucket, translate_statement
+from queries.policycenterstandin import create_standin
+from standinfixture import StandInTestCase
+
+statement = """
+DECLARE @SelectionEnd DATE = ?
+DECLARE @Seed INT = ?
+DECLARE @NumberRows INT = ?
+
+SELECT TOP (@NumberRows)
+       pp.policynumber AS PolicyNumber,
+       pp.createtime   AS CreateTime
+FROM   pc_policyperiod pp
+WHERE  pp.createtime < @SelectionEnd
+ORDER  BY CONVERT(BIGINT, CONVERT(BINARY(4), HASHBYTES('SHA2_256', CONCAT(pp.id, ':', @Seed)))),
+          pp.id
+"""
+
+converted_statement = """
+SELECT PeriodStart,
+       Taxes,
+       periodend,
+       LatestCreateTime
+FROM   (SELECT pp.periodstart       AS PeriodStart,
+               pp.taxsurchargesrpt  AS Taxes,
+               periodend,
+               Max(pp.createtime)   AS LatestCreateTime
+        FROM   pc_policyperiod pp
+        WHERE  pp.id = 1) periods
+"""
+
+
+# -------------------------------------------------------------------------------
+#  Test SQLite Connection
+# -------------------------------------------------------------------------------
+
+
+class TestSQLiteConnection(StandInTestCase):
+    """
+    This class tests the translation of statements and the stand-in database.
+    """
+
+    # -------------------------------------------------------------------------------
+    #  Support Functions
+    # -------------------------------------------------------------------------------
+
+    def setUp(self):
+        """
+        Create a stand-in database with three policy periods.
+        """
+        super().setUp()
+        for index in range(1, 4):
+            self.add_policy_period(index, "P" + str(index), datetime(2021, 1, index, 12, 0), status="Draft")
+        self.cnx.commit()
+        return
+
+    # -------------------------------------------------------------------------------
+    #  Tests
+    # -------------------------------------------------------------------------------
+
+    def test_01_translate(self):
+        """
+        Test that the declarations, the row limit, and the sample bucket are translated.
+        """
+        sql, declarations = translate_statement(statement)
+        self.assertEqual((("SelectionEnd", "DATE"), ("Seed", "INT"), ("NumberRows", "INT")), declarations)
+        self.assertNotIn("DECLARE", sql)
+        self.assertNotIn("TOP", sql)
+        self.assertNotIn("@", sql)
+        self.assertIn("sample_bucket(pp.id, :Seed)", sql)
+        self.assertTrue(sql.endswith("LIMIT :NumberRows"), "Row limit not at the end: " + sql)
+        return
+
+    def test_02_sample_bucket(self):
+        """
+        Test that the bucket is the first 4 bytes of the SHA-256 hash of "ID:seed".
+        """
+        expected = int.from_bytes(hashlib.sha256(b"1:67889").digest()[:4], "big")
+        self.assertEqual(expected, sample_bucket(1, 67889))
+        self.assertEqual(sample_bucket(1, 67889), sample_bucket("1", "67889"))
+        self.assertNotEqual(sample_bucket(1, 67889), sample_bucket(2, 67889))
+        self.assertTrue(0 <= sample_bucket(3, 1) < 2 ** 32)
+        return
+
+    def test_03_query(self):
+        """
+        Test that a translated query compares dates, limits the rows, and returns named
+        rows with datetime values.
+        """
+        rows = self.cnx.cursor().execute(statement, (datetime(2021, 1, 3), 67889, 5)).fetchall()
+        self.assertEqual(["P1", "P2"], sorted(row.PolicyNumber for row in rows))
+        self.assertEqual(datetime(2021, 1, 1, 12, 0), min(row.CreateTime for row in rows))
+        rows = self.cnx.cursor().execute(statement, (datetime(2021, 2, 1), 67889, 1)).fetchall()
+        self.assertEqual(1, len(rows))
+        return
+
+    def test_04_typelists(self):
+        """
+        Test that the typelist entries the queries look up are in the stand-in.
+        """
+        rows = self.cnx.cursor().execute("SELECT id AS ID FROM pctl_policyperiodstatus WHERE typecode = 'Bound'")\
+            .fetchall()
+        self.assertEqual(1, len(rows))
+        create_standin(self.path)
+        rows = self.cnx.cursor().execute("SELECT Count(*) AS NumberRows FROM pctl_policyperiodstatus").fetchall()
+        self.assertEqual(7, rows[0].NumberRows, "Typelist entries were repeated")
+        return
+
+    def test_05_converters(self):
+        """
+        Test that the values of columns declared DATETIME and MONEY are converted when they
+        are selected by name, by alias, or through a subquery, that the values of expressions
+        are not, and that other users of the sqlite3 module are not affected.
+        """
+        self.cnx.execute("UPDATE pc_policyperiod SET taxsurchargesrpt = ? WHERE id = ?", 12.5, 1)
+        self.cnx.commit()
+        row = self.cnx.cursor().execute(converted_statement).fetchone()
+        self.assertEqual(datetime(2021, 1, 1, 12, 0), row.PeriodStart)
+        self.assertEqual(Decimal("12.50"), row.Taxes)
+        self.assertEqual(datetime(2022, 1, 1, 12, 0), row.periodend)
+        self.assertEqual("2021-01-01 12:00:00", row.LatestCreateTime)
+        self.cnx.execute("CREATE TABLE pc_payment (id INTEGER PRIMARY KEY, amount MONEY)")
+        self.cnx.execute("INSERT INTO pc_payment (id, amount) VALUES (?, ?)", 1, 10)
+        self.assertEqual(Decimal("10.00"), self.cnx.cursor().execute("SELECT amount FROM pc_payment").fetchone()[0])
+        self.assertNotIn("DATETIME", sqlite3.converters)
+        self.assertNotIn("MONEY", sqlite3.converters)
+        other_cnx = sqlite3.connect(self.path, detect_types=sqlite3.PARSE_DECLTYPES)
+        try:
+            value = other_cnx.execute("SELECT createtime FROM pc_policyperiod WHERE id = 1").fetchone()[0]
+        finally:
+            other_cnx.close()
+        self.assertEqual("2021-01-01 12:00:00", value)
+        return
+
+
+if __name__ == '__main__':
+    report_file = '/GFITWorkspaces/COMMON01/sqliteconnection_test.xml'
+    with open(report_file, 'w') as output:
+        unittest.main(
+            testRunner=xmlrunner.XMLTestRunner(output=output),
+            failfast=False, buffer=False, catchbreak=False)
@@ -0,0 +1,192 @@
+# -------------------------------------------------------------------------------
+#
+#  Copyright (c) 2021 Waysys LLC
+#
+# -------------------------------------------------------------------------------
+# -------------------------------------------------------------------------------
+#
+__author__ = 'Bill Shaffer'
+__version__ = "16-Oct-2021"
+
+"""
+This module contains the base class of the tests that read the SQLite stand-in for the
+PolicyCenter database.  Each test gets an empty stand-in in a temporary directory, a
+connection to it, and, when it asks for one, a connection pool for it.  The functions
+that add rows take typecodes rather than typelist IDs.  The rows are not committed, so
+a test commits them once they are all added.
+"""
+
+import os
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+from typing import Optional
+
+from base.connectionpool import ConnectionPool
+from base.connector import Access, Database
+from base.sqliteconnection import SQLiteConnection
+from queries.policycenterstandin import create_standin, TYPELIST_TYPECODES, TYPELIST_FIRST_ID
+
+#
+# The maximum number of connections in the pool of a test
+#
+POOL_MAX_SIZE = 3
+
+
+# -------------------------------------------------------------------------------
+#  Stand-in Test Case
+# -------------------------------------------------------------------------------
+
+
+class StandInTestCase(unittest.TestCase):
+    """
+    This class creates the stand-in database for a test and adds rows to it.
+    """
+
+    # -------------------------------------------------------------------------------
+    #  Support Functions
+    # -------------------------------------------------------------------------------
+
+    def setUp(self):
+        """
+        Create an empty stand-in database and connect to it.
+        """
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "policycenter.db")
+        create_standin(self.path)
+        self.cnx = SQLiteConnection(self.path)
+        self._pool: Optional[ConnectionPool] = None
+        return
+
+    def tearDown(self):
+        """
+        Close the connections and remove the stand-in database.
+        """
+        if self._pool is not None:
+            self._pool.close()
+        self.cnx.close()
+        self.directory.cleanup()
+        return
+
+    @property
+    def database_def(self) -> Database:
+        """
+        Return the definition of the stand-in database.
+        """
+        database_def = Database()
+        database_def.access = Access.SQLite
+        database_def.db_name = self.path
+        return database_def
+
+    @property
+    def pool(self) -> ConnectionPool:
+        """
+        Return the connection pool of the stand-in database, creating it the first time.
+        """
+        if self._pool is None:
+            self._pool = ConnectionPool(self.database_def, max_size=POOL_MAX_SIZE)
+        return self._pool
+
+    @staticmethod
+    def typelist_id(table: str, typecode: str) -> int:
+        """
+        Return the ID of a typecode in the stand-in.
+
+        Arguments:
+            table - the typelist table
+            typecode - the typecode
+        """
+        return TYPELIST_FIRST_ID + TYPELIST_TYPECODES[table].index(typecode)
+
+    def add_account(self, account_id: int, account_number: str, created: datetime,
+                    status: str = "Active", org_type: str = "corporation"):
+        """
+        Add an account with a company as its account holder.  The contact, account contact,
+        and account contact role have the ID of the account.
+
+        Arguments:
+            account_id - the ID of the account
+            account_number - the account number
+            created - the time the account was created
+            status - the typecode of the account status
+            org_type - the typecode of the account organization type
+        """
+        self.cnx.execute("INSERT INTO pc_account (id, accountnumber, accountorgtype, accountstatus, createtime, "
+                         "updatetime) VALUES (?, ?, ?, ?, ?, ?)",
+                         account_id, account_number, self.typelist_id("pctl_accountorgtype", org_type),
+                         self.typelist_id("pctl_accountstatus", status), created, created)
+        self.cnx.execute("INSERT INTO pc_contact (id, subtype, name) VALUES (?, ?, ?)",
+                         account_id, self.typelist_id("pctl_contact", "Company"), "Company " + str(account_id))
+        self.cnx.execute("INSERT INTO pc_accountcontact (id, account, contact) VALUES (?, ?, ?)",
+                         account_id, account_id, account_id)
+        self.cnx.execute("INSERT INTO pc_accountcontactrole (id, accountcontact, subtype) VALUES (?, ?, ?)",
+                         account_id, account_id, self.typelist_id("pctl_accountcontactrole", "AccountHolder"))
+        return
+
+    def add_policy_period(self, period_id: int, policy_number: str, created: datetime, status: str = "Bound",
+                          period_start: Optional[datetime] = None, period_end: Optional[datetime] = None,
+                          cancellation_date: Optional[datetime] = None):
+        """
+        Add a policy period of a policy with the ID of the policy period.
+
+        Arguments:
+            period_id - the ID of the policy period
+            policy_number - the policy number
+            created - the time the policy period was created
+            status - the typecode of the policy period status
+            period_start - the start of the period, or None to start when it was created
+            period_end - the end of the period, or None to end a year after it starts
+            cancellation_date - the date the policy period was cancelled, or None
+        """
+        period_start = created if period_start is None else period_start
+        period_end = period_start + timedelta(days=365) if period_end is None else period_end
+        self.cnx.execute("INSERT INTO pc_policyperiod (id, policyid, policynumber, periodstart, periodend, "
+                         "cancellationdate, status, createtime, updatetime) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                         period_id, period_id, policy_number, period_start, period_end, cancellation_date,
+                         self.typelist_id("pctl_policyperiodstatus", status), created, created)
+        return
+
+    def add_payment_plan_summary(self, summary_id: int, period_id: int, name: str,
+                                 periodicity: Optional[str] = "monthly", plan_type: str = "Installments",
+                                 billing_id: Optional[str] = None, updated: datetime = datetime(2021, 9, 1)):
+        """
+        Add a payment plan summary of a policy period.
+
+        Arguments:
+            summary_id - the ID of the payment plan summary
+            period_id - the ID of the policy period
+            name - the name of the payment plan
+            periodicity - the typecode of the billing periodicity, or None for none
+            plan_type - the typecode of the payment method of the plan
+            billing_id - the ID of the payment plan in BillingCenter, or None for the name
+            updated - the time the payment plan summary was last updated
+        """
+        frequency = self.typelist_id("pctl_billingperiodicity", periodicity) if periodicity is not None else None
+        self.cnx.execute("INSERT INTO pc_paymentplansummary (id, policyperiod, name, invoicefrequency, "
+                         "paymentplantype, billingid, updatetime) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                         summary_id, period_id, name, frequency, self.typelist_id("pctl_paymentmethod", plan_type),
+                         name if billing_id is None else billing_id, updated)
+        return
+
+    def add_producer_code(self, code_id: int, code: str, status: str = "Active", state: str = "CA",
+                          updated: datetime = datetime(2021, 9, 1)):
+        """
+        Add a producer code.  The organization and address of the producer code have the ID
+        of the producer code.
+
+        Arguments:
+            code_id - the ID of the producer code
+            code - the producer code
+            status - the typecode of the producer status
+            state - the typecode of the state of the address
+            updated - the time the producer code and organization were last updated
+        """
+        self.cnx.execute("INSERT INTO pc_organization (id, name, updatetime) VALUES (?, ?, ?)",
+                         code_id, "Producer " + str(code_id), updated)
+        self.cnx.execute("INSERT INTO pc_address (id, addressline1, city, state, postalcode) VALUES (?, ?, ?, ?, ?)",
+                         code_id, str(code_id) + " Main Street", "Springfield", self.typelist_id("pctl_state", state),
+                         "01101")
+        self.cnx.execute("INSERT INTO pc_producercode (id, code, producerstatus, organizationid, addressid, "
+                         "updatetime) VALUES (?, ?, ?, ?, ?, ?)",
+                         code_id, code, self.typelist_id("pctl_producerstatus", status), code_id, code_id, updated)
+        return
@@ -14,28 +14,30 @@ case generation framework uses a test case specification to generate HTML
 test case files for the GFIT tool for testing Guidewire InsuranceSuite applications.
 """
 
+import argparse
+import copy
 import math
 import sys
 import time
 import traceback
+from concurrent.futures import Future, ProcessPoolExecutor, as_completed
 from pathlib import Path
-
-from pyodbc import Connection
-
-from base.connector import Connector
+from typing import TYPE_CHECKING, Optional
+
+from base.connectionpool import ConnectionPool, DEFAULT_MAX_SIZE
+from base.prefetch import Prefetcher, DEFAULT_PREFETCH_WORKERS
+from base.query import Query
+from base.querycache import QueryCache, default_cache_directory
+from base.referencedata import ReferenceDataStore, default_reference_directory
+from base.snapshot import QuerySnapshot, SnapshotConnection, merge_snapshots
 from base.testexception import TestException
 from configuration.config import ConnectorTestConfiguration
 from files.filebuilder import FileBuilder
 from models.spec import TestCaseSpecification
-from testspecs.account_payment_test_case import AccountPaymentMakeTest
-from testspecs.account_test_case import AccountCheckTest
-from testspecs.advanced_commission_test_case import AdvancedCommissionTest
-from testspecs.collateral_requirement_test_case import CollateralRequirementTest
-from testspecs.invoice_test_case import InvoiceCheckTest
-from testspecs.payment_plan_change_test_case import PaymentPlanChangeTest
-from testspecs.policy_payment_test_case import PaymentMakeTest
-from testspecs.suspense_payment_test_case import SuspensePaymentMakeTest
-from testspecs.write_off_test_case import WriteOffMakeTest
+from testspecs.registry import registry, determine_spec, prepare_specs
+
+if TYPE_CHECKING:
+    from pyodbc import Connection
 
 # -------------------------------------------------------------------------------
 #  Global Variables
@@ -43,113 +45,458 @@ from testspecs.write_off_test_case import WriteOffMakeTest
 
 configuration = ConnectorTestConfiguration()
 
+ALL_SPECS = "all"
+
+#
+# The names of the specifications, in the order they are generated by the name all.
+# The specifications are defined in the spec registry.
+#
+SPEC_NAMES = registry.names
+
+
+# -------------------------------------------------------------------------------
+#  Generation Options
+# -------------------------------------------------------------------------------
+
+
+class GenerationOptions:
+    """
+    This class holds the options that control how test cases are generated.  An instance
+    is passed to each worker process, so it must contain only simple values.
+    """
+
+    # ---------------------------------------------------------------------------
+    #  Constructor
+    # ---------------------------------------------------------------------------
+
+    def __init__(self, use_cache: bool = False, refresh: bool = False,
+                 prefetch_workers: int = DEFAULT_PREFETCH_WORKERS,
+                 record: Optional[str] = None, replay: Optional[str] = None, replay_by_order: bool = False):
+        """
+        Initialize the instance of this class.
+
+        Arguments:
+            use_cache - True if query results and reference data are kept on disk.  By default
+               every query reads the database.
+            refresh - True if cached query results and reference data are ignored and replaced
+            prefetch_workers - the number of threads reading data ahead, or 0 to read
+               data only when it is needed
+            record - the path of a snapshot file to record the query results in, or None
+            replay - the path of a snapshot file to replay the query results from, or None.
+               No database connection is made when a snapshot is replayed.
+            replay_by_order - True if a query without a result recorded for its arguments is
+               answered with the next result recorded for its statement.  By default such a
+               query is an error.
+        """
+        assert prefetch_workers >= 0, "The number of prefetch workers must not be negative"
+        assert record is None or replay is None, "A snapshot cannot be recorded and replayed at the same time"
+        assert replay is not None or not replay_by_order, "Only a replayed snapshot can be replayed by order"
+        self.use_cache = use_cache
+        self.refresh = refresh
+        self.prefetch_workers = prefetch_workers
+        self.record = record
+        self.replay = replay
+        self.replay_by_order = replay_by_order
+        return
+
+    # ---------------------------------------------------------------------------
+    #  Properties
+    # ---------------------------------------------------------------------------
+
+    @property
+    def replaying(self) -> bool:
+        """
+        Return True if the query results are replayed from a snapshot.
+        """
+        return self.replay is not None
+
+    # ---------------------------------------------------------------------------
+    #  Operations
+    # ---------------------------------------------------------------------------
+
+    def create_query_cache(self) -> Optional[QueryCache]:
+        """
+        Return the query cache for the data source, or None if the cache is not used.
+        """
+        cache = None
+        if self.use_cache and not self.replaying:
+            cache = QueryCache(default_cache_directory(), configuration.data_source.identity,
+                               refresh=self.refresh)
+        return cache
+
+    def create_reference_store(self) -> Optional[ReferenceDataStore]:
+        """
+        Return the reference data store for the data source, or None if the store is not used.
+        The store is not used with a snapshot, because data read from the store is not
+        read through a query.
+        """
+        store = None
+        if self.use_cache and self.record is None and not self.replaying:
+            store = ReferenceDataStore(default_reference_directory(), configuration.data_source.identity,
+                                       refresh=self.refresh)
+        return store
+
+    def create_snapshot(self) -> Optional[QuerySnapshot]:
+        """
+        Return the snapshot being recorded or replayed, or None if there is no snapshot.
+        """
+        snapshot = None
+        if self.record is not None:
+            snapshot = QuerySnapshot(self.record)
+        elif self.replaying:
+            snapshot = QuerySnapshot(self.replay, replaying=True, by_order=self.replay_by_order)
+        return snapshot
+
+    def worker_options(self, spec_name: str) -> "GenerationOptions":
+        """
+        Return the options for the worker process that generates the test case of a
+        specification.  Each worker records its snapshot in a part file of its own.
+
+        Arguments:
+            spec_name - the name of the specification
+        """
+        options = copy.copy(self)
+        if self.record is not None:
+            options.record = snapshot_part_path(self.record, spec_name)
+        return options
+
+
+# -------------------------------------------------------------------------------
+#  Spec Result
+# -------------------------------------------------------------------------------
+
+
+class SpecResult:
+    """
+    This class records the outcome of generating the test case for one specification.
+    """
+
+    # ---------------------------------------------------------------------------
+    #  Constructor
+    # ---------------------------------------------------------------------------
+
+    def __init__(self, spec_name: str):
+        """
+        Initialize the instance of this class.
+
+        Arguments:
+            spec_name - the name of the specification
+        """
+        assert spec_name is not None, "Specification name must not be None"
+        self.spec_name = spec_name
+        self.duration = 0.0
+        self.error = None
+        return
+
+    # ---------------------------------------------------------------------------
+    #  Properties
+    # ---------------------------------------------------------------------------
+
+    @property
+    def succeeded(self) -> bool:
+        """
+        Return True if the test case was generated without an error.
+        """
+        return self.error is None
+
+    @property
+    def status(self) -> str:
+        """
+        Return a word describing the outcome.
+        """
+        return "OK" if self.succeeded else "FAILED"
+
 
 # -------------------------------------------------------------------------------
 #  Main Function
 # -------------------------------------------------------------------------------
 
 
-def main(spec_name: str):
+def main(spec_names: list[str], jobs: int = 1, options: Optional[GenerationOptions] = None) -> int:
     """
-    This function is the main controller for test case generation.
+    This function is the main controller for test case generation.  With one job, the test
+    cases for all the specifications are generated in this process over a single database
+    connection.  With more than one job, the specifications are distributed to a pool of
+    processes.  Return 0 if every test case was generated, otherwise 1.
 
     Arguments:
-        product_spec_filename - the file name of the product spec
-        test_suite_library - the directory that holds test suites
+        spec_names - the names of the specifications, or a list with "all" to generate
+           the test cases for every specification
+        jobs - the maximum number of processes generating test cases at the same time
+        options - the generation options, or None for the defaults
     """
-    print("Starting test suite generation for: " + spec_name)
+    if options is None:
+        options = GenerationOptions()
     prior = time.time()
     ext_code = 0
+    results: list[SpecResult] = []
     try:
+        names = expand_spec_names(spec_names)
+        print("Starting test suite generation for: " + ", ".join(names))
         test_suite_directory = configuration.test_suite_directory
-        generate(spec_name, test_suite_directory)
+        if jobs > 1 and len(names) > 1:
+            results = generate_parallel(names, test_suite_directory, jobs, options)
+        else:
+            results = generate_batch(names, test_suite_directory, options)
+        if not all(result.succeeded for result in results):
+            ext_code = 1
     except TestException as e:
-        print("Error: " + str(e))
-        info = sys.exc_info()
-        tb = info[2]
-        traceback.print_tb(tb)
+        report_exception("Error: ", e)
         ext_code = 1
     except Exception as e:
-        print("Exception: " + str(e))
-        info = sys.exc_info()
-        tb = info[2]
-        traceback.print_tb(tb)
+        report_exception("Exception: ", e)
         ext_code = 1
     finally:
+        report_results(results)
         now = time.time()
         duration = math.ceil(now - prior)
         print("Ending test case generation - " + str(duration) + " seconds")
     return ext_code
 
 
-def generate(spec_name: str, test_suite_directory: str):
+def expand_spec_names(spec_names: list[str]) -> list[str]:
+    """
+    Return the list of specification names to generate.  The name "all" is replaced
+    by every supported specification.  Duplicate names are removed.
+
+    Arguments:
+        spec_names - the names given on the command line
+    """
+    assert spec_names is not None, "Specification names must not be None"
+    if len(spec_names) == 0:
+        raise TestException("At least one specification name must be given")
+    names = []
+    for spec_name in spec_names:
+        if spec_name == ALL_SPECS:
+            candidates = SPEC_NAMES
+        elif registry.has_spec(spec_name):
+            candidates = [spec_name]
+        else:
+            raise TestException("Unsupported test specification: " + spec_name)
+        for candidate in candidates:
+            if candidate not in names:
+                names.append(candidate)
+    return names
+
+
+def generate_batch(spec_names: list[str], test_suite_directory: str,
+                   options: GenerationOptions) -> list[SpecResult]:
+    """
+    Generate the test cases for a list of specifications over one pooled database connection.
+    A failure in one specification is reported and does not stop the others.
+
+    With prefetch workers, the data the tables of a specification need is read on other
+    pooled connections at the same time, once the specification is chosen to be written.
+    The next specifications are prepared on those connections while the current test case
+    is written.  The streamed tables of a prepared specification read their rows on the
+    connection of the batch as they are written.
+
+    When a snapshot is replayed, there is no database connection and the specifications
+    are prepared one after another, so the queries are made in the recorded order.  That
+    order is needed when the snapshot is replayed by order.
+
+    Arguments:
+        spec_names - the names of the specifications
+        test_suite_directory - the parent directory that holds the project test cases.
+        options - the generation options
+    """
+    results = []
+    cache = options.create_query_cache()
+    Query.default_cache = cache
+    reference_store = options.create_reference_store()
+    ReferenceDataStore.default_store = reference_store
+    snapshot = options.create_snapshot()
+    Query.default_snapshot = snapshot
+    if options.replaying:
+        pool = None
+        prefetcher = None
+        cnx = SnapshotConnection()
+    else:
+        pool = ConnectionPool.get_pool(configuration.data_source,
+                                       max_size=max(DEFAULT_MAX_SIZE, options.prefetch_workers + 1))
+        prefetcher = Prefetcher(pool, options.prefetch_workers) if options.prefetch_workers > 0 else None
+        cnx = pool.checkout()
+    Prefetcher.default = prefetcher
+    pending: dict[str, Future] = {}
+    try:
+        for index, spec_name in enumerate(spec_names):
+            result = SpecResult(spec_name)
+            prior = time.time()
+            try:
+                future = pending.pop(spec_name, None)
+                if future is not None:
+                    spec = future.result()
+                    spec.attach(cnx)
+                else:
+                    spec = determine_spec(spec_name, cnx).prefetch(prefetcher)
+                if prefetcher is not None:
+                    prepare_specs(prefetcher, spec_names[index + 1:index + 1 + prefetcher.workers], pending)
+                write_test_case(spec, test_suite_directory)
+            except Exception as e:
+                report_exception("Error in " + spec_name + ": ", e)
+                result.error = str(e)
+            result.duration = time.time() - prior
+            print(spec_name + " - " + result.status + " - " + format_duration(result.duration))
+            results.append(result)
+    finally:
+        if prefetcher is not None:
+            prefetcher.close()
+            Prefetcher.default = None
+        cnx.close()
+        if pool is not None:
+            print("Connection pool - " + pool.statistics.report())
+        if cache is not None:
+            print("Query cache - " + cache.report())
+        if reference_store is not None:
+            print("Reference data - " + reference_store.report())
+        if snapshot is not None:
+            Query.default_snapshot = None
+            if not snapshot.replaying:
+                snapshot.save()
+            print("Query snapshot - " + snapshot.report())
+    return results
+
+
+def generate_parallel(spec_names: list[str], test_suite_directory: str, jobs: int,
+                      options: GenerationOptions) -> list[SpecResult]:
+    """
+    Generate the test cases for a list of specifications in a pool of processes.  Each
+    process opens its own database connection.  The results are returned in the order of
+    the specification names.  When a snapshot is recorded, each process records a part
+    file, and the parts are combined when the processes are done.
+
+    Arguments:
+        spec_names - the names of the specifications
+        test_suite_directory - the parent directory that holds the project test cases.
+        jobs - the maximum number of processes
+        options - the generation options
+    """
+    assert jobs > 0, "The number of jobs must be greater than 0, not " + str(jobs)
+    results: dict[str, SpecResult] = {}
+    workers = min(jobs, len(spec_names))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(generate_in_worker, spec_name, test_suite_directory,
+                                   options.worker_options(spec_name)): spec_name
+                   for spec_name in spec_names}
+        for future in as_completed(futures):
+            spec_name = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                report_exception("Worker failed for " + spec_name + ": ", e)
+                result = SpecResult(spec_name)
+                result.error = str(e)
+            results[spec_name] = result
+    if options.record is not None:
+        merge_snapshots(options.record, [snapshot_part_path(options.record, spec_name) for spec_name in spec_names])
+        print("Query snapshot - recorded in " + options.record)
+    return [results[spec_name] for spec_name in spec_names]
+
+
+def snapshot_part_path(path: str, spec_name: str) -> str:
+    """
+    Return the path of the part of a snapshot recorded by the worker process for a specification.
+
+    Arguments:
+        path - the path of the snapshot file
+        spec_name - the name of the specification
+    """
+    return path + "." + spec_name + ".part"
+
+
+def generate_in_worker(spec_name: str, test_suite_directory: str, options: GenerationOptions) -> SpecResult:
+    """
+    Generate the test case for one specification in a worker process over the
+    worker's own connection.
+
+    Arguments:
+        spec_name - the name of the specification
+        test_suite_directory - the parent directory that holds the project test cases.
+        options - the generation options
+    """
+    results = generate_batch([spec_name], test_suite_directory, options)
+    return results[0]
+
+
+def generate(spec_name: str, test_suite_directory: str, cnx: "Connection"):
     """
     Validate the inputs for this test case and output the test cases.
 
     Arguments:
         spec_name - the name of the specification
         test_suite_directory - the parent directory that holds the project test cases.
+        cnx - a connection to the database
     """
     #
     # Determine the specification to use
     #
     assert spec_name is not None, "Specification name must not be None"
     assert len(spec_name) > 0, "Specification name must not be an empty string"
-    spec = obtain_spec(spec_name)
+    spec = determine_spec(spec_name, cnx).prefetch()
+    write_test_case(spec, test_suite_directory)
+    return
+
+
+def write_test_case(spec: TestCaseSpecification, test_suite_directory: str):
+    """
+    Output the test case of a specification.
+
+    Arguments:
+        spec - the test case specification
+        test_suite_directory - the parent directory that holds the project test cases.
+    """
     output_directory = create_output_directory(spec, test_suite_directory)
     file_builder = FileBuilder(spec, output_directory, 1)
     file_builder.produce_test_case()
     return
 
 
-def obtain_spec(spec_name: str) -> TestCaseSpecification:
+# ---------------------------------------------------------------------------
+#  Listing and Validation
+# ---------------------------------------------------------------------------
+
+
+def list_specs():
+    """
+    Print the name, test suite, and description of each specification.
+    """
+    for definition in registry.definitions:
+        print(definition.name.ljust(30) + (definition.project_name + "/" + definition.suite_name).ljust(50) +
+              definition.description)
+    return
+
+
+def describe_specs(spec_names: list[str]):
     """
-    Return the test case specification associated with the specification name.
-    Initialize the database connection for the specification.
+    Print the metadata of specifications.
 
     Arguments:
-        spec_name - the name of the specification
+        spec_names - the names of the specifications, or a list with "all"
     """
-    cnx = Connector.create_connector(configuration.data_source)
-    try:
-        spec = determine_spec(spec_name, cnx)
-    except Exception as e:
-        raise e
-    finally:
-        cnx.close()
-    return spec
+    for spec_name in expand_spec_names(spec_names):
+        print(registry.fetch(spec_name).describe())
+    return
 
 
-def determine_spec(spec_name: str, cnx: Connection) -> TestCaseSpecification:
+def validate_specs(spec_names: list[str]) -> int:
     """
-    Return the test case specification to be used to generate the test cases.
+    Check that each specification can be imported, that the queries it requires exist,
+    and that the directory of its test suite exists.  The database is not used.  Return 0
+    if there are no problems, otherwise 1.
 
     Arguments:
-        spec_name - the name of the specification
-        cnx - an ODBC connection to the database
-    """
-
-    if spec_name == "AccountCheckTest":
-        spec = AccountCheckTest(cnx)
-    elif spec_name == "InvoiceCheckTest":
-        spec = InvoiceCheckTest(cnx)
-    elif spec_name == "SuspensePaymentMake":
-        spec = SuspensePaymentMakeTest(cnx)
-    elif spec_name == "AccountPaymentMake":
-        spec = AccountPaymentMakeTest(cnx)
-    elif spec_name == "PaymentMake":
-        spec = PaymentMakeTest(cnx)
-    elif spec_name == "AdvancedCommissionPayment":
-        spec = AdvancedCommissionTest(cnx)
-    elif spec_name == "WriteOffMake":
-        spec = WriteOffMakeTest(cnx)
-    elif spec_name == "PaymentPlanChange":
-        spec = PaymentPlanChangeTest(cnx)
-    elif spec_name == "CollateralRequirementTest":
-        spec = CollateralRequirementTest(cnx)
-    else:
-        raise TestException("Unsupported test specification: " + spec_name)
-    return spec
+        spec_names - the names of the specifications, or a list with "all"
+    """
+    ext_code = 0
+    test_suite_directory = configuration.test_suite_directory
+    for spec_name in expand_spec_names(spec_names):
+        problems = registry.fetch(spec_name).validate(test_suite_directory)
+        print(spec_name.ljust(30) + ("OK" if len(problems) == 0 else "FAILED"))
+        for problem in problems:
+            print("    " + problem)
+        if len(problems) > 0:
+            ext_code = 1
+    return ext_code
 
 
 def create_output_directory(spec: TestCaseSpecification, test_suite_directory: str) -> str:
@@ -179,6 +526,51 @@ def validate_directory(direct: str):
     return
 
 
+# ---------------------------------------------------------------------------
+#  Reporting
+# ---------------------------------------------------------------------------
+
+
+def report_exception(label: str, e: Exception):
+    """
+    Print an exception and its traceback.
+
+    Arguments:
+        label - the text printed before the exception message
+        e - the exception
+    """
+    print(label + str(e))
+    traceback.print_tb(e.__traceback__)
+    return
+
+
+def report_results(results: list[SpecResult]):
+    """
+    Print the outcome and duration of each specification.
+
+    Arguments:
+        results - the results of generating the specifications
+    """
+    if len(results) > 0:
+        print("____________________________________________________")
+        for result in results:
+            print(result.spec_name.ljust(30) + result.status.ljust(8) + format_duration(result.duration))
+        failures = sum(1 for result in results if not result.succeeded)
+        print("Generated: " + str(len(results) - failures) + "  Failed: " + str(failures))
+        print("____________________________________________________")
+    return
+
+
+def format_duration(duration: float) -> str:
+    """
+    Return a duration in seconds formatted for the report.
+
+    Arguments:
+        duration - the number of seconds
+    """
+    return "{:.2f} seconds".format(duration)
+
+
 # ---------------------------------------------------------------------------
 #  Main
 # ---------------------------------------------------------------------------
@@ -188,12 +580,62 @@ if __name__ == '__main__':
     """
     Run the test generation program
     """
-    if len(sys.argv) != 2:
-        print("""
-              To execute testcasegen, use this command:
-
-              python main.py spec_name 
-              """)
-        sys.exit(1)
-    exit_code = main(sys.argv[1])
+    parser = argparse.ArgumentParser(
+        prog="testcasegen",
+        description="Generate GFIT test cases.  Use the spec name all to generate every test case.")
+    parser.add_argument("spec_names", nargs="*", metavar="spec_name",
+                        help="the name of a test case specification, or all")
+    inspect_group = parser.add_mutually_exclusive_group()
+    inspect_group.add_argument("--list", action="store_true",
+                               help="list the test case specifications and exit")
+    inspect_group.add_argument("--describe", action="store_true",
+                               help="describe the named specifications, or all of them, and exit")
+    inspect_group.add_argument("--validate", action="store_true",
+                               help="check the named specifications, or all of them, without the database and exit")
+    parser.add_argument("--jobs", type=int, default=1, metavar="N",
+                        help="the number of processes generating test cases at the same time")
+    parser.add_argument("--cache", dest="use_cache", action="store_true",
+                        help="keep query results and reference data on disk and reuse them within their time to live")
+    parser.add_argument("--refresh", action="store_true",
+                        help="with --cache, ignore cached query results and reference data and replace them")
+    parser.add_argument("--prefetch", type=int, default=DEFAULT_PREFETCH_WORKERS, metavar="N",
+                        help="the number of connections reading data ahead in each process, or 0 for none")
+    snapshot_group = parser.add_mutually_exclusive_group()
+    snapshot_group.add_argument("--record", metavar="FILE",
+                                help="record the query results in a snapshot file")
+    snapshot_group.add_argument("--replay", metavar="FILE",
+                                help="generate from the query results in a snapshot file without a database")
+    parser.add_argument("--replay-by-order", action="store_true",
+                        help="with --replay, answer a query whose arguments differ from the recorded ones, "
+                             "such as dates derived from the current time, with the next result recorded "
+                             "for the same statement")
+    arguments = parser.parse_args()
+    if arguments.list:
+        list_specs()
+        sys.exit(0)
+    if arguments.describe or arguments.validate:
+        try:
+            names_given = arguments.spec_names if len(arguments.spec_names) > 0 else [ALL_SPECS]
+            if arguments.describe:
+                describe_specs(names_given)
+                exit_code = 0
+            else:
+                exit_code = validate_specs(names_given)
+        except TestException as e:
+            print("Error: " + str(e))
+            exit_code = 1
+        sys.exit(exit_code)
+    if len(arguments.spec_names) == 0:
+        parser.error("at least one spec_name is required")
+    if arguments.jobs < 1:
+        parser.error("--jobs must be at least 1")
+    if arguments.prefetch < 0:
+        parser.error("--prefetch must not be negative")
+    if arguments.refresh and not arguments.use_cache:
+        parser.error("--refresh requires --cache")
+    if arguments.replay_by_order and arguments.replay is None:
+        parser.error("--replay-by-order requires --replay")
+    generation_options = GenerationOptions(arguments.use_cache, arguments.refresh, arguments.prefetch,
+                                           arguments.record, arguments.replay, arguments.replay_by_order)
+    exit_code = main(arguments.spec_names, arguments.jobs, generation_options)
     sys.exit(exit_code)
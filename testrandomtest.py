@@ -0,0 +1,112 @@
+# -------------------------------------------------------------------------------
+#
+#  Copyright (c) 2021 Waysys LLC
+#
+# -------------------------------------------------------------------------------
+# -------------------------------------------------------------------------------
+#
+__author__ = 'Bill Shaffer'
+__version__ = "15-Oct-2021"
+
+"""
+This module tests the reservoir sample and the weighted selection of the random class.
+"""
+
+import unittest
+
+import xmlrunner
+
+from base.testrandom import Random, DEFAULT_SEED
+
+
+def stream(count: int):
+    """
+    Yield the integers from 0 up to count, as a streaming query yields rows.
+
+    Arguments:
+        count - the number of integers
+    """
+    for value in range(count):
+        yield value
+    return
+
+
+# -------------------------------------------------------------------------------
+#  Test Reservoir Sample
+# -------------------------------------------------------------------------------
+
+
+class TestReservoirSample(unittest.TestCase):
+    """
+    This class tests the reservoir_sample function of the Random class.
+    """
+
+    # -------------------------------------------------------------------------------
+    #  Tests
+    # -------------------------------------------------------------------------------
+
+    def test_01_size_and_order(self):
+        """
+        Test that the sample has the requested size, has no repeats, and keeps the
+        order of the stream.
+        """
+        sample = Random(DEFAULT_SEED).reservoir_sample(stream(1000), 25)
+        self.assertEqual(25, len(sample), "Incorrect sample size")
+        self.assertEqual(len(sample), len(set(sample)), "Items were repeated")
+        self.assertEqual(sorted(sample), sample, "Sample is not in stream order")
+        return
+
+    def test_02_reproducible(self):
+        """
+        Test that the same seed selects the same sample and another seed does not.
+        """
+        first = Random(DEFAULT_SEED).reservoir_sample(stream(1000), 25)
+        second = Random(DEFAULT_SEED).reservoir_sample(stream(1000), 25)
+        other = Random(DEFAULT_SEED + 1).reservoir_sample(stream(1000), 25)
+        self.assertEqual(first, second, "Same seed selected a different sample")
+        self.assertNotEqual(first, other, "Different seed selected the same sample")
+        return
+
+    def test_03_short_stream(self):
+        """
+        Test that a stream with no more items than the sample size is returned whole.
+        """
+        self.assertEqual(list(range(10)), Random(DEFAULT_SEED).reservoir_sample(stream(10), 10))
+        self.assertEqual(list(range(3)), Random(DEFAULT_SEED).reservoir_sample(stream(3), 10))
+        self.assertEqual([], Random(DEFAULT_SEED).reservoir_sample(stream(0), 10))
+        return
+
+    def test_04_uniform(self):
+        """
+        Test that each item is selected about equally often.
+        """
+        counts = [0] * 20
+        random = Random(DEFAULT_SEED)
+        for trial in range(5000):
+            for value in random.reservoir_sample(stream(20), 5):
+                counts[value] += 1
+        expected = 5000 * 5 / 20
+        for value, count in enumerate(counts):
+            self.assertAlmostEqual(expected, count, delta=expected * 0.1,
+                                   msg="Item " + str(value) + " selected " + str(count) + " times")
+        return
+
+    def test_05_select_weighted(self):
+        """
+        Test that items are selected in proportion to their weights.
+        """
+        selected = Random(DEFAULT_SEED).select_weighted(["a", "b", "c"], [70, 20, 10], 10000)
+        self.assertEqual(10000, len(selected), "Incorrect number of selections")
+        for item, weight in (("a", 70), ("b", 20), ("c", 10)):
+            expected = 10000 * weight / 100
+            self.assertAlmostEqual(expected, selected.count(item), delta=expected * 0.1,
+                                   msg="Item " + item + " selected " + str(selected.count(item)) + " times")
+        return
+
+
+if __name__ == '__main__':
+    report_file = '/GFITWorkspaces/COMMON01/testrandom_test.xml'
+    with open(report_file, 'w') as output:
+        unittest.main(
+            testRunner=xmlrunner.XMLTestRunner(output=output),
+            failfast=False, buffer=False, catchbreak=False)
@@ -12,15 +12,19 @@ __version__ = "17-Sep-2021"
 This module specifies the Account Payment Make test case.
 """
 
+import functools
 from datetime import datetime
-
-from pyodbc import Connection
+from typing import TYPE_CHECKING
 
 from base.testrandom import Random, DEFAULT_SEED
 from base.uniqueid import gen_unique_id
 from models.paymenthistory import PaymentHistory
 from models.spec import TestTableSpecification, TestCaseSpecification
 from queries.policycenterqueries import PolicyCenterQueries
+from queries.selection import Selection
+
+if TYPE_CHECKING:
+    from pyodbc import Connection
 
 
 # -------------------------------------------------------------------------------
@@ -37,7 +41,7 @@ class AccountPaymentMakeTestTable(TestTableSpecification):
     #  Constructor
     # ---------------------------------------------------------------------------
 
-    def __init__(self, cnx: Connection):
+    def __init__(self, cnx: "Connection"):
         """
         Specify the characteristics of the test table.
         """
@@ -60,6 +64,14 @@ class AccountPaymentMakeTestTable(TestTableSpecification):
         self.pc_queries = PolicyCenterQueries(cnx)
         self.selection_end = datetime.now()
         self.number_of_rows = 30
+        self.selection = Selection.sample
+        self.seed = DEFAULT_SEED
+        self.policy_period_columns = ["AccountNumber", "TotalInvoicedAmount"]
+        #
+        # Declare the data needed to generate the rows
+        #
+        self.cnx = cnx
+        self.declare_need("policy_periods", self.read_policy_periods)
         return
 
     # ---------------------------------------------------------------------------
@@ -70,6 +82,18 @@ class AccountPaymentMakeTestTable(TestTableSpecification):
     #  Operations
     # ---------------------------------------------------------------------------
 
+    def read_policy_periods(self, cnx: "Connection") -> list:
+        """
+        Return the policy periods used to generate the rows.
+
+        Arguments:
+            cnx - the connection used to read the policy periods
+        """
+        queries = self.pc_queries if cnx is self.cnx else PolicyCenterQueries(cnx)
+        return queries.query_policy_periods(self.selection_end, self.number_of_rows,
+                                            columns=self.policy_period_columns,
+                                            selection=self.selection, seed=self.seed)
+
     def generate_rows(self, payment_history: dict[str, PaymentHistory]):
         """
         Generate the rows for the test table.
@@ -77,7 +101,7 @@ class AccountPaymentMakeTestTable(TestTableSpecification):
         Arguments:
             payment_history - the history of payments
         """
-        policy_periods = self.pc_queries.query_policy_periods(self.selection_end, self.number_of_rows)
+        policy_periods = self.fetch("policy_periods")
         count = self.test_id_start
         for policy_period in policy_periods:
             row = self.create_row(self.test_id_prefix, count, policy_period)
@@ -288,7 +312,7 @@ class AccountPaymentMakeTest(TestCaseSpecification):
     #  Constructor
     # ---------------------------------------------------------------------------
 
-    def __init__(self, cnx: Connection):
+    def __init__(self, cnx: "Connection"):
         """
         Initialize the instance of this class with the values for the Account
         Check test case.
@@ -313,22 +337,17 @@ class AccountPaymentMakeTest(TestCaseSpecification):
         #
         self.payment_history: dict[str, PaymentHistory] = {}
         table = AccountPaymentMakeTestTable(cnx)
-        table.generate_rows(self.payment_history)
-        self.add_test_table(table)
+        self.add_test_table(table, functools.partial(table.generate_rows, self.payment_history))
         #
         # Specify the account reversal table
         #
         table = AccountPaymentReverseTestTable()
-        table.generate_rows(self.payment_history)
         # Add the table only if rows of data were generated.
-        if table.has_rows:
-            self.add_test_table(table)
+        self.add_test_table(table, functools.partial(table.generate_rows, self.payment_history), omit_if_empty=True)
         #
         # Specify account disbursement test table
         #
         table = AccountDisbursementTestTable()
-        table.generate_rows(self.payment_history)
         # Add the table only if rows of data were generated.
-        if table.has_rows:
-            self.add_test_table(table)
+        self.add_test_table(table, functools.partial(table.generate_rows, self.payment_history), omit_if_empty=True)
         return
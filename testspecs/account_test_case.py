@@ -13,9 +13,12 @@ This module specifies the Account Check Test case
 """
 
 from models.spec import TestTableSpecification, TestCaseSpecification
-from queries.policycenterqueries import PolicyCenterQueries
-from pyodbc import Connection
+from queries.policycenterqueries import PolicyCenterQueries, ACCOUNT_QUERY_PARTITIONS
 from datetime import datetime
+from typing import TYPE_CHECKING, Iterator
+
+if TYPE_CHECKING:
+    from pyodbc import Connection
 
 # -------------------------------------------------------------------------------
 #  Account Check Test Table
@@ -31,7 +34,7 @@ class AccountCheckTestTable(TestTableSpecification):
     #  Constructor
     # ---------------------------------------------------------------------------
 
-    def __init__(self, cnx: Connection):
+    def __init__(self, cnx: "Connection"):
         """
         Specify the characteristics of the test table.
         """
@@ -48,21 +51,31 @@ class AccountCheckTestTable(TestTableSpecification):
         self.pc_queries = PolicyCenterQueries(cnx)
         self.selection_start = datetime(2021, 9, 1)
         self.selection_end = datetime(2021, 9, 3)
+        self.partitions = ACCOUNT_QUERY_PARTITIONS
+        #
+        # The rows are streamed from the accounts as the table is written
+        #
+        self.cnx = cnx
+        self.stream(self.stream_rows)
         return
 
     # ---------------------------------------------------------------------------
     #  Operations
     # ---------------------------------------------------------------------------
 
-    def generate_rows(self):
+    def stream_rows(self, cnx: "Connection") -> Iterator[list[str]]:
         """
-        Generate the rows for the test table.
+        Yield the rows for the test table.  The accounts are read a page at a time, and the
+        ranges of days of the selection are read at the same time.
+
+        Arguments:
+            cnx - the connection used to read the accounts
         """
-        accounts = self.pc_queries.query_accounts(self.selection_start, self.selection_end)
+        queries = self.pc_queries if cnx is self.cnx else PolicyCenterQueries(cnx)
         count = self.test_id_start
-        for account in accounts:
-            row = self.create_row(self.test_id_prefix, count, account)
-            self.add_row(row)
+        for account in queries.iter_accounts(self.selection_start, self.selection_end,
+                                             partitions=self.partitions):
+            yield self.create_row(self.test_id_prefix, count, account)
             count += 1
         return
 
@@ -96,7 +109,7 @@ class AccountCheckTest(TestCaseSpecification):
     #  Constructor
     # ---------------------------------------------------------------------------
 
-    def __init__(self, cnx: Connection):
+    def __init__(self, cnx: "Connection"):
         """
         Initialize the instance of this class with the values for the Account
         Check test case.
@@ -112,7 +125,5 @@ class AccountCheckTest(TestCaseSpecification):
         #
         # Specify the tables in the test case
         #
-        table = AccountCheckTestTable(cnx)
-        table.generate_rows()
-        self.add_test_table(table)
+        self.add_test_table(AccountCheckTestTable(cnx))
         return
@@ -13,10 +13,14 @@ This module specifies the Advanced Commission test case.
 """
 
 from models.spec import TestTableSpecification, TestCaseSpecification
-from pyodbc import Connection
 from queries.policycenterqueries import PolicyCenterQueries
+from queries.selection import Selection
 from base.testrandom import Random, DEFAULT_SEED
 from base.uniqueid import gen_unique_id
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from pyodbc import Connection
 
 # -------------------------------------------------------------------------------
 #  Account Payment Make Test Table
@@ -32,7 +36,7 @@ class AdvancedCommissionTestTable(TestTableSpecification):
     #  Constructor
     # ---------------------------------------------------------------------------
 
-    def __init__(self, cnx: Connection):
+    def __init__(self, cnx: "Connection"):
         """
         Specify the characteristics of the test table.
         """
@@ -52,11 +56,19 @@ class AdvancedCommissionTestTable(TestTableSpecification):
         self.payment_range = (100, 1000)
         self.random = Random(DEFAULT_SEED)
         self.producer_weight = 50
+        self.number_of_producers = 20
+        self.selection = Selection.sample
+        self.seed = DEFAULT_SEED
         self.payment_range = (10, 1000)
         #
         # Set up query of PolicyCenter
         #
         self.pc_queries = PolicyCenterQueries(cnx)
+        #
+        # Declare the data needed to generate the rows
+        #
+        self.cnx = cnx
+        self.declare_need("producer_codes", self.read_producer_codes)
         return
 
     # ---------------------------------------------------------------------------
@@ -67,17 +79,30 @@ class AdvancedCommissionTestTable(TestTableSpecification):
     #  Operations
     # ---------------------------------------------------------------------------
 
+    def read_producer_codes(self, cnx: "Connection") -> list:
+        """
+        Return the producer codes used to generate the rows.  With the sample selection,
+        the database selects producer_weight percent of the producer codes.  With the
+        reservoir selection, number_of_producers producer codes are selected while the
+        producer codes are streamed.
+
+        Arguments:
+            cnx - the connection used to read the producer codes
+        """
+        queries = self.pc_queries if cnx is self.cnx else PolicyCenterQueries(cnx)
+        if self.selection == Selection.reservoir:
+            results = queries.reservoir_producer_codes(self.number_of_producers, self.seed)
+        else:
+            results = queries.sample_producer_codes(self.producer_weight, self.seed)
+        return results
+
     def generate_rows(self):
         """
         Generate the rows for the test table.
         """
-        producer_codes = self.pc_queries.query_producer_code()
-        count = self.test_id_start
-        for producer_code in producer_codes:
-            if self.random.select(self.producer_weight):
-                row = self.create_row(self.test_id_prefix, count, producer_code)
-                self.add_row(row)
-                count += 1
+        producer_codes = self.fetch("producer_codes")
+        self.add_rows(self.create_row(self.test_id_prefix, count, producer_code)
+                      for count, producer_code in enumerate(producer_codes, self.test_id_start))
         return
 
     def create_row(self, prefix: str, count: int, producer_code) -> list[str]:
@@ -113,7 +138,7 @@ class AdvancedCommissionTest(TestCaseSpecification):
     #  Constructor
     # ---------------------------------------------------------------------------
 
-    def __init__(self, cnx: Connection):
+    def __init__(self, cnx: "Connection"):
         """
         Initialize the instance of this class with the values for the Account
         Check test case.
@@ -135,6 +160,5 @@ class AdvancedCommissionTest(TestCaseSpecification):
         # Specify the tables in the test case
         #
         table = AdvancedCommissionTestTable(cnx)
-        table.generate_rows()
-        self.add_test_table(table)
+        self.add_test_table(table, table.generate_rows)
         return
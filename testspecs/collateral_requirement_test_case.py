@@ -13,14 +13,17 @@ This module specifies the collateral requirement test case.
 """
 
 from datetime import datetime
-
-from pyodbc import Connection
+from typing import TYPE_CHECKING
 
 from base.testrandom import Random, DEFAULT_SEED
 from base.uniqueid import gen_unique_id
 from base.dates import convert_to_iso_string
 from models.spec import TestTableSpecification, TestCaseSpecification
 from queries.policycenterqueries import PolicyCenterQueries
+from queries.selection import Selection
+
+if TYPE_CHECKING:
+    from pyodbc import Connection
 
 # -------------------------------------------------------------------------------
 #  Write-Off Make Test Table
@@ -36,7 +39,7 @@ class CollateralRequirementTestTable(TestTableSpecification):
     #  Constructor
     # ---------------------------------------------------------------------------
 
-    def __init__(self, cnx: Connection):
+    def __init__(self, cnx: "Connection"):
         """
         Specify the characteristics of the test table.
         """
@@ -64,6 +67,14 @@ class CollateralRequirementTestTable(TestTableSpecification):
         self.pc_queries = PolicyCenterQueries(cnx)
         self.selection_end = datetime.now()
         self.number_of_rows = 1
+        self.selection = Selection.sample
+        self.seed = DEFAULT_SEED
+        self.policy_period_columns = ["AccountNumber", "PeriodStart", "PeriodEnd"]
+        #
+        # Declare the data needed to generate the rows
+        #
+        self.cnx = cnx
+        self.declare_need("policy_periods", self.read_policy_periods)
         return
 
     # ---------------------------------------------------------------------------
@@ -81,34 +92,27 @@ class CollateralRequirementTestTable(TestTableSpecification):
     #  Operations
     # ---------------------------------------------------------------------------
 
-    def generate_rows(self):
+    def read_policy_periods(self, cnx: "Connection") -> list:
         """
-        Generate the rows for the test table.
-        """
-        policy_periods = self.pc_queries.query_policy_periods(self.selection_end, self.number_of_rows)
-        count = self.test_id_start
-        for policy_period in policy_periods:
-            if self.is_in_effect(policy_period, self.selection_end):
-                row = self.create_row(self.test_id_prefix, count, policy_period)
-                self.add_row(row)
-                count += 1
-        return
+        Return the policy periods used to generate the rows.
 
-    @staticmethod
-    def is_in_effect(policy_period, date: datetime) -> bool:
+        Arguments:
+            cnx - the connection used to read the policy periods
         """
-        Return True if the policy period is in effect on the specified date.
+        queries = self.pc_queries if cnx is self.cnx else PolicyCenterQueries(cnx)
+        return queries.query_policy_periods(self.selection_end, self.number_of_rows,
+                                            as_of=self.selection_end,
+                                            columns=self.policy_period_columns,
+                                            selection=self.selection, seed=self.seed)
 
-        Arguments:
-            policy_period - a row from the results of a query of the policy period and related data
-            date - the date specified for testing
+    def generate_rows(self):
         """
-        result = True
-        if date < policy_period.PeriodStart:
-            result = False
-        elif date >= policy_period.PeriodEnd:
-            result = False
-        return result
+        Generate the rows for the test table.
+        """
+        policy_periods = self.fetch("policy_periods")
+        self.add_rows(self.create_row(self.test_id_prefix, count, policy_period)
+                      for count, policy_period in enumerate(policy_periods, self.test_id_start))
+        return
 
     def create_row(self, prefix: str, count: int, policy_period) -> list[str]:
         """
@@ -174,7 +178,7 @@ class CollateralRequirementTest(TestCaseSpecification):
     #  Constructor
     # ---------------------------------------------------------------------------
 
-    def __init__(self, cnx: Connection):
+    def __init__(self, cnx: "Connection"):
         """
         Initialize the instance of this class with the values for the Account
         Check test case.
@@ -195,6 +199,5 @@ class CollateralRequirementTest(TestCaseSpecification):
         # Specify the tables in the test case
         #
         table = CollateralRequirementTestTable(cnx)
-        table.generate_rows()
-        self.add_test_table(table)
+        self.add_test_table(table, table.generate_rows)
         return
@@ -13,10 +13,15 @@ This module specifies the Account Check Test case
 """
 
 from models.spec import TestTableSpecification, TestCaseSpecification
-from models.policyperiod import PolicyPeriod, PolicyStatus
+from models.policyperiod import PolicyPeriod
 from queries.policycenterqueries import PolicyCenterQueries
-from pyodbc import Connection
+from base.testrandom import DEFAULT_SEED
+from queries.selection import Selection
 from datetime import datetime
+from typing import TYPE_CHECKING, Iterator
+
+if TYPE_CHECKING:
+    from pyodbc import Connection
 
 # -------------------------------------------------------------------------------
 #  Invoice Check Test Table
@@ -32,7 +37,7 @@ class InvoiceCheckTestTable(TestTableSpecification):
     #  Constructor
     # ---------------------------------------------------------------------------
 
-    def __init__(self, cnx: Connection):
+    def __init__(self, cnx: "Connection"):
         """
         Specify the characteristics of the test table.
         """
@@ -53,24 +58,39 @@ class InvoiceCheckTestTable(TestTableSpecification):
         self.pc_queries = PolicyCenterQueries(cnx)
         self.selection_end = datetime.now()
         self.number_of_rows = 10
+        self.selection = Selection.stratified
+        self.rows_per_stratum = 2
+        self.seed = DEFAULT_SEED
+        self.policy_period_columns = ["AccountNumber", "PolicyNumber", "PeriodStart", "PeriodEnd", "CancellationDate",
+                                      "Taxes", "Premium", "PaymentPlan", "Status", "BillingID"]
+        #
+        # The rows are streamed from the policy periods as the table is written
+        #
+        self.cnx = cnx
+        self.stream(self.stream_rows)
         return
 
     # ---------------------------------------------------------------------------
     #  Operations
     # ---------------------------------------------------------------------------
 
-    def generate_rows(self):
+    def stream_rows(self, cnx: "Connection") -> Iterator[list[str]]:
         """
-        Generate the rows for the test table.
+        Yield the rows for the test table.  The policy periods are fetched from the
+        cursor in batches.  Only the policy periods in force at the selection end are
+        selected, so that every stratum is filled with policy periods that are used.
+
+        Arguments:
+            cnx - the connection used to read the policy periods
         """
-        policy_periods = self.pc_queries.query_policy_periods(self.selection_end, self.number_of_rows)
-        count = self.test_id_start
-        for policy_period in policy_periods:
-            model = self.convert_to_model(policy_period)
-            if model.period_display_status(self.selection_end) == PolicyStatus.InForce:
-                row = self.create_row(self.test_id_prefix, count, model)
-                self.add_row(row)
-                count += 1
+        queries = self.pc_queries if cnx is self.cnx else PolicyCenterQueries(cnx)
+        policy_periods = queries.stream_policy_periods(self.selection_end, self.number_of_rows,
+                                                       as_of=self.selection_end,
+                                                       columns=self.policy_period_columns,
+                                                       selection=self.selection, seed=self.seed,
+                                                       per_stratum=self.rows_per_stratum)
+        for count, policy_period in enumerate(policy_periods, self.test_id_start):
+            yield self.create_row(self.test_id_prefix, count, self.convert_to_model(policy_period))
         return
 
     @staticmethod
@@ -125,7 +145,7 @@ class InvoiceCheckTest(TestCaseSpecification):
     #  Constructor
     # ---------------------------------------------------------------------------
 
-    def __init__(self, cnx: Connection):
+    def __init__(self, cnx: "Connection"):
         """
         Initialize the instance of this class with the values for the Account
         Check test case.
@@ -141,7 +161,5 @@ class InvoiceCheckTest(TestCaseSpecification):
         #
         # Specify the tables in the test case
         #
-        table = InvoiceCheckTestTable(cnx)
-        table.generate_rows()
-        self.add_test_table(table)
+        self.add_test_table(InvoiceCheckTestTable(cnx))
         return
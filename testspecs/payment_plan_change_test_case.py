@@ -13,12 +13,15 @@ This modules specifies the payment plan change test case.
 """
 
 from datetime import datetime
-
-from pyodbc import Connection
+from typing import TYPE_CHECKING
 
 from base.testrandom import Random, DEFAULT_SEED
 from models.spec import TestTableSpecification, TestCaseSpecification
 from queries.policycenterqueries import PolicyCenterQueries
+from queries.selection import Selection
+
+if TYPE_CHECKING:
+    from pyodbc import Connection
 
 
 # -------------------------------------------------------------------------------
@@ -35,7 +38,7 @@ class PaymentPlanChangeTestTable(TestTableSpecification):
     #  Constructor
     # ---------------------------------------------------------------------------
 
-    def __init__(self, cnx: Connection):
+    def __init__(self, cnx: "Connection"):
         """
         Specify the characteristics of the test table.
         """
@@ -58,6 +61,17 @@ class PaymentPlanChangeTestTable(TestTableSpecification):
         self.pc_queries = PolicyCenterQueries(cnx)
         self.selection_end = datetime.now()
         self.number_of_rows = 20
+        self.selection = Selection.stratified
+        self.rows_per_stratum = 2
+        self.seed = DEFAULT_SEED
+        self.policy_period_columns = ["AccountNumber", "PolicyNumber", "PaymentPlan", "BillingID"]
+        #
+        # Declare the data needed to generate the rows
+        #
+        self.cnx = cnx
+        self.declare_need("policy_periods", self.read_policy_periods)
+        self.declare_need("installment_plans", self.read_installment_plans)
+        self.installment_plans = []
         return
 
     # ---------------------------------------------------------------------------
@@ -68,34 +82,39 @@ class PaymentPlanChangeTestTable(TestTableSpecification):
     #  Operations
     # ---------------------------------------------------------------------------
 
-    def generate_rows(self):
+    def read_policy_periods(self, cnx: "Connection") -> list:
         """
-        Generate the rows for the test table.
-        """
-        policy_periods = self.pc_queries.query_policy_periods(self.selection_end, self.number_of_rows)
-        count = self.test_id_start
-        for policy_period in policy_periods:
-            if self.is_in_effect(policy_period, self.selection_end):
-                row = self.create_row(self.test_id_prefix, count, policy_period)
-                self.add_row(row)
-                count += 1
-        return
+        Return the policy periods used to generate the rows.
 
-    @staticmethod
-    def is_in_effect(policy_period, date: datetime) -> bool:
+        Arguments:
+            cnx - the connection used to read the policy periods
+        """
+        queries = self.pc_queries if cnx is self.cnx else PolicyCenterQueries(cnx)
+        return queries.query_policy_periods(self.selection_end, self.number_of_rows,
+                                            as_of=self.selection_end,
+                                            columns=self.policy_period_columns,
+                                            selection=self.selection, seed=self.seed,
+                                            per_stratum=self.rows_per_stratum)
+
+    def read_installment_plans(self, cnx: "Connection") -> list:
         """
-        Return True if the policy period is in effect on the specified date.
+        Return the installment plans from which the new payment plans are selected.
 
         Arguments:
-            policy_period - a row from the results of a query of the policy period and related data
-            date - the date specified for testing
+            cnx - the connection used to read the installment plans
         """
-        result = True
-        if date < policy_period.PeriodStart:
-            result = False
-        elif date >= policy_period.PeriodEnd:
-            result = False
-        return result
+        queries = self.pc_queries if cnx is self.cnx else PolicyCenterQueries(cnx)
+        return queries.query_installment_plans()
+
+    def generate_rows(self):
+        """
+        Generate the rows for the test table.
+        """
+        policy_periods = self.fetch("policy_periods")
+        self.installment_plans = self.fetch("installment_plans")
+        self.add_rows(self.create_row(self.test_id_prefix, count, policy_period)
+                      for count, policy_period in enumerate(policy_periods, self.test_id_start))
+        return
 
     def create_row(self, prefix: str, count: int, policy_period) -> list[str]:
         """
@@ -120,13 +139,15 @@ class PaymentPlanChangeTestTable(TestTableSpecification):
 
     def select_payment_plan_id(self, policy_period):
         """
-        Return a payment plan id other than the current payment plan.
+        Return a payment plan id other than the current payment plan.  The installment
+        plans are read from PolicyCenter once, before the rows are generated, so selecting
+        a plan for each row does not query the database.
 
         Arguments:
             policy_period - the result of the policy period query
         """
         billing_id = policy_period.BillingID
-        available_plans = self.pc_queries.query_payment_plan(billing_id)
+        available_plans = [plan for plan in self.installment_plans if plan.BillingID != billing_id]
         ids = self.form_list_of_billing_ids(available_plans)
         new_id = self.random.select_from_list(ids)
         return new_id
@@ -158,7 +179,7 @@ class PaymentPlanChangeTest(TestCaseSpecification):
     #  Constructor
     # ---------------------------------------------------------------------------
 
-    def __init__(self, cnx: Connection):
+    def __init__(self, cnx: "Connection"):
         """
         Initialize the instance of this class with the values for the Account
         Check test case.
@@ -181,6 +202,5 @@ class PaymentPlanChangeTest(TestCaseSpecification):
         # Specify the tables in the test case
         #
         table = PaymentPlanChangeTestTable(cnx)
-        table.generate_rows()
-        self.add_test_table(table)
+        self.add_test_table(table, table.generate_rows)
         return
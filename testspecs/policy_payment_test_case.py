@@ -12,15 +12,20 @@ __version__ = "18-Sep-2021"
 This class specifies the Payment Make test case for creating policy-level payments.
 """
 
+import functools
 from datetime import datetime
-
-from pyodbc import Connection
+from typing import TYPE_CHECKING
 
 from base.testrandom import Random, DEFAULT_SEED
 from base.uniqueid import gen_unique_id
 from models.spec import TestTableSpecification, TestCaseSpecification
 from models.paymenthistory import PaymentHistory
 from queries.policycenterqueries import PolicyCenterQueries
+from base.testrandom import DEFAULT_SEED
+from queries.selection import Selection
+
+if TYPE_CHECKING:
+    from pyodbc import Connection
 
 
 # -------------------------------------------------------------------------------
@@ -37,7 +42,7 @@ class PaymentMakeTestTable(TestTableSpecification):
     #  Constructor
     # ---------------------------------------------------------------------------
 
-    def __init__(self, cnx: Connection):
+    def __init__(self, cnx: "Connection"):
         """
         Specify the characteristics of the test table.
         """
@@ -60,6 +65,14 @@ class PaymentMakeTestTable(TestTableSpecification):
         self.pc_queries = PolicyCenterQueries(cnx)
         self.selection_end = datetime.now()
         self.number_of_rows = 20
+        self.selection = Selection.sample
+        self.seed = DEFAULT_SEED
+        self.policy_period_columns = ["AccountNumber", "PolicyNumber", "TotalInvoicedAmount"]
+        #
+        # Declare the data needed to generate the rows
+        #
+        self.cnx = cnx
+        self.declare_need("policy_periods", self.read_policy_periods)
         return
 
     # ---------------------------------------------------------------------------
@@ -70,37 +83,33 @@ class PaymentMakeTestTable(TestTableSpecification):
     #  Operations
     # ---------------------------------------------------------------------------
 
+    def read_policy_periods(self, cnx: "Connection") -> list:
+        """
+        Return the policy periods used to generate the rows.
+
+        Arguments:
+            cnx - the connection used to read the policy periods
+        """
+        queries = self.pc_queries if cnx is self.cnx else PolicyCenterQueries(cnx)
+        return queries.query_policy_periods(self.selection_end, self.number_of_rows,
+                                            as_of=self.selection_end,
+                                            columns=self.policy_period_columns,
+                                            selection=self.selection, seed=self.seed)
+
     def generate_rows(self, payment_history: dict[str, PaymentHistory]):
         """
         Generate the rows for the test table.
         """
-        policy_periods = self.pc_queries.query_policy_periods(self.selection_end, self.number_of_rows)
+        policy_periods = self.fetch("policy_periods")
         count = self.test_id_start
         for policy_period in policy_periods:
-            if self.is_in_effect(policy_period, self.selection_end):
-                row = self.create_row(self.test_id_prefix, count, policy_period)
-                self.add_row(row)
-                payment_history[row[3]] = PaymentHistory(row[3], policy_period.AccountNumber, False, False)
-                payment_history[row[3]].policy_number = policy_period.PolicyNumber
-                count += 1
+            row = self.create_row(self.test_id_prefix, count, policy_period)
+            self.add_row(row)
+            payment_history[row[3]] = PaymentHistory(row[3], policy_period.AccountNumber, False, False)
+            payment_history[row[3]].policy_number = policy_period.PolicyNumber
+            count += 1
         return
 
-    @staticmethod
-    def is_in_effect(policy_period, date: datetime) -> bool:
-        """
-        Return True if the policy period is in effect on the specified date.
-
-        Arguments:
-            policy_period - a row from the results of a query of the policy period and related data
-            date - the date specified for testing
-        """
-        result = True
-        if date < policy_period.PeriodStart:
-            result = False
-        elif date >= policy_period.PeriodEnd:
-            result = False
-        return result
-
     def create_row(self, prefix: str, count: int, policy_period) -> list[str]:
         """
         Create a row for the test table.
@@ -222,7 +231,7 @@ class PaymentMakeTest(TestCaseSpecification):
     #  Constructor
     # ---------------------------------------------------------------------------
 
-    def __init__(self, cnx: Connection):
+    def __init__(self, cnx: "Connection"):
         """
         Initialize the instance of this class with the values for the Account
         Check test case.
@@ -245,13 +254,10 @@ class PaymentMakeTest(TestCaseSpecification):
         #
         self.payment_history: dict[str, PaymentHistory] = {}
         table = PaymentMakeTestTable(cnx)
-        table.generate_rows(self.payment_history)
-        self.add_test_table(table)
+        self.add_test_table(table, functools.partial(table.generate_rows, self.payment_history))
         #
         # Specify negative write-offs
         #
         table = WriteOffMakeTestTable()
-        table.generate_rows(self.payment_history)
-        if table.has_rows:
-            self.add_test_table(table)
+        self.add_test_table(table, functools.partial(table.generate_rows, self.payment_history), omit_if_empty=True)
         return
@@ -0,0 +1,346 @@
+# -------------------------------------------------------------------------------
+#
+#  Copyright (c) 2021 Waysys LLC
+#
+# -------------------------------------------------------------------------------
+# -------------------------------------------------------------------------------
+#
+__author__ = 'Bill Shaffer'
+__version__ = "16-Oct-2021"
+
+"""
+This module contains the registry of test case specifications.  Each specification is
+registered by name with the module and class that implement it and with its metadata:
+the project and test suite it generates, and the PolicyCenter queries it runs.  The
+module of a specification is imported only when the specification is selected, so the
+specifications can be listed, described, and validated without importing them and
+without a database connection.  The functions that create and prepare a specification
+by name are here too, so they can be used without the configuration of testcasegen.
+
+To add a specification, write its module in the testspecs package and register it at
+the end of this module.
+"""
+
+import functools
+import importlib
+from concurrent.futures import Future
+from pathlib import Path
+from typing import TYPE_CHECKING, Optional
+
+from base.testexception import TestException
+
+if TYPE_CHECKING:
+    from base.prefetch import Prefetcher
+    from models.spec import TestCaseSpecification
+
+#
+# The class of the PolicyCenter queries a specification may require
+#
+QUERIES_MODULE = "queries.policycenterqueries"
+QUERIES_CLASS = "PolicyCenterQueries"
+
+
+# -------------------------------------------------------------------------------
+#  Spec Definition
+# -------------------------------------------------------------------------------
+
+
+class SpecDefinition:
+    """
+    This class describes a test case specification and creates it when it is selected.
+    """
+
+    # ---------------------------------------------------------------------------
+    #  Constructor
+    # ---------------------------------------------------------------------------
+
+    def __init__(self, name: str, module_name: str, class_name: str, project_name: str, suite_name: str,
+                 queries: tuple[str, ...] = (), description: str = "", application_name: str = "BC"):
+        """
+        Initialize the instance of this class.
+
+        Arguments:
+            name - the name used to select the specification
+            module_name - the module that contains the specification class
+            class_name - the name of the specification class
+            project_name - the project of the test suite
+            suite_name - the test suite the test case is written to
+            queries - the names of the PolicyCenter queries the specification runs
+            description - a one line description of the test case
+            application_name - the application the test case tests
+        """
+        assert name is not None and len(name) > 0, "Specification name must not be empty"
+        assert module_name is not None and len(module_name) > 0, "Module name must not be empty"
+        assert class_name is not None and len(class_name) > 0, "Class name must not be empty"
+        self.name = name
+        self.module_name = module_name
+        self.class_name = class_name
+        self.project_name = project_name
+        self.suite_name = suite_name
+        self.queries = tuple(queries)
+        self.description = description
+        self.application_name = application_name
+        self._spec_class: Optional[type] = None
+        return
+
+    # ---------------------------------------------------------------------------
+    #  Properties
+    # ---------------------------------------------------------------------------
+
+    @property
+    def spec_class(self) -> type:
+        """
+        Return the specification class, importing its module the first time.
+        """
+        if self._spec_class is None:
+            try:
+                module = importlib.import_module(self.module_name)
+            except ImportError as e:
+                raise TestException("Unable to import " + self.module_name + " for specification " +
+                                    self.name + ": " + str(e))
+            if not hasattr(module, self.class_name):
+                raise TestException("Module " + self.module_name + " has no class " + self.class_name)
+            self._spec_class = getattr(module, self.class_name)
+        return self._spec_class
+
+    @property
+    def is_loaded(self) -> bool:
+        """
+        Return True if the module of the specification has been imported.
+        """
+        return self._spec_class is not None
+
+    # ---------------------------------------------------------------------------
+    #  Operations
+    # ---------------------------------------------------------------------------
+
+    def create(self, cnx):
+        """
+        Create and return the specification.  The specification reads its data from
+        the database.
+
+        Arguments:
+            cnx - a connection to the database
+        """
+        return self.spec_class(cnx)
+
+    def suite_directory(self, test_suite_directory: str) -> str:
+        """
+        Return the directory the test case is written to.  It is formed as the
+        build_test_suite_directory function of the specification forms it.
+
+        Arguments:
+            test_suite_directory - the path that points to a directory with
+               subdirectories for projects.
+        """
+        return test_suite_directory + "/" + self.application_name + "/" + self.project_name + "/" + self.suite_name
+
+    def describe(self) -> str:
+        """
+        Return a description of the specification.
+        """
+        text = self.name + "\n" + \
+            "    " + self.description + "\n" + \
+            "    class:   " + self.module_name + "." + self.class_name + "\n" + \
+            "    suite:   " + self.application_name + "/" + self.project_name + "/" + self.suite_name + "\n" + \
+            "    queries: " + (", ".join(self.queries) if self.queries else "none")
+        return text
+
+    def validate(self, test_suite_directory: Optional[str] = None) -> list[str]:
+        """
+        Return the problems with the specification, or an empty list if there are none.
+        The module is imported and the queries are looked up, but the specification is not
+        created, so the database is not used.
+
+        Arguments:
+            test_suite_directory - the directory of the test suites, or None to skip the
+               check that the directory of the test case exists
+        """
+        problems = []
+        try:
+            spec_class = self.spec_class
+            from models.spec import TestCaseSpecification
+            if not (isinstance(spec_class, type) and issubclass(spec_class, TestCaseSpecification)):
+                problems.append(self.class_name + " is not a test case specification")
+        except TestException as e:
+            problems.append(str(e))
+        if self.queries:
+            queries_class = getattr(importlib.import_module(QUERIES_MODULE), QUERIES_CLASS)
+            for query in self.queries:
+                if not callable(getattr(queries_class, query, None)):
+                    problems.append(QUERIES_CLASS + " has no query " + query)
+        if test_suite_directory is not None:
+            directory = self.suite_directory(test_suite_directory)
+            if not Path(directory).is_dir():
+                problems.append("Test suite directory does not exist: " + directory)
+        return problems
+
+
+# -------------------------------------------------------------------------------
+#  Spec Registry
+# -------------------------------------------------------------------------------
+
+
+class SpecRegistry:
+    """
+    This class holds the definitions of the test case specifications in the order they
+    were registered.
+    """
+
+    # ---------------------------------------------------------------------------
+    #  Constructor
+    # ---------------------------------------------------------------------------
+
+    def __init__(self):
+        """
+        Initialize the instance of this class.
+        """
+        self._definitions: dict[str, SpecDefinition] = {}
+        return
+
+    # ---------------------------------------------------------------------------
+    #  Properties
+    # ---------------------------------------------------------------------------
+
+    @property
+    def names(self) -> list[str]:
+        """
+        Return the names of the specifications in the order they were registered.
+        """
+        return list(self._definitions)
+
+    @property
+    def definitions(self) -> list[SpecDefinition]:
+        """
+        Return the definitions of the specifications in the order they were registered.
+        """
+        return list(self._definitions.values())
+
+    # ---------------------------------------------------------------------------
+    #  Operations
+    # ---------------------------------------------------------------------------
+
+    def register(self, name: str, module_name: str, class_name: str, project_name: str, suite_name: str,
+                 queries: tuple[str, ...] = (), description: str = "") -> SpecDefinition:
+        """
+        Register a specification and return its definition.
+
+        Arguments:
+            name - the name used to select the specification
+            module_name - the module that contains the specification class
+            class_name - the name of the specification class
+            project_name - the project of the test suite
+            suite_name - the test suite the test case is written to
+            queries - the names of the PolicyCenter queries the specification runs
+            description - a one line description of the test case
+        """
+        if name in self._definitions:
+            raise TestException("Specification is already registered: " + name)
+        definition = SpecDefinition(name, module_name, class_name, project_name, suite_name, queries, description)
+        self._definitions[name] = definition
+        return definition
+
+    def has_spec(self, name: str) -> bool:
+        """
+        Return True if a specification is registered with the name.
+
+        Arguments:
+            name - the name of the specification
+        """
+        return name in self._definitions
+
+    def fetch(self, name: str) -> SpecDefinition:
+        """
+        Return the definition of a specification.
+
+        Arguments:
+            name - the name of the specification
+        """
+        if name not in self._definitions:
+            raise TestException("Unsupported test specification: " + name)
+        return self._definitions[name]
+
+
+# -------------------------------------------------------------------------------
+#  Functions
+# -------------------------------------------------------------------------------
+
+
+def determine_spec(spec_name: str, cnx) -> "TestCaseSpecification":
+    """
+    Return the test case specification to be used to generate the test cases.  The module
+    of the specification is imported the first time it is selected.
+
+    Arguments:
+        spec_name - the name of the specification
+        cnx - a connection to the database
+    """
+    spec = registry.fetch(spec_name).create(cnx)
+    return spec
+
+
+def prepare_spec(spec_name: str, cnx) -> "TestCaseSpecification":
+    """
+    Return a test case specification with the rows of all its tables generated.
+
+    Arguments:
+        spec_name - the name of the specification
+        cnx - a connection to the database
+    """
+    return determine_spec(spec_name, cnx).evaluate()
+
+
+def prepare_specs(prefetcher: "Prefetcher", spec_names: list[str], pending: dict[str, Future]):
+    """
+    Start preparing the specifications that are not already being prepared.  The tables of
+    a specification read their data when they are evaluated, so each specification is created
+    and evaluated on a connection of the prefetcher before the connection is returned.
+
+    Arguments:
+        prefetcher - the prefetcher that creates the specifications
+        spec_names - the names of the specifications to prepare
+        pending - a dictionary of the futures of the specifications being prepared
+    """
+    for spec_name in spec_names:
+        if spec_name not in pending:
+            future = prefetcher.submit(functools.partial(prepare_spec, spec_name))
+            if future is not None:
+                pending[spec_name] = future
+    return
+
+
+# -------------------------------------------------------------------------------
+#  Registered Specifications
+# -------------------------------------------------------------------------------
+
+registry = SpecRegistry()
+
+registry.register("AccountCheckTest", "testspecs.account_test_case", "AccountCheckTest",
+                  "BillingCenterProject", "AccountCheck", ("iter_accounts",),
+                  "Check that BillingCenter has the accounts from PolicyCenter.")
+registry.register("InvoiceCheckTest", "testspecs.invoice_test_case", "InvoiceCheckTest",
+                  "BillingCenterProject", "InvoiceCheck", ("stream_policy_periods",),
+                  "Check that BillingCenter has the policy periods and invoices.")
+registry.register("SuspensePaymentMake", "testspecs.suspense_payment_test_case", "SuspensePaymentMakeTest",
+                  "BillingCenterProject", "SuspensePaymentMake", ("query_policy_periods",),
+                  "Make, apply, and reverse suspense payments.")
+registry.register("AccountPaymentMake", "testspecs.account_payment_test_case", "AccountPaymentMakeTest",
+                  "BillingCenterProject", "AccountPaymentMake", ("query_policy_periods",),
+                  "Make and reverse account payments and disburse the excess.")
+registry.register("PaymentMake", "testspecs.policy_payment_test_case", "PaymentMakeTest",
+                  "BillingCenterProject", "PaymentMake", ("query_policy_periods",),
+                  "Make payments on policy periods and write off the remainder.")
+registry.register("AdvancedCommissionPayment", "testspecs.advanced_commission_test_case", "AdvancedCommissionTest",
+                  "BillingCenterProject", "AdvancedCommissionPayment",
+                  ("sample_producer_codes", "reservoir_producer_codes"),
+                  "Pay advanced commissions to producers.")
+registry.register("WriteOffMake", "testspecs.write_off_test_case", "WriteOffMakeTest",
+                  "BillingCenterProject", "WriteOffMake", ("query_policy_periods",),
+                  "Write off amounts on policy periods.")
+registry.register("PaymentPlanChange", "testspecs.payment_plan_change_test_case", "PaymentPlanChangeTest",
+                  "BillingCenterProject", "PaymentPlanChange", ("query_policy_periods", "query_installment_plans"),
+                  "Change the payment plans of policy periods.")
+registry.register("CollateralRequirementTest", "testspecs.collateral_requirement_test_case",
+                  "CollateralRequirementTest", "BillingCenterProject", "CollateralRequirementCreate",
+                  ("query_policy_periods",),
+                  "Create collateral requirements on policy periods.")
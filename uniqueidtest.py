@@ -0,0 +1,110 @@
+# -------------------------------------------------------------------------------
+#
+#  Copyright (c) 2021 Waysys LLC
+#
+# -------------------------------------------------------------------------------
+# -------------------------------------------------------------------------------
+#
+__author__ = 'Bill Shaffer'
+__version__ = "15-Sep-2021"
+
+"""
+This module tests the unique id allocator.
+"""
+
+import os
+import tempfile
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+
+import xmlrunner
+
+from base.uniqueid import UniqueIdAllocator, MAX_CHARACTERS
+
+
+def allocate_in_process(path: str) -> list[str]:
+    """
+    Allocate identifiers in a separate process.
+
+    Arguments:
+        path - the full path of the reservation file
+    """
+    allocator = UniqueIdAllocator(path, 10)
+    ids = [allocator.next_id() for _ in range(25)]
+    ids += allocator.allocate(100)
+    return ids
+
+
+# -------------------------------------------------------------------------------
+#  Test Unique ID Allocator
+# -------------------------------------------------------------------------------
+
+
+class TestUniqueIdAllocator(unittest.TestCase):
+    """
+    This class tests the UniqueIdAllocator class.
+    """
+
+    # -------------------------------------------------------------------------------
+    #  Support Functions
+    # -------------------------------------------------------------------------------
+
+    def setUp(self):
+        """
+        Create a directory for the reservation file.
+        """
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "uniqueid")
+        return
+
+    def tearDown(self):
+        """
+        Remove the directory for the reservation file.
+        """
+        self.directory.cleanup()
+        return
+
+    # -------------------------------------------------------------------------------
+    #  Tests
+    # -------------------------------------------------------------------------------
+
+    def test_01_length(self):
+        """
+        Test that identifiers have a fixed length.
+        """
+        allocator = UniqueIdAllocator(self.path)
+        for unique_id in allocator.allocate(50):
+            self.assertEqual(MAX_CHARACTERS, len(unique_id), "Incorrect length: " + unique_id)
+        return
+
+    def test_02_unique_across_runs(self):
+        """
+        Test that a new allocator on the same file does not repeat identifiers.
+        """
+        first = UniqueIdAllocator(self.path)
+        ids = [first.next_id() for _ in range(10)]
+        second = UniqueIdAllocator(self.path)
+        ids += [second.next_id() for _ in range(10)]
+        ids += second.allocate(5000)
+        self.assertEqual(len(ids), len(set(ids)), "Identifiers were repeated")
+        return
+
+    def test_03_unique_across_processes(self):
+        """
+        Test that allocators in several processes do not repeat identifiers.
+        """
+        ids = []
+        with ProcessPoolExecutor(max_workers=4) as executor:
+            for result in executor.map(allocate_in_process, [self.path] * 8):
+                ids += result
+        self.assertEqual(8 * 125, len(ids), "Incorrect number of identifiers")
+        self.assertEqual(len(ids), len(set(ids)), "Identifiers were repeated")
+        return
+
+
+if __name__ == '__main__':
+    report_file = '/GFITWorkspaces/COMMON01/uniqueid_test.xml'
+    with open(report_file, 'w') as output:
+        unittest.main(
+            testRunner=xmlrunner.XMLTestRunner(output=output),
+            failfast=False, buffer=False, catchbreak=False)